@@ -2,16 +2,25 @@ from flask import Flask, render_template, Response, jsonify, request
 import cv2
 import os
 import time
-import yt_dlp
 import numpy as np
 from pose_module import PoseDetector, GaitAnalyzer, AthleticScorer
+from stream_resolver import StreamResolver, YtDlpExtractor, video_key
+from source_cache import SourceCache
+from mjpeg import AdaptiveJpegEncoder
+from stream_control import StreamControl, RUNNING
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+YOUTUBE_FORMAT = 'best[ext=mp4]/best'
+youtube_resolver = StreamResolver(extractor=YtDlpExtractor(socket_timeout=10))
+# YouTube clips are downloaded once (800px wide) and replayed from disk
+source_cache = SourceCache('source_cache', max_bytes=2 * 1024 ** 3)
+
 # Global variables for state
 video_source = 0  # Default to webcam
+youtube_page_url = None # Original YouTube URL, re-resolved when the signed URL is reopened
 current_mode = 'video' # video, image, youtube
 static_image_path = None
 cap = None
@@ -20,7 +29,9 @@ analyzer = GaitAnalyzer()
 scorer = AthleticScorer()
 
 # Control States
-is_paused = False
+control = StreamControl(RUNNING) # pause/resume wake the frame loop; every change bumps its version
+KEEPALIVE_SECONDS = 5 # While idle, resend the last frame this often so proxies keep the connection
+static_result = None # (key, annotated image): a static image is analyzed once, not every frame
 playback_speed = 1.0
 current_complexity = 2 # Default High complexity for athletic
 
@@ -66,29 +77,70 @@ def set_accuracy():
         # Determining mode based on current_mode string
         target_mode = 'image' if current_mode == 'image' else 'video'
         init_detector(target_mode)
+        control.notify() # Static image is re-analyzed with the new model
         
         return jsonify({'success': True, 'message': f'Complexity set to {complexity}'})
     except Exception as e:
         print(f"Error setting accuracy: {e}")
         return jsonify({'error': str(e)}), 500
-    ydl_opts = {
-        'format': 'best[ext=mp4]/best',
-        'quiet': True,
-        'no_warnings': True,
-        'noplaylist': True,
-        'socket_timeout': 10
-    }
+
+def get_youtube_stream_url(youtube_url):
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Check if it's a valid URL first? extract_info validates it.
-            info = ydl.extract_info(youtube_url, download=False)
-            return info['url']
+        # Cached per video id; repeat plays and reopens skip yt-dlp
+        return youtube_resolver.resolve(youtube_url, YOUTUBE_FORMAT)
     except Exception as e:
         print(f"Error extracting YouTube URL: {e}")
         return None
 
-def generate_frames():
-    global cap, video_source, analyzer, scorer, current_mode, static_image_path, is_paused, detector
+def youtube_cache_key(youtube_url):
+    return f"youtube:{video_key(youtube_url)}:{YOUTUBE_FORMAT}"
+
+def reopen_youtube():
+    """
+    Loop a YouTube source: from the local copy once it is cached, otherwise
+    from a (possibly refreshed) signed URL.
+    """
+    global cap, video_source
+    local_path = source_cache.lookup(youtube_cache_key(youtube_page_url))
+    if local_path and video_source == local_path and cap and cap.isOpened():
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return
+    if cap: cap.release()
+    # Signed URLs expire; the resolver hands back a fresh one from cache
+    video_source = local_path or get_youtube_stream_url(youtube_page_url) or video_source
+    cap = cv2.VideoCapture(video_source)
+
+def analyze_static_image(path):
+    """
+    Annotated copy of the image at `path`, cached until the file or model changes.
+    """
+    global static_result
+    key = (path, os.path.getmtime(path), current_complexity)
+    if static_result and static_result[0] == key:
+        return static_result
+    img = cv2.imread(path)
+    if img is None:
+        return None
+
+    # Resize
+    width = 1280
+    height = int(img.shape[0] * (1280 / img.shape[1]))
+    img = cv2.resize(img, (width, height))
+    
+    # Process
+    img = detector.find_pose(img)
+    lm_list = detector.find_position(img, draw=False)
+    
+    # Angles check
+    if len(lm_list) != 0:
+         detector.find_angle(img, 24, 26, 28) # Right Knee
+         detector.find_angle(img, 12, 24, 26) # Right Hip
+
+    static_result = (key, img)
+    return static_result
+
+def generate_frames(encoder):
+    global cap, video_source, analyzer, scorer, current_mode, static_image_path, detector
     
     if detector is None:
         init_detector('video')
@@ -97,44 +149,28 @@ def generate_frames():
         if cap is None or not cap.isOpened():
              cap = cv2.VideoCapture(video_source)
     
-    last_frame = None
-    
     while True:
+        version = control.version
         if current_mode == 'image':
+            result = None
             if static_image_path and os.path.exists(static_image_path):
-                img = cv2.imread(static_image_path)
-                if img is None: continue
-                
-                # Resize
-                width = 1280
-                height = int(img.shape[0] * (1280 / img.shape[1]))
-                img = cv2.resize(img, (width, height))
-                
-                # Process
-                img = detector.find_pose(img)
-                lm_list = detector.find_position(img, draw=False)
-                
-                # Angles check
-                if len(lm_list) != 0:
-                     detector.find_angle(img, 24, 26, 28) # Right Knee
-                     detector.find_angle(img, 12, 24, 26) # Right Hip
-                
-                ret, buffer = cv2.imencode('.jpg', img)
-                frame = buffer.tobytes()
-                yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                time.sleep(0.5) 
-            else:
-                time.sleep(0.5)
-                continue
+                result = analyze_static_image(static_image_path)
+            if result:
+                key, img = result
+                yield encoder.encode(img, key=key) # Re-encoded only when the image changed
+            # Nothing to do until an upload, mode switch or setting change (or keepalive)
+            control.wait_changed(version, timeout=KEEPALIVE_SECONDS)
+            continue
 
         else: # Video or YouTube
-            if is_paused and last_frame is not None:
-                yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + last_frame + b'\r\n')
-                time.sleep(0.1)
+            if control.paused:
+                if not control.wait_active(timeout=KEEPALIVE_SECONDS) and encoder.last_part is not None:
+                    # Still paused: resend the encoded chunk, no re-encode
+                    yield encoder.last_part
                 continue
                 
             if cap is None or not cap.isOpened():
-                 time.sleep(0.1)
+                 control.wait_changed(version, timeout=1.0) # Woken when a source is set
                  continue
                  
             success, frame = cap.read()
@@ -143,8 +179,7 @@ def generate_frames():
                     cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     continue
                 elif current_mode == 'youtube':
-                    cap.release()
-                    cap = cv2.VideoCapture(video_source)
+                    reopen_youtube()
                     continue
                 else: 
                      continue
@@ -168,7 +203,7 @@ def generate_frames():
                     # Visual balance
                     detector.find_angle(frame, 23, 25, 27, draw=False) 
 
-                if world_lms and not is_paused:
+                if world_lms and not control.paused:
                     fps = 30 
                     analyzer.update(world_lms, fps, r_knee, r_hip)
                 
@@ -176,10 +211,10 @@ def generate_frames():
                 analyzer.current_knee_angle = r_knee
                 analyzer.current_hip_angle = r_hip
 
-                ret, buffer = cv2.imencode('.jpg', frame)
-                last_frame = buffer.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + last_frame + b'\r\n')
+                part = encoder.encode(frame)
+                sent_at = time.perf_counter()
+                yield part
+                encoder.sent(len(part), time.perf_counter() - sent_at)
 
 @app.route('/')
 def index():
@@ -187,7 +222,14 @@ def index():
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # Optional per-client limits: ?target_kbps=800 or ?max_frame_kb=40
+    target_kbps = request.args.get('target_kbps', type=int)
+    max_frame_kb = request.args.get('max_frame_kb', type=int)
+    encoder = AdaptiveJpegEncoder(
+        target_kbps=target_kbps,
+        max_frame_bytes=max_frame_kb * 1024 if max_frame_kb else None,
+    )
+    return Response(generate_frames(encoder), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/metrics')
 def metrics():
@@ -210,7 +252,7 @@ def metrics():
 
 @app.route('/upload_video', methods=['POST'])
 def upload_video():
-    global video_source, cap, analyzer, scorer, current_mode, is_paused
+    global video_source, cap, analyzer, scorer, current_mode
     if 'file' not in request.files: return jsonify({'error': 'No file'}), 400
     file = request.files['file']
     if file.filename == '': return jsonify({'error': 'No file'}), 400
@@ -220,7 +262,6 @@ def upload_video():
         file.save(filepath)
         video_source = filepath
         current_mode = 'video'
-        is_paused = False
         
         init_detector('video')
         
@@ -228,11 +269,12 @@ def upload_video():
         cap = cv2.VideoCapture(video_source)
         analyzer = GaitAnalyzer() # Reset
         scorer = AthleticScorer()
+        control.start()
         return jsonify({'success': True})
 
 @app.route('/upload_image', methods=['POST'])
 def upload_image():
-    global static_image_path, current_mode, analyzer, is_paused
+    global static_image_path, current_mode, analyzer
     if 'file' not in request.files: return jsonify({'error': 'No file'}), 400
     file = request.files['file']
     if file.filename == '': return jsonify({'error': 'No file'}), 400
@@ -242,19 +284,19 @@ def upload_image():
         file.save(filepath)
         static_image_path = filepath
         current_mode = 'image'
-        is_paused = False
         init_detector('image')
+        control.start()
         return jsonify({'success': True})
 
 @app.route('/set_youtube', methods=['POST'])
 def set_youtube():
-    global video_source, cap, analyzer, scorer, current_mode, is_paused
+    global video_source, cap, analyzer, scorer, current_mode, youtube_page_url
     data = request.json
     url = data.get('url')
     if not url: return jsonify({'error': 'No URL'}), 400
     
     print(f"Received YouTube Request: {url}")
-    stream_url = get_youtube_stream_url(url)
+    stream_url = source_cache.lookup(youtube_cache_key(url)) or get_youtube_stream_url(url)
     
     if not stream_url: 
         print("Failed to get stream URL")
@@ -266,10 +308,11 @@ def set_youtube():
         print("CV2 Failed to open stream URL")
         return jsonify({'error': 'Video stream unreadable by server.'}), 400
     temp_cap.release()
+    source_cache.ensure(youtube_cache_key(url), stream_url)
 
     video_source = stream_url
+    youtube_page_url = url
     current_mode = 'youtube'
-    is_paused = False
     
     init_detector('video')
     
@@ -277,12 +320,13 @@ def set_youtube():
     cap = cv2.VideoCapture(video_source)
     analyzer = GaitAnalyzer()
     scorer = AthleticScorer()
+    control.start()
     print("YouTube Stream Set Successfully")
     return jsonify({'success': True})
 
 @app.route('/use_camera', methods=['POST'])
 def use_camera():
-    global video_source, cap, analyzer, scorer, current_mode, is_paused
+    global video_source, cap, analyzer, scorer, current_mode
     data = request.json or {}
     source_input = data.get('source', '0')
     try:
@@ -296,31 +340,31 @@ def use_camera():
         video_source = 0
 
     current_mode = 'video'
-    is_paused = False
     init_detector('video')
     if cap: cap.release()
     cap = cv2.VideoCapture(video_source)
     analyzer = GaitAnalyzer()
     scorer = AthleticScorer()
+    control.start()
     return jsonify({'success': True, 'source': video_source})
 
 @app.route('/control/pause', methods=['POST'])
 def pause_video():
-    global is_paused
-    is_paused = True
+    control.pause()
     return jsonify({'success': True})
 
 @app.route('/control/resume', methods=['POST'])
 def resume_video():
-    global is_paused
-    is_paused = False
+    control.resume()
     return jsonify({'success': True})
 
 @app.route('/control/replay', methods=['POST'])
 def replay_video():
-    global cap, video_source, is_paused
-    if cap: cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-    is_paused = False
+    global cap, video_source
+    if current_mode == 'youtube':
+        reopen_youtube()
+    elif cap: cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    control.start()
     return jsonify({'success': True})
 
 @app.route('/reset', methods=['POST'])
@@ -1,12 +1,12 @@
-from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import get_db, get_read_db, execute_read
 from app.models.user import User
 from app.schemas import token
 from app.crud import crud_user
@@ -15,27 +15,36 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
-
-def get_current_user(
-    db: Session = Depends(get_db), token_str: str = Depends(reusable_oauth2)
-) -> User:
+def _decode_token(token_str: str) -> token.TokenPayload:
     try:
         payload = jwt.decode(
             token_str, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = token.TokenPayload(**payload)
+        return token.TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+def get_current_user(
+    db: Session = Depends(get_db), token_str: str = Depends(reusable_oauth2)
+) -> User:
+    token_data = _decode_token(token_str)
     user = crud_user.get(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+async def get_current_user_async(
+    db=Depends(get_read_db), token_str: str = Depends(reusable_oauth2)
+) -> User:
+    """
+    Same as get_current_user, for async read endpoints (shares their read session).
+    """
+    token_data = _decode_token(token_str)
+    result = await execute_read(db, select(User).where(User.id == token_data.sub))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
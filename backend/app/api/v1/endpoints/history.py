@@ -1,14 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import numpy as np
 from app.api import deps
-from app.db.session import get_db
-from app.models.session import AnalysisSession
+from app.crud import crud_rollup
+from app.db.session import get_db, get_read_db, execute_read
+from app.db.pagination import apply_keyset, next_cursor
+from app.models.session import AnalysisSession, SessionRep
 from app.models.user import User
-from app.schemas.session import SessionCreate, Session as SessionSchema, SessionFeedbackUpdate
+from app.schemas.session import SessionCreate, Session as SessionSchema, SessionFeedbackUpdate, Rep as RepSchema, RepBase
+from app.services import telemetry_export
+from app.services.gait_cycles import CYCLE_CHANNELS, CYCLE_POINTS, PROFILE_SHAPE, pack_profile, unpack_profile
+from app.services.response_cache import response_cache, compare_cache, respond, history_tag, ORG_TAG
+from app.services.session_compare import load_angle_series, compare_series
+from app.services.similarity_index import similarity_index, embed_session
+from app.core.config import settings
 
 router = APIRouter()
 
+def session_cycles(session_in):
+    # (mean, std, count) from the request body, else from the recording
+    if session_in.cycles is None:
+        return telemetry_export.load_cycles(session_in.recording_id)
+    if not session_in.cycles.count:
+        return None
+    mean = np.asarray(session_in.cycles.mean, dtype=np.float32)
+    std = np.asarray(session_in.cycles.std, dtype=np.float32)
+    if mean.shape != PROFILE_SHAPE[1:] or std.shape != PROFILE_SHAPE[1:]:
+        raise HTTPException(status_code=422, detail=f"cycles.mean/std must be {PROFILE_SHAPE[1]}x{PROFILE_SHAPE[2]}")
+    return mean, std, session_in.cycles.count
+
 @router.post("/save", response_model=SessionSchema)
 def save_session(
     *,
@@ -28,25 +50,43 @@ def save_session(
         avg_gct=session_in.avg_gct,
         max_swing_error=session_in.max_swing_error,
         max_hip_error=session_in.max_hip_error,
-        video_path=session_in.video_path
+        video_path=session_in.video_path,
+        recording_id=session_in.recording_id
     )
+    cycles = session_cycles(session_in)
+    if cycles:
+        session.cycle_profile = pack_profile(cycles[0], cycles[1])
+        session.cycle_count = cycles[2]
     db.add(session)
+    db.flush()
+    reps = session_in.reps or [RepBase.model_validate(rep) for rep in telemetry_export.load_reps(session_in.recording_id)]
+    db.add_all([
+        SessionRep(session_id=session.id, user_id=current_user.id, **rep.model_dump())
+        for rep in reps
+    ])
+    crud_rollup.record_session(db, session)
     db.commit()
+    response_cache.invalidate(history_tag(current_user.id), ORG_TAG)
+    if similarity_index.loaded and session.cycle_profile:
+        similarity_index.refresh(db) # Incremental; the first search loads everything
     db.refresh(session)
     return session
 
 @router.get("/", response_model=List[SessionSchema])
-def read_sessions(
-    db: Session = Depends(get_db),
+async def read_sessions(
+    request: Request,
+    db = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None, # Keyset pagination: value of X-Next-Cursor from the previous page
     user_id: int = None, # Optional: View specific user's history
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_async)
 ):
     """
     Retrieve sessions. 
     - Athletes: Only see own sessions.
     - Coach/Management: Can see own or specific athlete's sessions (via user_id param).
+    Pass `cursor` (from the X-Next-Cursor header) instead of `skip` for deep pages.
     """
     from app.models.user import UserRole
 
@@ -59,8 +99,71 @@ def read_sessions(
              raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
         target_user_id = user_id
 
-    sessions = db.query(AnalysisSession).filter(AnalysisSession.user_id == target_user_id).order_by(AnalysisSession.created_at.desc()).offset(skip).limit(limit).all()
-    return sessions
+    cache_key = ("history", current_user.id, current_user.role, target_user_id, skip, limit, cursor)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return respond(request, cached)
+
+    stmt = select(AnalysisSession).where(AnalysisSession.user_id == target_user_id)
+    stmt = apply_keyset(stmt, AnalysisSession.created_at, AnalysisSession.id, cursor)
+    if not cursor:
+        stmt = stmt.offset(skip)
+    result = await execute_read(db, stmt.limit(limit))
+    sessions = result.scalars().all()
+
+    cursor_out = next_cursor(sessions, limit)
+    entry = response_cache.put(
+        cache_key,
+        [SessionSchema.model_validate(s) for s in sessions],
+        tags=[history_tag(target_user_id)],
+        headers={"X-Next-Cursor": cursor_out} if cursor_out else None,
+    )
+    return respond(request, entry)
+
+@router.get("/compare")
+def compare_sessions(
+    request: Request,
+    *,
+    db: Session = Depends(get_db),
+    a: int = Query(..., description="Session id (e.g. the athlete's latest)"),
+    b: int = Query(..., description="Session id to compare against (best session, reference athlete)"),
+    points: int = Query(300, ge=10, le=2000),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Align two sessions' recorded joint angles (DTW) and report per-joint
+    deviation and lag of `b` against `a` (owner, or Coach/Management/Admin).
+    """
+    from app.models.user import UserRole
+
+    sessions = {}
+    for session_id in (a, b):
+        session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+        if session.user_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]:
+            raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+        sessions[session_id] = session
+
+    # Access is checked above, so one entry serves every caller
+    cache_key = ("compare", a, b, points)
+    cached = compare_cache.get(cache_key)
+    if cached:
+        return respond(request, cached)
+
+    series = []
+    for session_id in (a, b):
+        directory = telemetry_export.recording_dir(sessions[session_id].recording_id)
+        loaded = load_angle_series(directory, settings.COMPARE_SAMPLE_HZ, settings.COMPARE_MAX_POINTS) if directory else None
+        if loaded is None:
+            raise HTTPException(status_code=404, detail=f"No telemetry recorded for session {session_id}")
+        series.append(loaded)
+
+    result = compare_series(series[0], series[1], band=settings.COMPARE_DTW_BAND, points=points)
+    result.update({"a": a, "b": b})
+    # Recordings do not change once saved; entries only age out
+    entry = compare_cache.put(cache_key, result, tags=())
+    return respond(request, entry)
 
 @router.put("/{session_id}/feedback", response_model=SessionSchema)
 def update_session_feedback(
@@ -85,5 +188,129 @@ def update_session_feedback(
     
     session.coach_notes = feedback_in.coach_notes
     db.commit()
+    response_cache.invalidate(history_tag(session.user_id), ORG_TAG)
     db.refresh(session)
     return session
+
+@router.get("/{session_id}/reps", response_model=List[RepSchema])
+def read_session_reps(
+    *,
+    db: Session = Depends(get_db),
+    session_id: int,
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Per-rep metrics of a session (owner, or Coach/Management/Admin).
+    """
+    from app.models.user import UserRole
+
+    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.user_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]:
+        raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+    return db.query(SessionRep).filter(SessionRep.session_id == session_id).order_by(SessionRep.rep_index).all()
+
+@router.get("/{session_id}/cycles")
+def read_session_cycles(
+    *,
+    db: Session = Depends(get_db),
+    session_id: int,
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Gait-cycle envelope of a session (owner, or Coach/Management/Admin).
+    """
+    from app.models.user import UserRole
+
+    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.user_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]:
+        raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+    if not session.cycle_profile:
+        raise HTTPException(status_code=404, detail="No gait cycles recorded for this session")
+    mean, std = unpack_profile(session.cycle_profile)
+    return {
+        "count": session.cycle_count,
+        "points": CYCLE_POINTS,
+        "channels": list(CYCLE_CHANNELS),
+        "mean": np.round(mean, 1).tolist(),
+        "std": np.round(std, 1).tolist(),
+    }
+
+@router.get("/{session_id}/similar")
+def read_similar_sessions(
+    *,
+    db: Session = Depends(get_db),
+    session_id: int,
+    k: int = Query(10, ge=1, le=100),
+    scope: str = Query("all", description="all, athlete (same athlete) or others (other athletes)"),
+    per_athlete: bool = Query(False, description="Only each athlete's closest session"),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Sessions whose gait cycles (curve shapes, cadence, GCT) are closest to
+    this one's. Athletes only ever get their own sessions back.
+    """
+    from app.models.user import UserRole
+
+    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    privileged = current_user.role in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]
+    if session.user_id != current_user.id and not privileged:
+        raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+    if scope not in ("all", "athlete", "others"):
+        raise HTTPException(status_code=400, detail="scope must be all, athlete or others")
+    if not privileged and scope != "athlete":
+        raise HTTPException(status_code=403, detail="Athletes can only search their own sessions")
+    vector = embed_session(session)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="No gait cycles recorded for this session")
+
+    similarity_index.refresh(db)
+    matches = similarity_index.search(
+        vector, k,
+        user_id=session.user_id if scope == "athlete" else None,
+        exclude_user=session.user_id if scope == "others" else None,
+        exclude_id=session.id,
+        per_user=per_athlete,
+    )
+    rows = {
+        row.id: row for row in
+        db.query(AnalysisSession).filter(AnalysisSession.id.in_([match[0] for match in matches])).all()
+    }
+    return [
+        {
+            "session_id": match_id,
+            "user_id": user_id,
+            "distance": round(distance, 3),
+            "created_at": rows[match_id].created_at if match_id in rows else None,
+            "technique_score": rows[match_id].technique_score if match_id in rows else None,
+        }
+        for match_id, user_id, distance in matches
+    ]
+
+@router.get("/{session_id}/export")
+def export_session_telemetry(
+    *,
+    db: Session = Depends(get_db),
+    session_id: int,
+    format: str = Query("csv", description="csv, parquet or arrow"),
+    compress: bool = False,
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Stream a session's per-frame telemetry (owner, or Coach/Management/Admin).
+    """
+    from app.models.user import UserRole
+
+    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.user_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]:
+        raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+    if not session.recording_id:
+        raise HTTPException(status_code=404, detail="No telemetry recorded for this session")
+    return telemetry_export.export_response(session.recording_id, format, compress)
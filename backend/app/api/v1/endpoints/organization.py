@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Any
+from sqlalchemy import func, select
+from typing import List, Any, Optional
 from app.api import deps
-from app.db.session import get_db
+from app.db.session import get_read_db, execute_read
+from app.db.pagination import apply_keyset, next_cursor
 from app.models.user import User, UserRole
 from app.models.session import AnalysisSession
+from app.models.rollup import OrganizationRollup, DailyRollup
+from app.crud import crud_rollup
+from app.services.response_cache import response_cache, respond, ORG_TAG
+from app.services.export_jobs import export_jobs
 from datetime import datetime, date
 
 router = APIRouter()
 
 @router.get("/summary")
-def get_organization_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_user)
+async def get_organization_summary(
+    request: Request,
+    db = Depends(get_read_db),
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Get high-level statistics for the organization (Management only).
@@ -21,47 +28,57 @@ def get_organization_summary(
     if current_user.role != UserRole.MANAGEMENT and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # 1. Total Athletes
-    total_athletes = db.query(User).filter(User.role == UserRole.ATHLETE).count()
-
-    # 2. Total Sessions
-    total_sessions = db.query(AnalysisSession).count()
+    cache_key = ("org-summary", current_user.id, current_user.role)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return respond(request, cached)
 
-    # 3. Average Technique Score (System-wide)
-    avg_score = db.query(func.avg(AnalysisSession.technique_score)).scalar() or 0
+    # Everything comes from the rollup tables maintained by history.save_session
+    today = datetime.utcnow().date()
+    org = (await execute_read(db, select(OrganizationRollup).where(OrganizationRollup.id == crud_rollup.ORG_ROW_ID))).scalars().first()
+    daily = (await execute_read(db, select(DailyRollup).where(DailyRollup.day == today))).scalars().first()
 
-    # 4. Active Today
-    today = date.today()
-    active_today = db.query(AnalysisSession).filter(func.date(AnalysisSession.created_at) == today).distinct(AnalysisSession.user_id).count()
+    total_athletes = org.total_athletes if org else 0
+    total_sessions = org.total_sessions if org else 0
+    avg_score = (org.score_sum / org.total_sessions) if org and org.total_sessions else 0
+    active_today = daily.active_users if daily else 0
 
-    return {
+    summary = {
         "total_athletes": total_athletes,
         "total_sessions": total_sessions,
         "avg_system_score": round(avg_score, 1),
         "active_today": active_today
     }
+    return respond(request, response_cache.put(cache_key, summary, tags=[ORG_TAG]))
 
 @router.get("/recent-sessions")
-def get_all_recent_sessions(
-    db: Session = Depends(get_db),
+async def get_all_recent_sessions(
+    request: Request,
+    db = Depends(get_read_db),
     skip: int = 0,
     limit: int = 20,
-    current_user: User = Depends(deps.get_current_user)
+    cursor: Optional[str] = None, # Keyset pagination: value of X-Next-Cursor from the previous page
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Get recent sessions from ALL users (Management only).
+    Pass `cursor` (from the X-Next-Cursor header) instead of `skip` for deep pages.
     """
     if current_user.role not in [UserRole.MANAGEMENT, UserRole.ADMIN, UserRole.COACH]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    sessions = (
-        db.query(AnalysisSession, User.full_name)
-        .join(User, AnalysisSession.user_id == User.id)
-        .order_by(AnalysisSession.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    cache_key = ("org-recent", current_user.id, current_user.role, skip, limit, cursor)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return respond(request, cached)
+
+    stmt = select(AnalysisSession, User.full_name).join(User, AnalysisSession.user_id == User.id)
+    stmt = apply_keyset(stmt, AnalysisSession.created_at, AnalysisSession.id, cursor)
+    if not cursor:
+        stmt = stmt.offset(skip)
+    sessions = (await execute_read(db, stmt.limit(limit))).all()
+
+    cursor_out = next_cursor(sessions, limit, key=lambda row: row[0])
 
     # Format response
     result = []
@@ -76,4 +93,58 @@ def get_all_recent_sessions(
         }
         result.append(sess_dict)
 
-    return result
+    entry = response_cache.put(
+        cache_key, result, tags=[ORG_TAG],
+        headers={"X-Next-Cursor": cursor_out} if cursor_out else None,
+    )
+    return respond(request, entry)
+
+def _require_management(current_user: User):
+    if current_user.role != UserRole.MANAGEMENT and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+@router.post("/export")
+def start_organization_export(
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Start a bulk export of all sessions and telemetry (Management only).
+    Poll GET /organization/export/{job_id} for progress.
+    """
+    _require_management(current_user)
+    try:
+        job = export_jobs.submit(requested_by=current_user.id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return job.to_dict()
+
+@router.get("/export/{job_id}")
+def get_organization_export(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Progress of a bulk export job (Management only).
+    """
+    _require_management(current_user)
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job.to_dict()
+
+@router.get("/export/{job_id}/download")
+def download_organization_export(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Download the finished archive: sessions.parquet plus
+    telemetry/athlete_id=<id>/month=<YYYY-MM>/part-0.parquet (Management only).
+    """
+    _require_management(current_user)
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    return FileResponse(job.archive_path, media_type="application/zip", filename=f"organization_export_{job.id}.zip")
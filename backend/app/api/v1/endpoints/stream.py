@@ -1,12 +1,37 @@
-import cv2
+import asyncio
 import time
-from fastapi import APIRouter, Response, HTTPException, Query
-from fastapi.responses import StreamingResponse, FileResponse
-from app.services.pose_module import PoseDetector, GaitAnalyzer, AthleticScorer, draw_graph_overlay
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, Response, HTTPException, Query
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.db.session import get_db
+from app.models.session import AnalysisSession
+from app.models.user import User, UserRole
+from app.services.gait import GaitAnalyzer, AthleticScorer
 from app.services.feedback import get_feedback
-import yt_dlp
+from app.services import telemetry_export
+from app.services.detector_pool import detector_pool
+from app.services.stream_resolver import StreamResolver, YtDlpExtractor, video_key
+from app.services.source_cache import SourceCache, is_remote_source
+from app.services.media_proxy import proxy_builder
+from app.services.stream_control import StreamControl, RUNNING, PAUSED, STOPPED
+from app.services.frame_broadcaster import FrameBroadcaster
+from app.services.sampling_profiler import profiler
+from app.services.presence_gate import PresenceGate
+from app.services.synthetic_source import SyntheticClockCapture, is_synthetic_source, synthetic_fps
+from app.services.metrics import registry, stream_stage_seconds
+from app.services.frame_trace import tracer
 import os
 import platform
+import uuid
+from typing import Optional
+from app.core.config import settings
+
+# cv2, MediaPipe (pose_module) and yt_dlp are imported inside the functions that
+# use them, so workers that only serve auth/history never load them.
 
 router = APIRouter()
 
@@ -15,61 +40,257 @@ cap = None
 analyzer = GaitAnalyzer()
 scorer = AthleticScorer()
 current_source = 0
-is_streaming = False
-is_paused = False
+cap_target = None # What `cap` actually reads: a local copy/proxy, or current_source itself
+cap_lock = threading.RLock() # Serializes read/seek/release on `cap` across threads
+control = StreamControl() # running / paused / stopped
+last_frame_captured_at = None # Wall-clock read time of the newest frame reflected in /stats
+presence = None # PresenceGate of the current producer run
+live_recording_owner = None # (recording_id, user_id): first user to ask for the live recording's download
+live_owner_lock = threading.Lock()
+
+# One producer (capture + inference) shared by all viewers; encoding per viewer.
+# Both use dedicated executors so streams never occupy the anyio threadpool
+# that /stats, auth and the other sync endpoints run on.
+broadcaster = FrameBroadcaster(
+    queue_size=settings.STREAM_VIEWER_QUEUE_SIZE,
+    idle_timeout=settings.STREAM_IDLE_TIMEOUT_SECONDS,
+)
+capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-capture")
+encode_executor = ThreadPoolExecutor(max_workers=settings.STREAM_ENCODE_WORKERS, thread_name_prefix="frame-encode")
+encodes_pending = 0 # Frames handed to encode_executor and not yet encoded (event loop only)
 
 # Ensure Upload Dir Exists
 UPLOAD_DIR = os.path.abspath("static/uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+YOUTUBE_FORMAT = 'best[height<=480][ext=mp4]/best[height<=480]'
+
+# Shared, cached resolver: repeat plays and concurrent viewers skip yt-dlp entirely
+youtube_resolver = StreamResolver(
+    extractor=YtDlpExtractor(
+        force_ipv4=True,
+        extractor_args={'youtube': {'player_client': ['android', 'web']}}, # Try Android for progressive MP4
+    ),
+    ttl=settings.YOUTUBE_URL_TTL_SECONDS,
+    refresh_margin=settings.YOUTUBE_URL_REFRESH_MARGIN_SECONDS,
+)
+
+# Remote clips are downloaded once and replayed from disk
+source_cache = SourceCache(settings.SOURCE_CACHE_DIR, settings.SOURCE_CACHE_MAX_BYTES,
+                           max_seconds=settings.SOURCE_CACHE_MAX_SECONDS)
+
+def is_youtube_url(source):
+    return isinstance(source, str) and ("youtube.com" in source or "youtu.be" in source)
+
 def get_youtube_stream_url(youtube_url):
-    ydl_opts = {
-        'format': 'best[height<=480][ext=mp4]/best[height<=480]',
-        'quiet': True,
-        'noplaylist': True,
-        'force_ipv4': True,
-        'extractor_args': {'youtube': {'player_client': ['android', 'web']}}, # Try Android for progressive MP4
-    }
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(youtube_url, download=False)
-            return info['url']
+        return youtube_resolver.resolve(youtube_url, YOUTUBE_FORMAT)
     except Exception as e:
         print(f"Error fetching YouTube URL: {e}")
         return None
 
-def generate_frames():
-    global cap, analyzer, scorer, is_streaming, is_paused
-    
-    detector = PoseDetector(complexity=1) 
-    pTime = 0
-    
-    while is_streaming:
-        if is_paused:
-            time.sleep(0.1)
-            continue
-            
-        if cap is None or not cap.isOpened():
-            break
+def source_cache_key(source):
+    if is_youtube_url(source):
+        return f"youtube:{video_key(source)}:{YOUTUBE_FORMAT}"
+    return source
+
+def local_copy(source):
+    """
+    Local file to read instead of `source`: the cached download of a remote
+    source, or the analysis proxy of an uploaded video. None if not ready.
+    """
+    if is_youtube_url(source) or is_remote_source(source):
+        return source_cache.lookup(source_cache_key(source))
+    if isinstance(source, str):
+        return proxy_builder.proxy_for(source)
+    return None
+
+def open_source(source):
+    """
+    Capture for `source`, preferring a local copy. A remote source without one
+    is read from the network while it is cached in the background.
+    Returns (capture or None, what was opened).
+    """
+    import cv2
+
+    if is_synthetic_source(source):
+        # Timestamped test frames for latency measurement (bench_latency.py)
+        return SyntheticClockCapture(synthetic_fps(source)), source
+
+    local_path = local_copy(source)
+    if local_path:
+        return cv2.VideoCapture(local_path), local_path
+
+    if is_youtube_url(source) or is_remote_source(source):
+        stream_url = get_youtube_stream_url(source) if is_youtube_url(source) else source
+        if not stream_url:
+            return None, None
+        source_cache.ensure(source_cache_key(source), stream_url)
+        return cv2.VideoCapture(stream_url, cv2.CAP_FFMPEG), stream_url
+
+    # File path or Camera Index
+    if isinstance(source, int) and platform.system() == 'Windows':
+        # Windows requires CAP_DSHOW for some cameras (DroidCam, Iriun)
+        return cv2.VideoCapture(source, cv2.CAP_DSHOW), source
+    return cv2.VideoCapture(source), source
+
+def rewind():
+    """
+    Back to the first frame. If a local copy (download or upload proxy) has
+    become ready in the meantime, reopen from it instead.
+    """
+    global cap, cap_target
+    import cv2
+
+    with cap_lock:
+        local_path = local_copy(current_source)
+        if local_path and local_path != cap_target:
+            if cap: cap.release()
+            cap, cap_target = open_source(current_source)
+        elif cap and cap.isOpened():
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+def new_encoder(target_kbps=None, max_frame_kb=None):
+    from app.services.mjpeg import AdaptiveJpegEncoder
+
+    return AdaptiveJpegEncoder(
+        target_kbps=target_kbps,
+        max_frame_bytes=max_frame_kb * 1024 if max_frame_kb else None,
+        quality=settings.MJPEG_QUALITY,
+        min_quality=settings.MJPEG_MIN_QUALITY,
+        min_scale=settings.MJPEG_MIN_SCALE,
+    )
+
+def produce_frames():
+    """
+    One producer run: annotated frames until the stream stops or the source ends.
+    """
+    with detector_pool.lease(1) as detector:
+        yield from _generate_frames(detector)
+
+def stage_done(name, started, frame=None):
+    elapsed = time.perf_counter() - started
+    stream_stage_seconds.observe(elapsed, name)
+    tracer.complete(name, started, elapsed, frame)
+
+@contextmanager
+def stage(name, frame=None):
+    """
+    Time one pipeline stage: always into the metrics histogram, and into the
+    frame trace while tracing is on.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_done(name, started, frame)
+
+def encode_frame(encoder, frame):
+    with stage("encode", tracer.frame_of(frame)):
+        return encoder.encode(frame)
+
+async def stream_frames(encoder):
+    """
+    Response body. Waits on this viewer's queue (no thread held, also while
+    paused) and encodes on the encode executor.
+    """
+    global encodes_pending
+    subscription = broadcaster.subscribe(produce_frames)
+    loop = asyncio.get_running_loop()
+    last_frame = None
+    try:
+        async for frame in subscription:
+            if frame is last_frame and encoder.last_part:
+                part = encoder.last_part # Repeated frame (empty scene): nothing to re-encode
+            else:
+                encodes_pending += 1
+                try:
+                    part = await loop.run_in_executor(encode_executor, encode_frame, encoder, frame)
+                finally:
+                    encodes_pending -= 1
+            last_frame = frame
+            # Quality/scale follow this client's budget; send time feeds back into it
+            sent_at = time.perf_counter()
+            yield part
+            encoder.sent(len(part), time.perf_counter() - sent_at)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+def read_frame(number=None):
+    """
+    (success, frame, wall-clock time the read finished), or None without a source.
+    """
+    import cv2
 
+    with cap_lock:
+        if cap is None or not cap.isOpened():
+            return None
         try:
-            success, frame = cap.read()
+            with stage("capture", number):
+                success, frame = cap.read()
+            return success, frame, time.time()
         except cv2.error as e:
             print(f"OpenCV Error: {e}")
+            return None
+
+def _generate_frames(detector):
+    global cap, analyzer, scorer, last_frame_captured_at, presence
+    import cv2
+    from app.services.pose_module import draw_graph_overlay
+    from app.services.overlay import TextLayer
+    
+    pTime = 0
+    stats_text = TextLayer() # Re-rendered only when FPS/steps change
+    presence = PresenceGate(
+        empty_after=settings.PRESENCE_EMPTY_FRAMES,
+        probe_interval=settings.PRESENCE_PROBE_INTERVAL,
+        motion_fraction=settings.PRESENCE_MOTION_FRACTION,
+    ) if settings.PRESENCE_GATE_ENABLED else None
+    gate = presence
+    last_output = None
+    
+    number = 0
+    pending = capture_executor.submit(read_frame, number)
+    while control.wait_active():
+        frame_started = time.perf_counter()
+        tracer.begin_frame(number)
+        with stage("capture_wait"): # Non-zero when decoding is slower than analysis
+            result = pending.result()
+        if result is None:
             break
+        success, frame, captured_at = result
             
         if not success:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            rewind()
+            pending = capture_executor.submit(read_frame, number)
             continue
 
-        frame = cv2.resize(frame, (800, 600))
+        # Decode the next frame while this one is analyzed
+        pending = capture_executor.submit(read_frame, number + 1)
+
+        # Upload proxies/cached downloads are 800px wide, so this resize is cheap
+        if frame.shape[1] != 800 or frame.shape[0] != 600:
+            with stage("resize"):
+                frame = cv2.resize(frame, (800, 600))
+
+        # Empty scene and nothing moving: repeat the last output, skip inference
+        if gate is not None:
+            with stage("presence"):
+                analyze = gate.should_analyze(frame)
+            if not analyze and last_output is not None:
+                yield last_output
+                continue
         
         # 1. Detection
-        frame = detector.find_pose(frame)
-        lm_list = detector.find_position(frame, draw=False)
-        world_lms = detector.find_world_pose()
+        with stage("find_pose"):
+            frame = detector.find_pose(frame)
+            lm_list = detector.find_position(frame, draw=False)
+            world_lms = detector.find_world_pose()
+        if gate is not None:
+            gate.observe(len(lm_list) > 0)
         
         # 2. Angle Calc
+        angles_started = time.perf_counter()
         r_knee = 180
         r_hip = 180
         if len(lm_list) != 0:
@@ -82,7 +303,7 @@ def generate_frames():
         fps = 1 / (cTime - pTime) if (cTime - pTime) > 0 else 0
         pTime = cTime
         
-        if world_lms:
+        if world_lms is not None:
             # 3. Calculate Biomechanics
             # A. Arm Swing (Right: Shoulder 12, Elbow 14, Wrist 16)
             # We need pixel coords for 2D angle (visual) or world coords for 3D. 
@@ -116,10 +337,17 @@ def generate_frames():
                  vertical_pt = (r_hip_pt[0], r_hip_pt[1] - 100)
                  from app.services.utils import calculate_angle
                  trunk_angle = calculate_angle(vertical_pt, r_hip_pt, r_shoulder_pt)
+            stage_done("angles", angles_started)
 
-            analyzer.update(world_lms, fps, r_knee, r_hip, arm_angle=r_arm_angle, trunk_angle=trunk_angle)
+            with stage("gait_update"):
+                analyzer.update(world_lms, fps, r_knee, r_hip, arm_angle=r_arm_angle, trunk_angle=trunk_angle)
+        else:
+            stage_done("angles", angles_started)
+            analyzer.no_pose()
+        last_frame_captured_at = captured_at
             
         # 4. Draw Overlays (Enhanced with Multiple Graphs)
+        overlay_started = time.perf_counter()
         # We can draw two graphs side-by-side or stacked
         if analyzer.knee_angles_history:
             # Knee Graph (Green)
@@ -130,18 +358,63 @@ def generate_frames():
             frame = draw_graph_overlay(frame, analyzer.hip_angles_history, color=(255, 0, 0), title="R. Hip", max_val=180, offset_y=130)
 
         # Stats Overlay
-        cv2.putText(frame, f"FPS: {int(fps)}", (10, 30), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
-        cv2.putText(frame, f"Steps: {analyzer.step_count}", (10, 60), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
+        stats_text.draw(frame, [
+            (f"FPS: {int(fps)}", (10, 30), 1.5, (0, 255, 0), 2),
+            (f"Steps: {analyzer.step_count}", (10, 60), 1.5, (0, 255, 0), 2),
+        ])
+        stage_done("overlay", overlay_started)
 
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        tracer.begin_frame(number, frame) # Lets encode threads tag their spans with the number
+        tracer.complete("frame", frame_started, time.perf_counter() - frame_started)
+        number += 1
+        last_output = frame
+        yield frame
+
+def collect_stream_metrics():
+    stats = broadcaster.stats()
+    yield ("pose_stream_active", "gauge", "Live stream producers currently running.",
+           [({}, int(stats["active"]))])
+    yield ("pose_stream_viewers", "gauge", "Clients currently receiving the live stream.",
+           [({}, stats["viewers"])])
+    yield ("pose_stream_state", "gauge", "Live stream control state (1 for the current one).",
+           [({"state": state}, int(control.state == state)) for state in (RUNNING, PAUSED, STOPPED)])
+    yield ("pose_stream_queue_depth", "gauge", "Frames waiting in each live stream queue.", [
+        ({"queue": "viewers"}, stats["queued"]),
+        ({"queue": "encode"}, encodes_pending),
+    ])
+    yield ("pose_stream_frames_total", "counter", "Frames produced by the live stream pipeline.",
+           [({}, stats["frames"])])
+    yield ("pose_stream_dropped_frames_total", "counter", "Frames dropped for viewers that fell behind.",
+           [({}, stats["dropped_total"])])
+    gate = presence
+    if gate is not None:
+        yield ("pose_stream_scene_active", "gauge", "1 while a person is in view (pose inference on every frame).",
+               [({}, int(gate.active))])
+        yield ("pose_stream_inference_skipped_total", "counter", "Frames not analyzed because the scene was empty and static.",
+               [({}, gate.skipped)])
+    yield ("pose_detector_pool_idle", "gauge", "Idle pre-built pose detectors per model complexity.",
+           [({"complexity": complexity}, idle) for complexity, idle in sorted(detector_pool.stats().items())])
+
+registry.add_collector(collect_stream_metrics)
+
+def new_analyzer(record=False):
+    """
+    Fresh GaitAnalyzer; with record=True every frame is streamed to its own
+    directory under RECORDINGS_DIR so full sessions can be exported.
+    """
+    global analyzer
+    if analyzer:
+        analyzer.stop_recording()
+    record_dir = os.path.join(settings.RECORDINGS_DIR, uuid.uuid4().hex) if record else None
+    analyzer = GaitAnalyzer(record_dir=record_dir)
+    return analyzer
 
 @router.get("/video_feed")
-def video_feed(source: str = Query("0")):
-    global cap, current_source, is_streaming, analyzer, is_paused
+def video_feed(source: str = Query("0"), record: bool = Query(False),
+               target_kbps: Optional[int] = Query(None, ge=64),
+               max_frame_kb: Optional[int] = Query(None, ge=4),
+               trace: bool = Query(False)):
+    global cap, current_source, cap_target, analyzer
     
     new_source = source
     if source.isdigit():
@@ -155,59 +428,116 @@ def video_feed(source: str = Query("0")):
         pass # It's a string (URL or path)
 
     if cap is None or not cap.isOpened() or current_source != new_source:
-        if cap: cap.release()
-        
-        if isinstance(new_source, str) and ("youtube.com" in new_source or "youtu.be" in new_source):
-             print(f"Processing YouTube: {new_source}")
-             stream_url = get_youtube_stream_url(new_source)
-             if stream_url:
-                 cap = cv2.VideoCapture(stream_url, cv2.CAP_FFMPEG)
-             else:
-                 # Fallback/Error
-                 pass
-        else:
-            # File path or Camera Index
-            if isinstance(new_source, int) and platform.system() == 'Windows':
-                # Windows requires CAP_DSHOW for some cameras (DroidCam, Iriun)
-                cap = cv2.VideoCapture(new_source, cv2.CAP_DSHOW)
-            else:
-                cap = cv2.VideoCapture(new_source)
+        if is_youtube_url(new_source) or is_remote_source(new_source):
+             print(f"Processing remote source: {new_source}")
+        with cap_lock:
+            if cap: cap.release()
+            cap, cap_target = open_source(new_source)
             
         current_source = new_source
-        analyzer = GaitAnalyzer() 
+        new_analyzer(record)
+        tracer.enabled = settings.STREAM_TRACE
+    elif record and not analyzer.recorder:
+        analyzer.start_recording(os.path.join(settings.RECORDINGS_DIR, uuid.uuid4().hex))
     
-    is_streaming = True
-    is_paused = False
-    return StreamingResponse(generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+    if trace:
+        tracer.enable()
+    control.start()
+    encoder = new_encoder(target_kbps, max_frame_kb)
+    return StreamingResponse(stream_frames(encoder), media_type="multipart/x-mixed-replace; boundary=frame")
+
+@router.post("/prefetch")
+def prefetch_source(source: str = Query(...)):
+    """
+    Resolve a YouTube source in the background so the next video_feed starts immediately.
+    """
+    if is_youtube_url(source):
+        youtube_resolver.prefetch(source, YOUTUBE_FORMAT)
+    return {"message": "Prefetch started"}
 
 @router.post("/stop")
 def stop_stream():
-    global is_streaming, cap
-    is_streaming = False
-    if cap:cap.release()
+    global cap, analyzer
+    control.stop()
+    # Waits for a read in progress (at most one frame), then frees the device/file
+    with cap_lock:
+        if cap: cap.release()
+    # Close the rep in progress so /stats and the recording's reps.json include it
+    analyzer.segmenter.finish(time.time())
+    if analyzer.recorder:
+        analyzer.write_segments()
+        analyzer.recorder.flush()
     return {"message": "Stream stopped"}
 
 @router.post("/pause")
 def pause_stream():
-    global is_paused
-    is_paused = True
+    control.pause()
     return {"message": "Stream paused"}
 
 @router.post("/resume")
 def resume_stream():
-    global is_paused
-    is_paused = False
+    control.resume()
     return {"message": "Stream resumed"}
 
 @router.post("/restart")
 def restart_stream():
-    global analyzer, is_paused, cap
-    analyzer = GaitAnalyzer()
-    is_paused = False
-    if cap and cap.isOpened():
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    global analyzer
+    new_analyzer(record=analyzer.recorder is not None)
+    control.resume()
+    rewind()
     return {"message": "Stream restarted"}
 
+@router.get("/trace")
+def get_trace(clear: bool = Query(False)):
+    """
+    Spans recorded so far as Chrome trace JSON (open in ui.perfetto.dev).
+    Tracing is enabled with video_feed?trace=true or STREAM_TRACE.
+    """
+    trace = tracer.export()
+    if clear:
+        tracer.clear()
+    return JSONResponse(trace, headers={"Content-Disposition": 'attachment; filename="stream-trace.json"'})
+
+STREAM_THREAD_PREFIXES = ("frame-producer", "frame-capture", "frame-encode")
+
+def profile_label(thread):
+    # Live stream threads are grouped under their session; everything else is request handling
+    if thread.name.startswith(STREAM_THREAD_PREFIXES):
+        session = analyzer.recorder.recording_id if analyzer.recorder else current_source
+        return f"stream {session}"
+    return "server"
+
+@router.get("/profile")
+async def profile_process(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    include_idle: bool = Query(False),
+    current_user: User = Depends(deps.get_current_user_async),
+):
+    """
+    Sample every thread of this process for `seconds` (admin only).
+    Returns collapsed stacks for flamegraph.pl / speedscope, rooted at the
+    stream session (or "server") each thread belongs to.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS:g}")
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    # Runs on the loop's default executor: no anyio worker is held while sampling
+    loop = asyncio.get_running_loop()
+    try:
+        collapsed, samples = await loop.run_in_executor(
+            None, profiler.profile, seconds, interval_ms / 1000, profile_label, include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapsed, headers={
+        "Content-Disposition": 'attachment; filename="profile.folded"',
+        "X-Profile-Samples": str(samples),
+    })
+
 @router.get("/stats")
 def get_stats():
     global analyzer, scorer
@@ -242,11 +572,16 @@ def get_stats():
             "arm_angle": int(analyzer.current_arm_angle),
             "trunk_angle": int(analyzer.current_trunk_angle),
             "world_landmarks": [
-                {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility} 
-                for lm in analyzer.current_world_landmarks
-            ] if analyzer.current_world_landmarks else []
+                {"x": x, "y": y, "z": z, "visibility": visibility} 
+                for x, y, z, visibility in analyzer.current_world_landmarks.tolist()
+            ] if analyzer.current_world_landmarks is not None else []
         },
         "graph_data": analyzer.get_graph_data(),
+        "recording_id": analyzer.recorder.recording_id if analyzer.recorder else None,
+        "frame_captured_at": last_frame_captured_at,
+        "presence": presence.stats() if presence else None,
+        "reps": analyzer.segmenter.summary(),
+        "cycle_count": analyzer.cycles.count, # Envelope itself: /stream/cycles
         "feedback": get_feedback({
             "cadence": int(analyzer.cadence),
             "biomechanics": {
@@ -259,14 +594,60 @@ def get_stats():
         })
     }
 
+@router.get("/cycles")
+def get_cycles():
+    """
+    Mean and standard deviation of the knee/hip/arm/trunk angles over the
+    strides seen so far, at 0-100 % of the gait cycle.
+    """
+    return analyzer.cycles.profile()
+
+def claim_live_recording(recording_id, user):
+    """
+    Owner of the live (not yet saved) recording. The video feed is opened
+    without credentials, so the first user to request the download claims it.
+    """
+    global live_recording_owner
+    with live_owner_lock:
+        if live_recording_owner is None or live_recording_owner[0] != recording_id:
+            live_recording_owner = (recording_id, user.id)
+        return live_recording_owner[1]
+
+def check_recording_access(owner_id, user):
+    if owner_id != user.id and user.role not in [UserRole.ADMIN, UserRole.MANAGEMENT, UserRole.COACH]:
+        raise HTTPException(status_code=403, detail="Not authorized to view other users' data")
+
+@router.get("/recordings/{recording_id}/export")
+def export_recording(
+    recording_id: str,
+    format: str = Query("csv"),
+    compress: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Telemetry of a recording: the one being streamed now (its owner), or a
+    saved session's (owner, or Coach/Management/Admin, as /history/{id}/export).
+    """
+    live = analyzer.recorder is not None and analyzer.recorder.recording_id == recording_id
+    session = db.query(AnalysisSession).filter(AnalysisSession.recording_id == recording_id).first()
+    if session:
+        check_recording_access(session.user_id, current_user)
+    elif live:
+        check_recording_access(claim_live_recording(recording_id, current_user), current_user)
+    else:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    if live:
+        # Push queued rows to disk before the export reads them
+        analyzer.recorder.flush()
+    return telemetry_export.export_response(recording_id, format, compress)
+
 @router.post("/export_csv")
-def export_csv():
+def export_csv(current_user: User = Depends(deps.get_current_user)):
     global analyzer
-    filename = os.path.join(UPLOAD_DIR, "analysis_latest.csv")
-    try:
-        analyzer.save_csv(filename)
-        # Using FileResponse to safeguard file access
-        return {"download_url": "/static/uploads/analysis_latest.csv"}
-    except Exception as e:
-        print(f"Export Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if not analyzer.recorder:
+        raise HTTPException(status_code=404, detail="Stream is not being recorded (start video_feed with record=true)")
+    recording_id = analyzer.recorder.recording_id
+    check_recording_access(claim_live_recording(recording_id, current_user), current_user)
+    # Each recording has its own streamed download; nothing is written to static/
+    return {"download_url": f"{settings.API_V1_STR}/stream/recordings/{recording_id}/export?format=csv"}
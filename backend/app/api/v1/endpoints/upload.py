@@ -1,7 +1,9 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+import json
 import shutil
 import os
 import uuid
+from app.services.media_proxy import proxy_builder, proxy_path, sprite_paths
 
 router = APIRouter()
 
@@ -18,6 +20,9 @@ async def upload_file(file: UploadFile = File(...)):
         
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+
+        # Analysis proxy + thumbnail sprite are built in the background
+        proxy_builder.submit(file_path)
             
         return {
             "filename": unique_filename,
@@ -25,3 +30,27 @@ async def upload_file(file: UploadFile = File(...)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{filename}/media")
+def get_upload_media(filename: str):
+    """
+    Proxy/sprite status for an upload; URLs are set once the files exist.
+    """
+    file_path = os.path.join(UPLOAD_DIR, os.path.basename(filename))
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    def static_url(path):
+        return f"/static/uploads/{os.path.basename(path)}" if os.path.exists(path) else None
+
+    sprite_image, sprite_manifest = sprite_paths(file_path)
+    sprite = None
+    if os.path.exists(sprite_manifest):
+        with open(sprite_manifest) as f:
+            sprite = json.load(f)
+        sprite["url"] = static_url(sprite_image)
+    return {
+        "status": proxy_builder.status(file_path),
+        "proxy_url": static_url(proxy_path(file_path)),
+        "sprite": sprite,
+    }
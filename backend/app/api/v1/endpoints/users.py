@@ -5,6 +5,7 @@ from app.api import deps
 from app.crud import crud_user
 from app.models.user import User as UserModel
 from app.schemas import user as user_schema
+from app.services.response_cache import response_cache, ORG_TAG
 
 router = APIRouter()
 
@@ -33,6 +34,7 @@ def create_user(
             detail="The user with this username already exists in the system.",
         )
     user = crud_user.create(db, obj_in=user_in)
+    response_cache.invalidate(ORG_TAG) # Athlete count in /organization/summary
     return user
 
 @router.put("/me", response_model=user_schema.User)
@@ -46,6 +48,7 @@ def update_user_me(
     Update own user.
     """
     user = crud_user.update(db, db_obj=current_user, obj_in=user_in)
+    response_cache.invalidate(ORG_TAG) # Role/name shown in organization views
     return user
 
 @router.get("/athletes", response_model=List[user_schema.User])
@@ -1,16 +1,109 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Smart Sprint Training System"
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "YOUR_SUPER_SECRET_KEY_CHANGE_THIS_IN_PROD"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8 # 8 Days
-    
+
     # Database
     # Default to SQLite for local dev ease, change to POSTGRES in env
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./sql_app.db"
-    
+
+    # Connection Pool (ignored for SQLite, which keeps SQLAlchemy's defaults)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds, avoids stale server-side connections
+
+    # SQLite tuning (WAL lets readers run while /history/save is writing)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Async read path for history/organization endpoints.
+    # Needs an async driver: aiosqlite (SQLite) or asyncpg (PostgreSQL).
+    DB_ASYNC_READS: bool = False
+    ASYNC_DATABASE_URI: Optional[str] = None # Derived from SQLALCHEMY_DATABASE_URI when empty
+
+    # Response cache for history/organization lists (per worker, ETag + 304)
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+
+    # Full-session telemetry recordings (chunked CSV per stream)
+    RECORDINGS_DIR: str = "recordings"
+    EXPORTS_DIR: str = "exports" # Bulk organization export archives
+    EXPORT_RETENTION_SECONDS: float = 24 * 3600 # Finished jobs and their archives are then deleted
+
+    # Pose detector warm pool: pre-built PoseDetectors per model complexity,
+    # created in the background after startup so the first frame is not slow
+    POSE_POOL_COMPLEXITIES: List[int] = [1]
+    POSE_POOL_SIZE: int = 2 # Per complexity
+    POSE_POOL_WARM_ON_STARTUP: bool = True
+
+    # Pose estimation backend: "mediapipe" (default) or "onnx" (COCO-17 keypoint
+    # model such as MoveNet on ONNX Runtime CPU; needs the onnxruntime package)
+    POSE_BACKEND: str = "mediapipe"
+    POSE_ONNX_MODEL: Optional[str] = None
+    POSE_ONNX_THREADS: int = 2 # intra-op threads per detector
+    POSE_ONNX_MIN_SCORE: float = 0.3 # Mean torso keypoint score below which nobody is detected
+
+    # YouTube stream URL cache (signed URLs also carry their own expiry)
+    YOUTUBE_URL_TTL_SECONDS: float = 3600.0
+    YOUTUBE_URL_REFRESH_MARGIN_SECONDS: float = 300.0
+
+    # Local copies of remote sources (YouTube/HTTP), transcoded to analysis size.
+    # Replays and restarts read from disk; least recently used clips are evicted.
+    # Live or unsized sources are never cached; longer clips are skipped
+    SOURCE_CACHE_DIR: str = "source_cache"
+    SOURCE_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    SOURCE_CACHE_MAX_SECONDS: float = 3600.0
+
+    # MJPEG output: starting JPEG quality and the floor the per-client encoder
+    # may lower quality/scale to when a client asks for a bitrate or is slow
+    MJPEG_QUALITY: int = 80
+    MJPEG_MIN_QUALITY: int = 30
+    MJPEG_MIN_SCALE: float = 0.5
+
+    # Live stream fan-out: one producer thread, per-viewer frame queues,
+    # JPEG encoding on its own small pool (never the anyio threadpool)
+    STREAM_VIEWER_QUEUE_SIZE: int = 2
+    STREAM_ENCODE_WORKERS: int = 4
+    STREAM_IDLE_TIMEOUT_SECONDS: float = 2.0 # Producer stops this long after the last viewer leaves
+
+    # Presence gating: after PRESENCE_EMPTY_FRAMES analyzed frames without a
+    # person, pose inference only runs on frames with motion (low-res frame
+    # differencing) or every PRESENCE_PROBE_INTERVAL-th frame
+    PRESENCE_GATE_ENABLED: bool = True
+    PRESENCE_EMPTY_FRAMES: int = 15
+    PRESENCE_PROBE_INTERVAL: int = 15
+    PRESENCE_MOTION_FRACTION: float = 0.002 # Share of (80x60) pixels that must change
+
+    # Prometheus text-format metrics at /metrics (stage latencies, queues, DB pool)
+    METRICS_ENABLED: bool = True
+
+    # Frame-level tracing (Chrome trace JSON at /stream/trace). Off by default;
+    # video_feed?trace=true turns it on for a single stream
+    STREAM_TRACE: bool = False
+    STREAM_TRACE_MAX_EVENTS: int = 200_000 # Ring buffer size; oldest spans are dropped
+
+    # Admin sampling profiler (/stream/profile)
+    PROFILER_MAX_SECONDS: float = 60.0
+
+    # Session comparison (/history/compare): recordings are resampled to
+    # COMPARE_SAMPLE_HZ (fewer points for long sessions) and aligned by DTW
+    # within COMPARE_DTW_BAND of the diagonal. Results are cached per pair
+    COMPARE_SAMPLE_HZ: float = 15.0
+    COMPARE_MAX_POINTS: int = 2000
+    COMPARE_DTW_BAND: float = 0.1 # Fraction of the longer series
+    COMPARE_CACHE_TTL_SECONDS: float = 600.0
+
+    # Gait-cycle similarity search (/history/{id}/similar): exact brute force,
+    # switching to an inverted-file index from this many sessions on
+    SIMILARITY_ANN_MIN_SESSIONS: int = 50000
+    SIMILARITY_ANN_PROBES: int = 8 # Cells searched per query once the index is approximate
+
     class Config:
         case_sensitive = True
         env_file = ".env"
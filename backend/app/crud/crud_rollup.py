@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.rollup import OrganizationRollup, DailyRollup, AthleteRollup
+from app.models.session import AnalysisSession
+from app.models.user import User, UserRole
+
+ORG_ROW_ID = 1
+
+# All writers below only flush; the caller's commit makes the rollup update
+# atomic with the change that triggered it.
+
+def _insert_missing(db: Session, row) -> bool:
+    """
+    INSERT `row` in a savepoint. False if another writer created it first
+    (unique key), leaving the surrounding transaction usable.
+    """
+    try:
+        with db.begin_nested():
+            db.add(row)
+        return True
+    except IntegrityError:
+        return False
+
+def _increment(db: Session, model, key_filter, values: Dict[Any, Any], defaults: Dict[str, Any]) -> None:
+    """
+    UPDATE ... SET col = col + delta, inserting the row first if it does not exist.
+    """
+    changes = {getattr(model, col): getattr(model, col) + delta for col, delta in values.items()}
+    if db.query(model).filter(key_filter).update(changes, synchronize_session=False):
+        return
+    if not _insert_missing(db, model(**defaults, **values)):
+        # Another writer created the row first
+        db.query(model).filter(key_filter).update(changes, synchronize_session=False)
+
+def adjust_athlete_count(db: Session, delta: int) -> None:
+    _increment(db, OrganizationRollup, OrganizationRollup.id == ORG_ROW_ID,
+               {"total_athletes": delta}, {"id": ORG_ROW_ID, "total_sessions": 0, "score_sum": 0.0})
+
+def record_session(db: Session, session: AnalysisSession) -> None:
+    """
+    Fold a newly inserted session into the organization, daily and athlete rollups.
+    """
+    created_at = session.created_at or datetime.utcnow()
+    day = created_at.date()
+    score = session.technique_score or 0.0
+
+    athlete_row = db.query(AthleteRollup).filter(AthleteRollup.user_id == session.user_id).with_for_update()
+    athlete = athlete_row.first()
+    if athlete is None:
+        # First session of this athlete; a concurrent first save may insert the row too
+        _insert_missing(db, AthleteRollup(user_id=session.user_id, session_count=0, score_sum=0.0, best_score=0.0))
+        athlete = athlete_row.first()
+    first_today = athlete.last_session_at is None or athlete.last_session_at.date() < day
+    athlete.session_count += 1
+    athlete.score_sum += score
+    athlete.best_score = max(athlete.best_score, score)
+    if athlete.last_session_at is None or created_at > athlete.last_session_at:
+        athlete.last_session_at = created_at
+
+    _increment(db, OrganizationRollup, OrganizationRollup.id == ORG_ROW_ID,
+               {"total_sessions": 1, "score_sum": score}, {"id": ORG_ROW_ID, "total_athletes": 0})
+    _increment(db, DailyRollup, DailyRollup.day == day,
+               {"session_count": 1, "score_sum": score, "active_users": 1 if first_today else 0}, {"day": day})
+    db.flush()
+
+def rebuild(db: Session) -> None:
+    """
+    Recompute every rollup from the base tables (one-off, e.g. for an existing database).
+    """
+    db.query(AthleteRollup).delete()
+    db.query(DailyRollup).delete()
+    db.query(OrganizationRollup).delete()
+
+    total_athletes = db.query(func.count(User.id)).filter(User.role == UserRole.ATHLETE).scalar() or 0
+    total_sessions, score_sum = db.query(
+        func.count(AnalysisSession.id), func.coalesce(func.sum(AnalysisSession.technique_score), 0.0)
+    ).one()
+    db.add(OrganizationRollup(id=ORG_ROW_ID, total_athletes=total_athletes,
+                              total_sessions=total_sessions, score_sum=score_sum))
+
+    for user_id, count, total, best, last in db.query(
+        AnalysisSession.user_id,
+        func.count(AnalysisSession.id),
+        func.coalesce(func.sum(AnalysisSession.technique_score), 0.0),
+        func.coalesce(func.max(AnalysisSession.technique_score), 0.0),
+        func.max(AnalysisSession.created_at),
+    ).group_by(AnalysisSession.user_id):
+        db.add(AthleteRollup(user_id=user_id, session_count=count, score_sum=total,
+                             best_score=best, last_session_at=last))
+
+    day_col = func.date(AnalysisSession.created_at)
+    for day, count, total, users in db.query(
+        day_col,
+        func.count(AnalysisSession.id),
+        func.coalesce(func.sum(AnalysisSession.technique_score), 0.0),
+        func.count(func.distinct(AnalysisSession.user_id)),
+    ).group_by(day_col):
+        if isinstance(day, str):
+            day = datetime.strptime(day, "%Y-%m-%d").date()
+        db.add(DailyRollup(day=day, session_count=count, score_sum=total, active_users=users))
+    db.commit()
+
+def ensure_initialized(db: Session) -> None:
+    if db.query(OrganizationRollup).filter(OrganizationRollup.id == ORG_ROW_ID).first() is None:
+        rebuild(db)
@@ -1,7 +1,8 @@
 from typing import Any, Dict, Optional, Union
 from sqlalchemy.orm import Session
 from app.core.security import get_password_hash, verify_password
-from app.models.user import User
+from app.models.user import User, UserRole
+from app.crud import crud_rollup
 from app.schemas.user import UserCreate, UserUpdate
 
 def get_by_email(db: Session, *, email: str) -> Optional[User]:
@@ -21,6 +22,8 @@ def create(db: Session, *, obj_in: UserCreate) -> User:
         personal_best=obj_in.personal_best
     )
     db.add(db_obj)
+    if db_obj.role == UserRole.ATHLETE:
+        crud_rollup.adjust_athlete_count(db, 1)
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -37,10 +40,15 @@ def update(db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
 
+    was_athlete = db_obj.role == UserRole.ATHLETE
     for field in update_data:
         if hasattr(db_obj, field):
             setattr(db_obj, field, update_data[field])
 
+    is_athlete = db_obj.role == UserRole.ATHLETE
+    if was_athlete != is_athlete:
+        crud_rollup.adjust_athlete_count(db, 1 if is_athlete else -1)
+
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
@@ -0,0 +1,44 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Keyset (cursor) pagination over (created_at DESC, id DESC).
+# The cursor is the sort key of the last row already returned, so the next
+# page is an index range scan instead of an OFFSET that walks skipped rows.
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def apply_keyset(stmt, created_col, id_col, cursor: Optional[str]):
+    """
+    Order a select() newest first and, if a cursor is given, start after it.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id),
+            )
+        )
+    return stmt.order_by(created_col.desc(), id_col.desc())
+
+def next_cursor(rows, limit: int, key=lambda row: row) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None when this was the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = key(rows[-1])
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,21 @@
+from sqlalchemy import inspect, text
+
+def upgrade_schema(engine, tables):
+    """
+    Bring existing tables up to date with the models (dev substitute for Alembic).
+    create_all() skips tables that already exist, so this adds the indexes and
+    nullable columns introduced since the table was first created.
+    """
+    inspector = inspect(engine)
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
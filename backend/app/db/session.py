@@ -1,12 +1,101 @@
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.SQLALCHEMY_DATABASE_URI else {}
-)
+def _is_sqlite(uri: str) -> bool:
+    return uri.startswith("sqlite")
+
+def _engine_kwargs(uri: str) -> dict:
+    """
+    Engine options per backend.
+    SQLite: one file, so pool tuning is pointless; only allow cross-thread use.
+    PostgreSQL (and others): sized pool with pre-ping and recycling.
+    """
+    if _is_sqlite(uri):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+class PoolMetrics:
+    """
+    Counts pool checkouts/checkins via SQLAlchemy pool events.
+    Read with snapshot(); cheap enough to leave on in production.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def attach(self, target_engine):
+        event.listen(target_engine, "connect", self.on_connect)
+        event.listen(target_engine, "checkout", self.on_checkout)
+        event.listen(target_engine, "checkin", self.on_checkin)
+        event.listen(target_engine, "invalidate", self.on_invalidate)
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        # QueuePool exposes its configured size and current overflow
+        if pool is not None and hasattr(pool, "size"):
+            data["pool_size"] = pool.size()
+            data["overflow"] = pool.overflow()
+        return data
+
+def _build_engine(uri: str):
+    new_engine = create_engine(uri, **_engine_kwargs(uri))
+    if _is_sqlite(uri):
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+engine = _build_engine(settings.SQLALCHEMY_DATABASE_URI)
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -17,3 +106,65 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_pool_status() -> dict:
+    return pool_metrics.snapshot(engine.pool)
+
+# --- Optional async engine (read-heavy endpoints) ---
+
+def _async_uri(uri: str) -> str:
+    if settings.ASYNC_DATABASE_URI:
+        return settings.ASYNC_DATABASE_URI
+    if uri.startswith("sqlite:"):
+        return uri.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if uri.startswith("postgresql://") or uri.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + uri.split("://", 1)[1]
+    return uri
+
+async_engine = None
+AsyncSessionLocal = None
+async_pool_metrics = PoolMetrics() # Own counters: the two pools are sized and drained separately
+
+if settings.DB_ASYNC_READS:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    _async_url = _async_uri(settings.SQLALCHEMY_DATABASE_URI)
+    async_engine = create_async_engine(_async_url, **_engine_kwargs(_async_url))
+    if _is_sqlite(_async_url):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    async_pool_metrics.attach(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+def get_pool_statuses() -> dict:
+    """
+    Pool status per engine ("sync", and "async" when DB_ASYNC_READS is on).
+    """
+    statuses = {"sync": get_pool_status()}
+    if async_engine is not None:
+        statuses["async"] = async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+    return statuses
+
+async def get_read_db():
+    """
+    Session for read-only endpoints.
+    Yields an AsyncSession when DB_ASYNC_READS is on, else a regular Session.
+    Use execute_read() so callers work with either.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def execute_read(db, statement):
+    """
+    Run a select() on either session type without blocking the event loop.
+    Sync sessions are pushed to the threadpool; async sessions are awaited.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(db.execute, statement)
+    return await db.execute(statement)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -6,9 +6,19 @@ from app.core.config import settings
 from app.db.session import engine, Base
 from app.models.user import User  # IMPORT MODEL HERE to register it with Base
 from app.models.session import AnalysisSession
+from app.models import rollup  # noqa: F401 (registers rollup tables)
+from app.db.session import SessionLocal, get_pool_statuses
+from app.db.schema import upgrade_schema
+from app.crud import crud_rollup
+from app.services.metrics import registry, CONTENT_TYPE
 
 # Create Tables (For dev simplicity, use Alembic in prod)
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine, [AnalysisSession.__table__])
+
+# Backfill rollup tables once for databases created before they existed
+with SessionLocal() as _db:
+    crud_rollup.ensure_initialized(_db)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -32,12 +42,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Disposition"],
 )
 
+@app.on_event("startup")
+def warm_pose_detectors():
+    # Builds MediaPipe graphs in a background thread; startup does not wait for it
+    if settings.POSE_POOL_WARM_ON_STARTUP:
+        from app.services.detector_pool import detector_pool
+        detector_pool.warm_in_background()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to Smart Sprint Training System API"}
 
+def collect_db_pool_metrics():
+    statuses = get_pool_statuses()
+
+    def samples(name):
+        return [({"engine": label}, status[name]) for label, status in statuses.items() if name in status]
+
+    yield ("db_pool_checked_out", "gauge", "Database connections currently checked out.",
+           samples("checked_out"))
+    yield ("db_pool_checked_out_peak", "gauge", "Most database connections checked out at once.",
+           samples("peak_checked_out"))
+    yield ("db_pool_checkouts_total", "counter", "Database connection checkouts.",
+           samples("checkouts"))
+    yield ("db_pool_invalidations_total", "counter", "Database connections invalidated.",
+           samples("invalidations"))
+    if samples("pool_size"):
+        yield ("db_pool_size", "gauge", "Configured database pool size.", samples("pool_size"))
+        yield ("db_pool_overflow", "gauge", "SQLAlchemy pool overflow (negative while below the pool size).",
+               samples("overflow"))
+
+registry.add_collector(collect_db_pool_metrics)
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
 # Include Routers (will add later)
 from app.api.v1.api import api_router
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from app.db.session import Base
+
+# Rollups are maintained in the same transaction as the session insert
+# (see crud_rollup.record_session), so the dashboards read a handful of rows
+# instead of scanning analysis_sessions.
+
+class OrganizationRollup(Base):
+    __tablename__ = "organization_rollup"
+
+    id = Column(Integer, primary_key=True) # Single row, id=1
+    total_athletes = Column(Integer, default=0, nullable=False)
+    total_sessions = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+
+    day = Column(Date, primary_key=True) # UTC date, same clock as AnalysisSession.created_at
+    session_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    active_users = Column(Integer, default=0, nullable=False) # Distinct users with a session that day
+
+class AthleteRollup(Base):
+    __tablename__ = "athlete_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    session_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    best_score = Column(Float, default=0.0, nullable=False)
+    last_session_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 from datetime import datetime
@@ -24,7 +24,44 @@ class AnalysisSession(Base):
     # File Path (Optional, for replay)
     video_path = Column(String, nullable=True)
 
+    # Per-frame telemetry recorded during the stream (directory name under RECORDINGS_DIR)
+    recording_id = Column(String, nullable=True)
+
+    # Gait-cycle envelope: float32 mean/std of shape gait_cycles.PROFILE_SHAPE
+    cycle_profile = Column(LargeBinary, nullable=True)
+    cycle_count = Column(Integer, nullable=True)
+
     # Feedback
     coach_notes = Column(String, nullable=True)
 
     owner = relationship("User", back_populates="sessions")
+
+    __table_args__ = (
+        # Per-athlete history, newest first (history.read_sessions)
+        Index("ix_analysis_sessions_user_created", "user_id", "created_at"),
+        # Organization-wide feed, newest first (organization.recent-sessions)
+        Index("ix_analysis_sessions_created_at", "created_at"),
+    )
+
+class SessionRep(Base):
+    """
+    One rep (run) of a session, split out by the stream's rep segmenter.
+    """
+    __tablename__ = "session_reps"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("analysis_sessions.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False) # Copied from the session for per-athlete queries
+    rep_index = Column(Integer, nullable=False)
+    start_offset = Column(Float, default=0.0) # Seconds from the start of the stream
+    duration_seconds = Column(Float, default=0.0)
+    steps = Column(Integer, default=0)
+    cadence = Column(Float, default=0.0)
+    avg_gct = Column(Float, default=0.0)
+    avg_stride_length = Column(Float, default=0.0)
+    technique_score = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index("ix_session_reps_session", "session_id", "rep_index"),
+        Index("ix_session_reps_user", "user_id", "session_id"),
+    )
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class SessionBase(BaseModel):
     duration_seconds: float = 0.0
@@ -12,9 +12,36 @@ class SessionBase(BaseModel):
     max_hip_error: float = 0.0
     video_path: Optional[str] = None
     coach_notes: Optional[str] = None
+    recording_id: Optional[str] = Field(None, pattern=r"^[0-9a-f]{32}$") # From /stream/stats
+
+class RepBase(BaseModel):
+    rep_index: int = Field(alias="index")
+    start_offset: float = Field(0.0, alias="start")
+    duration_seconds: float = Field(0.0, alias="duration")
+    steps: int = 0
+    cadence: float = 0.0
+    avg_gct: float = 0.0
+    avg_stride_length: float = Field(0.0, alias="avg_stride")
+    technique_score: float = Field(0.0, alias="score")
+
+    class Config:
+        populate_by_name = True
+
+class Rep(RepBase):
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class CycleProfile(BaseModel):
+    count: int = 0
+    points: int = 101
+    channels: List[str] = []
+    mean: List[List[float]] # channels x points, degrees
+    std: List[List[float]]
 
 class SessionCreate(SessionBase):
-    pass
+    reps: List[RepBase] = [] # /stream/stats "reps"; read from the recording when empty
+    cycles: Optional[CycleProfile] = None # /stream/cycles; read from the recording when missing
 
 class SessionFeedbackUpdate(BaseModel):
     coach_notes: str
@@ -23,6 +50,7 @@ class Session(SessionBase):
     id: int
     user_id: int
     created_at: datetime
+    cycle_count: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,86 @@
+import queue
+import threading
+from contextlib import contextmanager
+from app.core.config import settings
+
+class DetectorPool:
+    """
+    Pre-initialized PoseDetector instances per model complexity.
+
+    Building a MediaPipe graph and loading its model takes seconds, so warm()
+    does it off the request path and lease() hands out ready detectors.
+    If the pool for a complexity is empty, a new detector is built on demand
+    and kept when returned, up to `size` idle detectors per complexity.
+    """
+    def __init__(self, complexities, size):
+        self.complexities = list(complexities)
+        self.size = size
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._warm_thread = None
+
+    def _queue(self, complexity):
+        with self._lock:
+            if complexity not in self._idle:
+                self._idle[complexity] = queue.LifoQueue(maxsize=self.size)
+            return self._idle[complexity]
+
+    def _build(self, complexity):
+        # Heavy import stays here so API-only workers never load the vision stack
+        from app.services.pose_module import PoseDetector
+        import numpy as np
+
+        detector = PoseDetector(complexity=complexity)
+        # One inference on a blank frame forces model load/graph start-up now
+        detector.find_pose(np.zeros((480, 640, 3), dtype=np.uint8), draw=False)
+        detector.reset()
+        return detector
+
+    def warm(self):
+        for complexity in self.complexities:
+            idle = self._queue(complexity)
+            while not idle.full():
+                detector = None
+                try:
+                    detector = self._build(complexity)
+                    idle.put_nowait(detector)
+                except queue.Full:
+                    detector.backend.close() # Filled by releases meanwhile
+                    break
+                except Exception as e:
+                    print(f"Pose detector warm-up failed (complexity={complexity}): {e}")
+                    return
+
+    def warm_in_background(self):
+        if self._warm_thread and self._warm_thread.is_alive():
+            return
+        self._warm_thread = threading.Thread(target=self.warm, name="pose-pool-warm", daemon=True)
+        self._warm_thread.start()
+
+    def acquire(self, complexity):
+        try:
+            return self._queue(complexity).get_nowait()
+        except queue.Empty:
+            return self._build(complexity)
+
+    def release(self, complexity, detector):
+        detector.reset()
+        try:
+            self._queue(complexity).put_nowait(detector)
+        except queue.Full:
+            # Pool already full: free the graph/session now rather than at garbage collection
+            detector.backend.close()
+
+    @contextmanager
+    def lease(self, complexity):
+        detector = self.acquire(complexity)
+        try:
+            yield detector
+        finally:
+            self.release(complexity, detector)
+
+    def stats(self):
+        with self._lock:
+            return {complexity: idle.qsize() for complexity, idle in self._idle.items()}
+
+detector_pool = DetectorPool(settings.POSE_POOL_COMPLEXITIES, settings.POSE_POOL_SIZE)
@@ -0,0 +1,235 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.session import AnalysisSession
+from app.models.user import User
+from app.services import telemetry_export
+from app.services.session_recorder import iter_recording
+
+# Organization-wide bulk export (season reviews).
+# A job walks users JOIN analysis_sessions with a server-side cursor, ordered by
+# athlete and date, so each athlete/month Parquet partition is written start to
+# finish with a single open writer. Telemetry is streamed chunk by chunk from the
+# recordings; nothing is ever held in memory beyond one batch.
+# Finished jobs and their archives are kept for `retention` seconds, then
+# dropped (checked whenever a job is submitted or looked up). Work directories
+# and partial archives of failed jobs are removed as well.
+
+SESSION_COLUMNS = [
+    ("session_id", "int64"), ("athlete_id", "int64"), ("athlete_name", "string"),
+    ("created_at", "timestamp"), ("duration_seconds", "float64"), ("technique_score", "float64"),
+    ("avg_cadence", "float64"), ("avg_stride_length", "float64"), ("avg_gct", "float64"),
+    ("max_swing_error", "float64"), ("max_hip_error", "float64"),
+    ("recording_id", "string"), ("coach_notes", "string"),
+]
+CURSOR_BATCH = 500
+
+class ExportJob:
+    def __init__(self, requested_by):
+        self.id = uuid.uuid4().hex
+        self.requested_by = requested_by
+        self.status = "queued" # queued -> running -> done | failed
+        self.total_sessions = 0
+        self.processed_sessions = 0
+        self.telemetry_rows = 0
+        self.error = None
+        self.archive_path = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        progress = self.processed_sessions / self.total_sessions if self.total_sessions else (1.0 if self.status == "done" else 0.0)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_sessions": self.total_sessions,
+            "processed_sessions": self.processed_sessions,
+            "telemetry_rows": self.telemetry_rows,
+            "progress": round(progress, 3),
+            "error": self.error,
+        }
+
+def _session_table_schema(pa):
+    types = {"int64": pa.int64(), "string": pa.string(), "timestamp": pa.timestamp("us"), "float64": pa.float64()}
+    return pa.schema([(name, types[kind]) for name, kind in SESSION_COLUMNS])
+
+class _PartitionWriter:
+    """
+    Keeps at most one telemetry Parquet writer open; switching partition closes the previous one.
+    """
+    def __init__(self, pa, pq, root):
+        self.pa = pa
+        self.pq = pq
+        self.root = root
+        self.schema = pa.schema([("SessionId", pa.int64())] + list(telemetry_export.arrow_schema(pa)))
+        self.key = None
+        self.writer = None
+
+    def write_session(self, key, session_id, rows):
+        if key != self.key:
+            self.close()
+            athlete_id, month = key
+            directory = os.path.join(self.root, "telemetry", f"athlete_id={athlete_id}", f"month={month}")
+            os.makedirs(directory, exist_ok=True)
+            self.writer = self.pq.ParquetWriter(os.path.join(directory, "part-0.parquet"), self.schema, compression="zstd")
+            self.key = key
+        written = 0
+        batch = []
+        for row in rows:
+            batch.append([session_id] + row)
+            if len(batch) >= telemetry_export.ROWS_PER_BATCH:
+                self.writer.write_batch(telemetry_export.record_batch(self.pa, self.schema, batch))
+                written += len(batch)
+                batch = []
+        if batch:
+            self.writer.write_batch(telemetry_export.record_batch(self.pa, self.schema, batch))
+            written += len(batch)
+        return written
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+class ExportJobManager:
+    def __init__(self, max_workers=1, retention=24 * 3600, directory=None):
+        self.retention = retention
+        self.directory = directory or settings.EXPORTS_DIR
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="org-export")
+
+    def submit(self, requested_by):
+        telemetry_export.require_pyarrow()
+        self.purge()
+        job = ExportJob(requested_by)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        self.purge()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purge(self, now=None):
+        """
+        Drop jobs finished more than `retention` seconds ago and delete their
+        archives, plus work directories of finished jobs and archives or work
+        directories left on disk by earlier processes.
+        """
+        now = now or time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished_at and now - job.finished_at > self.retention]
+            for job in expired:
+                del self._jobs[job.id]
+            active = {job.archive_path for job in self._jobs.values()}
+            running = {job.id for job in self._jobs.values() if not job.finished_at}
+            finished = {job.id for job in self._jobs.values() if job.finished_at}
+        for job in expired:
+            if job.archive_path and os.path.exists(job.archive_path):
+                os.remove(job.archive_path)
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            stale = now - os.path.getmtime(path) > self.retention
+            if os.path.isdir(path):
+                # Another process may still be filling an unknown directory: only stale ones go
+                if name in finished or (name not in running and stale):
+                    shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith(".zip") and path not in active and stale:
+                os.remove(path)
+
+    def _run(self, job):
+        job.status = "running"
+        work_dir = os.path.join(self.directory, job.id)
+        try:
+            os.makedirs(work_dir, exist_ok=True)
+            self._export(job, work_dir)
+            job.archive_path = self._archive(work_dir)
+            job.status = "done"
+        except Exception as e:
+            print(f"Organization export {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+            if os.path.exists(work_dir + ".zip"):
+                os.remove(work_dir + ".zip") # Partial archive
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            job.finished_at = time.time()
+
+    def _export(self, job, work_dir):
+        pa = telemetry_export.require_pyarrow()
+        import pyarrow.parquet as pq
+
+        session_schema = _session_table_schema(pa)
+        sessions_writer = pq.ParquetWriter(os.path.join(work_dir, "sessions.parquet"), session_schema, compression="zstd")
+        partitions = _PartitionWriter(pa, pq, work_dir)
+
+        db = SessionLocal()
+        try:
+            job.total_sessions = db.execute(select(func.count(AnalysisSession.id))).scalar() or 0
+            stmt = (
+                select(AnalysisSession, User.full_name)
+                .join(User, AnalysisSession.user_id == User.id)
+                .order_by(AnalysisSession.user_id, AnalysisSession.created_at, AnalysisSession.id)
+                .execution_options(stream_results=True, yield_per=CURSOR_BATCH)
+            )
+            summary = []
+            for session, athlete_name in db.execute(stmt):
+                summary.append(self._summary_row(session, athlete_name))
+                if len(summary) >= CURSOR_BATCH:
+                    sessions_writer.write_table(pa.Table.from_pylist(summary, schema=session_schema))
+                    summary = []
+
+                directory = telemetry_export.recording_dir(session.recording_id)
+                if directory and session.created_at:
+                    key = (session.user_id, session.created_at.strftime("%Y-%m"))
+                    job.telemetry_rows += partitions.write_session(key, session.id, iter_recording(directory))
+                job.processed_sessions += 1
+                # Detached rows would otherwise accumulate in the identity map
+                db.expunge(session)
+            if summary:
+                sessions_writer.write_table(pa.Table.from_pylist(summary, schema=session_schema))
+        finally:
+            db.close()
+            partitions.close()
+            sessions_writer.close()
+
+    def _summary_row(self, session, athlete_name):
+        return {
+            "session_id": session.id,
+            "athlete_id": session.user_id,
+            "athlete_name": athlete_name,
+            "created_at": session.created_at,
+            "duration_seconds": session.duration_seconds,
+            "technique_score": session.technique_score,
+            "avg_cadence": session.avg_cadence,
+            "avg_stride_length": session.avg_stride_length,
+            "avg_gct": session.avg_gct,
+            "max_swing_error": session.max_swing_error,
+            "max_hip_error": session.max_hip_error,
+            "recording_id": session.recording_id,
+            "coach_notes": session.coach_notes,
+        }
+
+    def _archive(self, work_dir):
+        # Parquet parts are already zstd-compressed, so store them as-is
+        archive_path = work_dir + ".zip"
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for root, _, files in os.walk(work_dir):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    zf.write(path, os.path.relpath(path, work_dir))
+        return archive_path
+
+export_jobs = ExportJobManager(retention=settings.EXPORT_RETENTION_SECONDS)
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Fans frames from one producer thread out to any number of async viewers.
+#
+# The producer (capture + inference) runs on a dedicated executor thread, not
+# the anyio threadpool, so viewers never hold worker threads. Each viewer owns
+# a small asyncio.Queue:
+# - a slow viewer drops its oldest frames instead of stalling the others;
+# - the producer waits while *every* viewer's queue is full, so the fastest
+#   viewer sets the pace (backpressure) and nothing is produced for nobody;
+# - with no viewers left for `idle_timeout`, the producer exits and releases
+#   its resources.
+
+END = None
+
+class Subscription:
+    """
+    Async iterator over one run's frames; ends when the producer stops.
+    """
+    def __init__(self, broadcaster, run, loop, maxsize):
+        self.broadcaster = broadcaster
+        self.run = run
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.pending = 0 # Producer-side count of frames not yet taken (guarded by the broadcaster lock)
+        self.dropped = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.queue.get()
+        self.broadcaster._taken(self)
+        if item is END:
+            raise StopAsyncIteration
+        return item
+
+    def _offer(self, item):
+        # Runs on the event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.broadcaster.dropped += 1
+        self.queue.put_nowait(item)
+
+class _Run:
+    def __init__(self):
+        self.subscribers = set()
+        self.ending = False
+
+class FrameBroadcaster:
+    def __init__(self, queue_size=2, idle_timeout=2.0, name="frame-producer"):
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.frames = 0
+        self.dropped = 0 # All viewers, including ones that already left
+        self._cond = threading.Condition()
+        self._current = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def subscribe(self, produce):
+        """
+        Register a viewer (call from the event loop). Starts a producer run with
+        `produce()` (a generator of frames) unless one is already serving viewers.
+        """
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            run = self._current
+            if run is None or run.ending:
+                # A finishing run is left alone; the new one is queued behind it
+                run = self._current = _Run()
+                self._executor.submit(self._produce, run, produce)
+            subscription = Subscription(self, run, loop, self.queue_size)
+            run.subscribers.add(subscription)
+            self._cond.notify_all()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            subscription.run.subscribers.discard(subscription)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            run = self._current
+            active = run is not None and not run.ending
+            viewers = list(run.subscribers) if active else []
+            return {
+                "active": active,
+                "viewers": len(viewers),
+                "frames": self.frames,
+                "queued": sum(s.pending for s in viewers),
+                "dropped": sum(s.dropped for s in viewers),
+                "dropped_total": self.dropped,
+            }
+
+    def _taken(self, subscription):
+        with self._cond:
+            subscription.pending = max(0, subscription.pending - 1)
+            self._cond.notify_all()
+
+    def _wait_for_room(self, run):
+        """
+        Block until some viewer can take a frame. False (and the run is marked
+        ending) once nobody has been watching for idle_timeout.
+        """
+        deadline = None
+        with self._cond:
+            while not any(s.pending < self.queue_size for s in run.subscribers):
+                if run.subscribers:
+                    deadline = None
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                deadline = deadline or now + self.idle_timeout
+                if now >= deadline:
+                    run.ending = True
+                    return False
+                self._cond.wait(deadline - now)
+            return True
+
+    def _publish(self, run, item):
+        with self._cond:
+            subscribers = list(run.subscribers)
+            for subscription in subscribers:
+                subscription.pending = min(self.queue_size, subscription.pending + 1)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, item)
+            except RuntimeError:
+                pass # Viewer's event loop already closed
+
+    def _produce(self, run, produce):
+        frames = produce()
+        try:
+            while self._wait_for_room(run):
+                frame = next(frames, END)
+                if frame is END:
+                    break
+                self.frames += 1
+                self._publish(run, frame)
+        except Exception as e:
+            print(f"Frame producer error: {e}")
+        finally:
+            with self._cond:
+                run.ending = True
+                if self._current is run:
+                    self._current = None
+            frames.close()
+            self._publish(run, END)
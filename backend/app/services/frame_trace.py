@@ -0,0 +1,123 @@
+import collections
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from app.core.config import settings
+
+# Opt-in frame-level tracing, dumped as Chrome trace JSON (chrome://tracing,
+# ui.perfetto.dev).
+#
+# Spans are appended as tuples to a bounded deque: append is atomic in CPython,
+# so producer, encode and request threads record without taking a lock, and
+# the oldest spans fall off once the buffer is full. While disabled, span()
+# returns a shared no-op context and traced() functions cost one attribute check.
+
+_NOOP = nullcontext()
+
+class _Span:
+    __slots__ = ("tracer", "name", "frame", "started")
+
+    def __init__(self, tracer, name, frame):
+        self.tracer = tracer
+        self.name = name
+        self.frame = frame
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.started, time.perf_counter() - self.started, self.frame)
+        return False
+
+class FrameTracer:
+    def __init__(self, max_events=200_000, enabled=False):
+        self.enabled = enabled
+        self._events = collections.deque(maxlen=max_events)
+        self._threads = {} # ident -> name, for the trace's thread_name metadata
+        self._local = threading.local()
+        self._frame_ids = {} # id(frame array) -> frame number, for spans on other threads
+        self._recent = collections.deque()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+        self._frame_ids.clear()
+        self._recent.clear()
+
+    def begin_frame(self, number, image=None):
+        """
+        Tag spans recorded on this thread with `number`. Passing the frame
+        `image` lets other threads look the number up with frame_of().
+        """
+        if not self.enabled:
+            return
+        self._local.frame = number
+        if image is not None:
+            self._frame_ids[id(image)] = number
+            self._recent.append(id(image))
+            while len(self._recent) > 64:
+                self._frame_ids.pop(self._recent.popleft(), None)
+
+    def frame_of(self, image):
+        return self._frame_ids.get(id(image))
+
+    def span(self, name, frame=None):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, frame)
+
+    def complete(self, name, started, duration, frame=None):
+        """
+        Record a finished span (perf_counter start, seconds).
+        """
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        if frame is None:
+            frame = getattr(self._local, "frame", None)
+        self._events.append((name, started, duration, tid, frame))
+
+    def export(self):
+        """
+        Chrome trace document ("X" complete events, microseconds).
+        """
+        pid = os.getpid()
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, started, duration, tid, frame in self._events.copy():
+            event = {
+                "name": name, "ph": "X", "pid": pid, "tid": tid,
+                "ts": round(started * 1e6, 1), "dur": round(duration * 1e6, 1),
+            }
+            if frame is not None:
+                event["args"] = {"frame": frame}
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+def traced(name):
+    """
+    Decorator: record each call as a span while tracing is enabled.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with _Span(tracer, name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+tracer = FrameTracer(settings.STREAM_TRACE_MAX_EVENTS, settings.STREAM_TRACE)
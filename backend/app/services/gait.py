@@ -0,0 +1,416 @@
+import collections
+import json
+import os
+import time
+import math
+import numpy as np
+from .session_recorder import SessionRecorder
+from .frame_trace import traced
+from .rep_segmenter import RepSegmenter
+from .gait_cycles import CycleEngine
+
+# Gait metrics and scoring. Kept free of OpenCV/MediaPipe so API workers that only
+# read stats or history never pay for loading the vision stack.
+
+X, Y, Z = 0, 1, 2 # Landmark array columns (see pose_backends)
+
+class GaitAnalyzer:
+    HISTORY_SIZE = 300 # In-memory window for graphs/score; full sessions go to the recorder
+
+    def __init__(self, record_dir=None, record_rest=False):
+        self.step_count = 0
+        self.cadence = 0.0
+        self.stride_length = 0.0
+        self.left_symmetry = 50.0
+        self.right_symmetry = 50.0
+        self.gct = 0.0
+        self.current_knee_angle = 0
+        self.current_hip_angle = 0
+        self.swing_mechanics_error = 0
+        self.swing_mechanics_error = 0 # Duplicate line in original, preserved or removed? cleaned up implicitly
+        self.hip_stability_error = 0
+        self.current_arm_angle = 0
+        self.current_trunk_angle = 0
+        self.alpha = 0.3
+        self.prev_foot_dist = 0
+        self.is_increasing = False
+        self.last_step_time = time.time()
+        self.start_time = time.time()
+        self.step_intervals = [] 
+        self.left_step_lengths = []
+        self.right_step_lengths = []
+        self.ground_frames = 0
+        self.air_frames = 0
+        self.data_log = []
+        self.min_step_dist = 0.2 
+        self.ground_threshold_y = 0.0
+        self.knee_angles_history = []
+        self.hip_angles_history = []
+        self.timestamps = []
+        self.current_world_landmarks = None # (33, 4) array: x, y, z (metres), visibility
+        self.min_dist_in_cycle = 10.0 # Track closest approach
+        self.pass_threshold = 0.15 # Feet must pass closer than 15cm
+        
+        # New GCT Logic
+        self.is_currently_grounded = False
+        self.ground_contact_start = 0.0
+
+        # Per-frame metrics alongside the angle window (for windowed CSV export)
+        self.cadence_history = []
+        self.stride_history = []
+
+        # Full-session recording (optional)
+        self.frame_index = 0
+        self.recorder = None
+        self._step_event_length = 0.0
+        self._gct_event = 0.0
+        self._step_event_left = False
+        self._step_side_known = False
+
+        # Reps and rests; only rep frames are recorded unless record_rest is set
+        self.segmenter = RepSegmenter(score=AthleticScorer().score_rep)
+        self.record_rest = record_rest
+        self._preroll = collections.deque() # (elapsed, row) of recent rest frames
+
+        # Phase-normalized knee/hip/arm/trunk curves of each stride within reps
+        self.cycles = CycleEngine()
+        if record_dir:
+            self.start_recording(record_dir)
+
+    def start_recording(self, directory):
+        """
+        Stream processed frames of each rep to chunked files under `directory`,
+        with reps/rests summarized in reps.json.
+        Memory stays at HISTORY_SIZE samples no matter how long the session runs.
+        """
+        self.stop_recording()
+        self.recorder = SessionRecorder(directory)
+
+    def stop_recording(self):
+        # Closes the writer; the recording stays readable for export
+        if self.recorder:
+            self.segmenter.finish(time.time())
+            self.write_segments()
+            self.recorder.close()
+
+    def write_segments(self):
+        if not self.recorder:
+            return
+        path = os.path.join(self.recorder.directory, "reps.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.segmenter.summary(), f)
+        os.replace(path + ".tmp", path)
+        if self.cycles.count:
+            path = os.path.join(self.recorder.directory, "cycles.npz")
+            with open(path + ".tmp", "wb") as f:
+                np.savez(f, mean=self.cycles.mean.astype(np.float32), std=self.cycles.std.astype(np.float32),
+                         count=self.cycles.count, recent=self.cycles.recent_cycles())
+            os.replace(path + ".tmp", path)
+
+    def no_pose(self):
+        """
+        Frame analyzed without finding anyone (ends a rep after a while).
+        """
+        self.cycles.reset_cycle()
+        if self.segmenter.idle(time.time()) == "end":
+            self.write_segments()
+
+    @traced("GaitAnalyzer.update")
+    def update(self, world_lms, fps, raw_knee_angle, raw_hip_angle, arm_angle=0, trunk_angle=0):
+        # world_lms: world landmark array in BlazePose order (pose_backends.PoseResult)
+        if world_lms is None: return
+        self.current_world_landmarks = world_lms
+
+        current_time = time.time()
+        elapsed = current_time - self.start_time
+        
+        if self.current_knee_angle == 0: 
+            self.current_knee_angle = raw_knee_angle # Right Knee (Legacy)
+            self.l_knee_angle = 0
+            self.current_hip_angle = raw_hip_angle # Right Hip (Legacy)
+            self.l_hip_angle = 0
+            self.current_arm_angle = arm_angle
+            self.current_trunk_angle = trunk_angle
+        else:
+            self.current_knee_angle = (self.alpha * raw_knee_angle) + ((1 - self.alpha) * self.current_knee_angle)
+            self.current_hip_angle = (self.alpha * raw_hip_angle) + ((1 - self.alpha) * self.current_hip_angle)
+            self.current_arm_angle = (self.alpha * arm_angle) + ((1 - self.alpha) * self.current_arm_angle)
+            self.current_trunk_angle = (self.alpha * trunk_angle) + ((1 - self.alpha) * self.current_trunk_angle)
+            pass
+
+        # Calculate Error Metrics (Simple Heuristic for MVP)
+        if self.current_knee_angle > 140: # Leg too straight
+            self.swing_mechanics_error = min(100, (self.current_knee_angle - 140) * 2)
+        else:
+            self.swing_mechanics_error = max(0, self.swing_mechanics_error - 5)
+
+        # Hip Stability: Hip angle variance.
+        hip_dev = abs(180 - self.current_hip_angle)
+        if hip_dev > 10:
+            self.hip_stability_error = min(100, (hip_dev - 10) * 5)
+        else:
+             self.hip_stability_error = max(0, self.hip_stability_error - 2)
+
+        # Store for graphs (Smoothed)
+        self.knee_angles_history.append(self.current_knee_angle)
+        if not hasattr(self, 'hip_angles_history'): self.hip_angles_history = []
+        self.hip_angles_history.append(self.current_hip_angle)
+        
+        if not hasattr(self, 'arm_angles_history'): self.arm_angles_history = []
+        self.arm_angles_history.append(self.current_arm_angle)
+
+        if not hasattr(self, 'trunk_angles_history'): self.trunk_angles_history = []
+        self.trunk_angles_history.append(self.current_trunk_angle)
+
+        self.timestamps.append(elapsed)
+        if len(self.knee_angles_history) > self.HISTORY_SIZE: 
+             self.knee_angles_history.pop(0)
+             if self.hip_angles_history: self.hip_angles_history.pop(0)
+             if self.arm_angles_history: self.arm_angles_history.pop(0)
+             if self.trunk_angles_history: self.trunk_angles_history.pop(0)
+             self.timestamps.pop(0)
+
+        l_ankle = world_lms[27]
+        r_ankle = world_lms[28]
+        l_heel = world_lms[29]
+        r_heel = world_lms[30]
+        
+        dist_x = l_ankle[X] - r_ankle[X]
+        dist_z = l_ankle[Z] - r_ankle[Z]
+        current_foot_dist = math.sqrt(dist_x**2 + dist_z**2)
+        
+        # Track minimum distance in current cycle
+        self.min_dist_in_cycle = min(self.min_dist_in_cycle, current_foot_dist)
+        
+        if current_foot_dist > self.prev_foot_dist:
+            self.is_increasing = True
+        elif self.is_increasing and current_foot_dist < self.prev_foot_dist:
+            time_since_last = current_time - self.last_step_time
+            # Validate Step: Must be large enough pulse (>min_step_dist) AND feet must have crossed (<pass_threshold)
+            if self.prev_foot_dist > self.min_step_dist and time_since_last > 0.25 and self.min_dist_in_cycle < self.pass_threshold:
+                self.register_step(current_time, self.prev_foot_dist, l_ankle, r_ankle)
+            self.is_increasing = False
+            
+        self.prev_foot_dist = current_foot_dist
+
+        lowest_y = max(l_heel[Y], r_heel[Y])
+        if self.ground_threshold_y == 0 or lowest_y > self.ground_threshold_y:
+            self.ground_threshold_y = lowest_y
+            
+        is_grounded = (l_heel[Y] > self.ground_threshold_y - 0.05) or (r_heel[Y] > self.ground_threshold_y - 0.05)
+        
+        if is_grounded: 
+            if not self.is_currently_grounded:
+                # Started touching ground
+                self.ground_contact_start = current_time
+                self.is_currently_grounded = True
+        else:
+            if self.is_currently_grounded:
+                # Just left ground (Toe-off)
+                contact_time = (current_time - self.ground_contact_start) * 1000 # ms
+                # Filter noise (too short contacts likely detection jitter)
+                if contact_time > 20: 
+                    if self.gct == 0:
+                        self.gct = contact_time
+                    else:
+                        self.gct = (0.2 * contact_time) + (0.8 * self.gct) # Smooth updates
+                    self._gct_event = contact_time
+                self.is_currently_grounded = False
+
+        # Per-frame cadence/stride, trimmed with the angle window
+        self.cadence_history.append(self.cadence)
+        self.stride_history.append(self.stride_length)
+        if len(self.cadence_history) > self.HISTORY_SIZE:
+            self.cadence_history.pop(0)
+            self.stride_history.pop(0)
+
+        event = self.segmenter.update(
+            current_time, world_lms, self.current_knee_angle, self.current_hip_angle,
+            step_length=self._step_event_length, step_left=self._step_event_left, gct=self._gct_event,
+        )
+        if self.segmenter.active:
+            self.cycles.add(current_time, (raw_knee_angle, raw_hip_angle, arm_angle, trunk_angle),
+                            step=bool(self._step_event_length),
+                            left=self._step_event_left if self._step_side_known else None)
+        else:
+            self.cycles.reset_cycle()
+        if self.recorder:
+            self.record_frame(elapsed, raw_knee_angle, raw_hip_angle, event)
+        self.frame_index += 1
+        self._step_event_length = 0.0
+        self._gct_event = 0.0
+
+    def record_frame(self, elapsed, raw_knee_angle, raw_hip_angle, event=None):
+        row = (
+            self.frame_index, f"{elapsed:.3f}",
+            f"{self.current_knee_angle:.1f}", f"{self.current_hip_angle:.1f}",
+            f"{self.current_arm_angle:.1f}", f"{self.current_trunk_angle:.1f}",
+            f"{raw_knee_angle:.1f}", f"{raw_hip_angle:.1f}",
+            f"{self.cadence:.1f}", f"{self.stride_length:.2f}", f"{self.gct:.0f}",
+            1 if self._step_event_length else 0, f"{self._step_event_length:.2f}", f"{self._gct_event:.0f}",
+            f"{self.left_symmetry:.1f}", f"{self.right_symmetry:.1f}",
+        )
+        if event == "start":
+            # The rep is dated back to its first step: keep those frames too
+            rep_start = self.segmenter.current["start"] - self.start_time - 0.5
+            for preroll_elapsed, preroll_row in self._preroll:
+                if preroll_elapsed >= rep_start:
+                    self.recorder.append(preroll_row)
+            self._preroll.clear()
+        elif event == "end":
+            self.write_segments()
+
+        if self.record_rest or self.segmenter.active:
+            self.recorder.append(row)
+            return
+        self._preroll.append((elapsed, row))
+        while self._preroll and elapsed - self._preroll[0][0] > self.segmenter.start_window + 0.5:
+            self._preroll.popleft()
+            
+    @traced("GaitAnalyzer.register_step")
+    def register_step(self, time_now, length, l_ankle, r_ankle):
+        self.step_count += 1
+        self._step_event_length = length
+        self.min_dist_in_cycle = 10.0 # Reset cycle tracker
+        duration = time_now - self.last_step_time
+        self.last_step_time = time_now
+        
+        if 0.25 < duration < 2.0:
+            self.step_intervals.append(duration)
+            if len(self.step_intervals) > 5: self.step_intervals.pop(0)
+            avg_duration = sum(self.step_intervals) / len(self.step_intervals)
+            self.cadence = 60.0 / avg_duration if avg_duration > 0 else 0
+            
+        if length < 2.5:
+            self.stride_length = length
+        
+        self._step_event_left = bool(l_ankle[Z] < r_ankle[Z])
+        self._step_side_known = bool(l_ankle[Z] != r_ankle[Z]) # 2D backends report z = 0
+        if self._step_event_left: 
+             self.left_step_lengths.append(length)
+        else:
+             self.right_step_lengths.append(length)
+             
+        if len(self.left_step_lengths) > 10: self.left_step_lengths.pop(0)
+        if len(self.right_step_lengths) > 10: self.right_step_lengths.pop(0)
+        
+        avg_l = sum(self.left_step_lengths) / len(self.left_step_lengths) if self.left_step_lengths else 0
+        avg_r = sum(self.right_step_lengths) / len(self.right_step_lengths) if self.right_step_lengths else 0
+        total = avg_l + avg_r
+        if total > 0:
+            self.left_symmetry = (avg_l / total) * 100
+            self.right_symmetry = (avg_r / total) * 100
+
+    def get_graph_data(self):
+        # Return last 50 points formatted for chart.js
+        # We need to ensure lists are same length
+        min_len = min(len(self.timestamps), len(self.knee_angles_history))
+        if hasattr(self, 'hip_angles_history'):
+             min_len = min(min_len, len(self.hip_angles_history))
+        
+        # Take last 50
+        start_idx = max(0, min_len - 50)
+        
+        return {
+            "labels": [f"{t:.1f}s" for t in self.timestamps[start_idx:min_len]],
+            "knee": self.knee_angles_history[start_idx:min_len],
+            "hip": self.hip_angles_history[start_idx:min_len] if hasattr(self, 'hip_angles_history') else []
+        }
+
+    def save_csv(self, filename):
+        """
+        Export to CSV. With a recorder this is the full session, otherwise the
+        in-memory window. Cadence/stride are the values at each frame.
+        """
+        if self.recorder:
+            self.recorder.export_csv(filename, columns=[
+                'Timestamp', 'RightKneeAngle', 'RightHipAngle', 'Cadence', 'StrideLength',
+                'ArmAngle', 'TrunkAngle', 'GCT', 'StepEvent', 'GCTEvent'
+            ])
+            return
+
+        import csv
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Timestamp', 'RightKneeAngle', 'RightHipAngle', 'Cadence', 'StrideLength'])
+            
+            # Align lists
+            min_len = min(len(self.timestamps), len(self.knee_angles_history), len(self.cadence_history))
+            if hasattr(self, 'hip_angles_history'):
+                min_len = min(min_len, len(self.hip_angles_history))
+            offset = len(self.cadence_history) - min_len
+            
+            for i in range(min_len):
+                row = [
+                    f"{self.timestamps[i]:.2f}",
+                    f"{self.knee_angles_history[i]:.1f}",
+                    f"{self.hip_angles_history[i]:.1f}" if hasattr(self, 'hip_angles_history') and i < len(self.hip_angles_history) else "0",
+                    f"{self.cadence_history[offset + i]:.1f}",
+                    f"{self.stride_history[offset + i]:.2f}"
+                ]
+                writer.writerow(row)
+
+class AthleticScorer:
+    def __init__(self):
+        self.score = 0
+        self.feedback = []
+        self.w_knee = 0.30
+        self.w_cadence = 0.25
+        self.w_sym = 0.20
+        self.w_hip = 0.15
+        self.w_consist = 0.10
+        
+    def score_values(self, min_knee_angle, cadence, symmetry_diff, hip_angle):
+        """
+        Weighted technique score and its components from plain values.
+        """
+        if min_knee_angle <= 60: s_knee = 100
+        elif min_knee_angle >= 120: s_knee = 40
+        else:
+            s_knee = 100 - (min_knee_angle - 60)
+            
+        c = cadence
+        if c >= 270: s_cadence = 100
+        elif c <= 120: s_cadence = 50
+        else:
+             s_cadence = 50 + ((c - 120)/(270-120)) * 50
+             
+        s_sym = max(0, 100 - (symmetry_diff * 2))
+        
+        h = hip_angle
+        if 120 <= h <= 140: s_hip = 100
+        else: s_hip = max(50, 100 - abs(h - 130))
+
+        s_consist = 80
+        
+        score = (s_knee * self.w_knee) + \
+                (s_cadence * self.w_cadence) + \
+                (s_sym * self.w_sym) + \
+                (s_hip * self.w_hip) + \
+                (s_consist * self.w_consist)
+        return score, s_knee, s_hip
+
+    def score_rep(self, rep):
+        """
+        Score of one rep summary (RepSegmenter).
+        """
+        diff = abs(rep["symmetry"]["left"] - rep["symmetry"]["right"])
+        score, _, _ = self.score_values(rep["min_knee_angle"], rep["cadence"], diff, rep["avg_hip_angle"])
+        return int(score)
+
+    def calculate_score(self, analyzer):
+        history = analyzer.knee_angles_history
+        if not history: return 0
+        
+        recent_min_angle = min(history[-30:]) if len(history) >= 30 else min(history)
+        c = analyzer.cadence
+        diff = abs(analyzer.left_symmetry - analyzer.right_symmetry)
+        self.score, s_knee, s_hip = self.score_values(recent_min_angle, c, diff, analyzer.current_hip_angle)
+                     
+        self.feedback = []
+        if c < 160: self.feedback.append(f"Cadence rendah ({int(c)}). Percepat langkah!")
+        if diff > 10: self.feedback.append(f"Asimetri tinggi ({int(diff)}%). Perbaiki keseimbangan.")
+        if s_knee < 70: self.feedback.append("Angkat lutut lebih tinggi saat ayunan.")
+        if s_hip < 70: self.feedback.append("Perhatikan postur pinggul.")
+        
+        return int(self.score)
@@ -0,0 +1,148 @@
+import numpy as np
+
+# Phase-normalized gait cycles.
+#
+# A cycle (stride) runs from one step of the anchor foot (the right one, the
+# side the knee/hip channels measure) to its next step, so cycles from any rep
+# or session start at the same point of the gait. Joint angles sampled
+# during it are resampled onto CYCLE_POINTS evenly spaced phase points
+# (0-100 % of the cycle), all channels in one vectorized interpolation, so
+# cycles of different durations, reps and athletes line up point for point.
+# A running mean/std envelope is updated per cycle (Welford), and profiles are
+# stored as fixed-size float32 arrays: comparing sessions is plain array math.
+
+CYCLE_CHANNELS = ("knee", "hip", "arm", "trunk")
+CYCLE_POINTS = 101 # 0, 1, ..., 100 % of the cycle
+PROFILE_SHAPE = (2, len(CYCLE_CHANNELS), CYCLE_POINTS) # mean, std
+
+def resample_cycle(times, values, points=CYCLE_POINTS):
+    """
+    Linear resampling of `values` (n, channels) sampled at `times` (n,) onto
+    `points` phase points between the first and last time. Returns (channels, points).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float32)
+    phase = np.linspace(times[0], times[-1], points)
+    left = np.clip(np.searchsorted(times, phase, side="right") - 1, 0, len(times) - 2)
+    t0, t1 = times[left], times[left + 1]
+    weight = np.divide(phase - t0, t1 - t0, out=np.zeros_like(phase), where=t1 > t0)[:, None]
+    return (values[left] * (1 - weight) + values[left + 1] * weight).T.astype(np.float32)
+
+def pack_profile(mean, std):
+    """
+    (mean, std) envelope -> bytes for storage (float32, PROFILE_SHAPE).
+    """
+    return np.stack([mean, std]).astype(np.float32).tobytes()
+
+def unpack_profile(data):
+    """
+    Stored bytes -> (mean, std), each (channels, points).
+    """
+    profile = np.frombuffer(data, dtype=np.float32).reshape(PROFILE_SHAPE)
+    return profile[0], profile[1]
+
+class CycleEngine:
+    def __init__(self, points=CYCLE_POINTS, channels=len(CYCLE_CHANNELS),
+                 min_duration=0.3, max_duration=2.5, min_samples=6, keep=64, anchor_left=False):
+        self.points = points
+        self.anchor_left = anchor_left
+        self.channels = channels
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.min_samples = min_samples
+        self.count = 0
+        self.mean = np.zeros((channels, points), dtype=np.float64)
+        self._m2 = np.zeros((channels, points), dtype=np.float64)
+        self.recent = np.zeros((keep, channels, points), dtype=np.float32) # Ring buffer of cycles
+        self._times = []
+        self._values = []
+        self._started = False # Buffer begins at an anchor step
+        self._opposite = 0 # Other-foot steps since then
+        self._steps = 0 # Steps seen, for sources that cannot tell the feet apart
+
+    def reset_cycle(self):
+        """
+        Drop the partial cycle (e.g. the athlete stopped running).
+        """
+        self._times = []
+        self._values = []
+        self._started = False
+        self._opposite = 0
+        self._steps = 0
+
+    def add(self, t, values, step=False, left=None):
+        """
+        One frame of joint angles (ordered as CYCLE_CHANNELS). `left` is the
+        side of this frame's step, None if unknown (2D-only pose backends:
+        every second step is then taken as the anchor, which may be either foot).
+        Returns the new (channels, points) cycle when this frame's step
+        completes one, else None.
+        """
+        self._times.append(t)
+        self._values.append(values)
+        if not step:
+            if t - self._times[0] > self.max_duration:
+                self.reset_cycle()
+            return None
+
+        if left is None:
+            self._steps += 1
+            anchor = self._steps % 2 == 1
+        else:
+            anchor = left == self.anchor_left
+        if not anchor:
+            self._opposite += 1
+            return None
+        if not self._started:
+            # The cycle starts here
+            self._times, self._values = [t], [values]
+            self._started = True
+            self._opposite = 0
+            return None
+
+        # Next anchor step: one stride done, the next one starts here
+        times, values_seen = self._times, self._values
+        opposite = self._opposite
+        self._times, self._values, self._opposite = [t], [values], 0
+        if left is not None and opposite != 1:
+            return None # A step was missed (or double-counted): not one clean stride
+        duration = times[-1] - times[0]
+        if not (self.min_duration <= duration <= self.max_duration) or len(times) < self.min_samples:
+            return None
+        cycle = resample_cycle(times, values_seen, self.points)
+        self._accumulate(cycle)
+        return cycle
+
+    def _accumulate(self, cycle):
+        self.recent[self.count % len(self.recent)] = cycle
+        self.count += 1
+        delta = cycle - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (cycle - self.mean)
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return np.sqrt(self._m2 / self.count)
+
+    def recent_cycles(self, n=None):
+        """
+        The last `n` cycles (oldest first), (n, channels, points).
+        """
+        kept = min(self.count, len(self.recent))
+        n = kept if n is None else min(n, kept)
+        order = [(self.count - n + i) % len(self.recent) for i in range(n)]
+        return self.recent[order]
+
+    def profile(self):
+        """
+        JSON-friendly envelope (rounded to 0.1 degree).
+        """
+        return {
+            "count": self.count,
+            "points": self.points,
+            "channels": list(CYCLE_CHANNELS[:self.channels]),
+            "mean": np.round(self.mean, 1).tolist(),
+            "std": np.round(self.std, 1).tolist(),
+        }
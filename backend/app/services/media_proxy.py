@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.services.source_cache import transcode, ANALYSIS_WIDTH
+
+# Analysis proxies for uploaded videos.
+#
+# Phone uploads are often 4K; decoding them at full size and resizing to 800px
+# on every playback wastes most of the per-frame budget. After an upload, a
+# background job writes next to the original:
+#   <name>.proxy.mp4   800px wide, short GOP (cheap seeks/restarts)
+#   <name>.sprite.jpg  grid of evenly spaced thumbnails (scrubbing previews)
+#   <name>.sprite.json layout of the sprite (tile size, columns, timestamps)
+# Streaming reads the proxy as soon as it exists.
+
+PROXY_KEYFRAME_INTERVAL = 5
+SPRITE_TILE_WIDTH = 160
+SPRITE_COLUMNS = 10
+SPRITE_MAX_TILES = 100
+
+def proxy_path(path):
+    return os.path.splitext(path)[0] + ".proxy.mp4"
+
+def sprite_paths(path):
+    stem = os.path.splitext(path)[0]
+    return stem + ".sprite.jpg", stem + ".sprite.json"
+
+def build_sprite(src, image_path, manifest_path, tile_width=SPRITE_TILE_WIDTH,
+                 columns=SPRITE_COLUMNS, max_tiles=SPRITE_MAX_TILES):
+    """
+    Sample up to `max_tiles` evenly spaced frames of `src` into one JPEG grid.
+    """
+    import cv2
+    import numpy as np
+
+    cap = cv2.VideoCapture(src)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {src}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        count = max(1, min(max_tiles, total))
+        step = max(1, total // count)
+        tiles, times = [], []
+        for index in range(0, step * count, step):
+            # Sequential grab() is cheaper than seeking on long-GOP sources
+            if index:
+                for _ in range(step - 1):
+                    cap.grab()
+            success, frame = cap.read()
+            if not success:
+                break
+            h, w = frame.shape[:2]
+            tile_height = int(h * tile_width / w)
+            tiles.append(cv2.resize(frame, (tile_width, tile_height), interpolation=cv2.INTER_AREA))
+            times.append(round(index / fps, 3))
+    finally:
+        cap.release()
+    if not tiles:
+        raise IOError(f"No frames decoded from: {src}")
+
+    tile_height = tiles[0].shape[0]
+    rows = (len(tiles) + columns - 1) // columns
+    sprite = np.zeros((rows * tile_height, min(columns, len(tiles)) * tile_width, 3), dtype=np.uint8)
+    for i, tile in enumerate(tiles):
+        r, c = divmod(i, columns)
+        sprite[r * tile_height:(r + 1) * tile_height, c * tile_width:(c + 1) * tile_width] = tile[:tile_height]
+    cv2.imwrite(image_path, sprite, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    with open(manifest_path, "w") as f:
+        json.dump({
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "columns": columns,
+            "count": len(tiles),
+            "timestamps": times,
+        }, f)
+
+class ProxyBuilder:
+    def __init__(self, width=ANALYSIS_WIDTH, keyint=PROXY_KEYFRAME_INTERVAL, max_workers=1):
+        self.width = width
+        self.keyint = keyint
+        self._status = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-proxy")
+
+    def submit(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            if self._status.get(path) in ("pending", "ready"):
+                return
+            self._status[path] = "pending"
+        return self._executor.submit(self._build, path)
+
+    def _build(self, path):
+        try:
+            transcode(path, proxy_path(path), self.width, self.keyint)
+            # The sprite decodes the small proxy, not the original
+            build_sprite(proxy_path(path), *sprite_paths(path))
+            state = "ready"
+        except Exception as e:
+            print(f"Proxy generation failed for {path}: {e}")
+            state = "failed"
+        with self._lock:
+            self._status[path] = state
+
+    def status(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            state = self._status.get(path)
+        if state is None and os.path.exists(proxy_path(path)):
+            state = "ready" # Built by an earlier process
+        return state or "missing"
+
+    def proxy_for(self, path):
+        """
+        Proxy path for an uploaded video once it is complete, else None.
+        """
+        if not isinstance(path, str):
+            return None
+        candidate = proxy_path(os.path.abspath(path))
+        return candidate if os.path.exists(candidate) else None
+
+proxy_builder = ProxyBuilder()
@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+
+# Frame overlay rendering with as few OpenCV calls per frame as possible.
+#
+# - Landmarks are projected to pixels in one NumPy operation.
+# - Bones and joints are grouped by colour; each group is a single
+#   cv2.polylines call (a zero-length segment drawn with thickness 2r is a
+#   filled disc of radius r, so joints batch the same way as bones).
+# - Static parts of panels (background, title, border) are rendered once and
+#   blended in; text layers are re-rendered only when their text changes.
+
+VISIBILITY_THRESHOLD = 0.5
+
+# (colour BGR, thickness, [(landmark a, landmark b), ...])
+SKELETON_BONES = [
+    ((0, 0, 255), 3, [(12, 14), (14, 16), (24, 26), (26, 28), (28, 30), (28, 32)]), # Right: red
+    ((0, 255, 0), 3, [(11, 13), (13, 15), (23, 25), (25, 27), (27, 29), (27, 31)]), # Left: green
+    ((200, 200, 200), 3, [(11, 12), (23, 24), (12, 24), (11, 23)]), # Torso
+]
+HEAD_POINTS = list(range(0, 11))
+JOINT_POINTS = [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+SPINE_COLOR = (0, 255, 255)
+
+_BONE_GROUPS = [(color, thickness, np.array(pairs)) for color, thickness, pairs in SKELETON_BONES]
+_HEAD_POINTS = np.array(HEAD_POINTS)
+_JOINT_POINTS = np.array(JOINT_POINTS)
+
+def landmark_array(landmarks):
+    """
+    (N, 3) float32 array of normalized x, y and visibility.
+    """
+    return np.array([(lm.x, lm.y, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+def project_landmarks(lm_array, w, h):
+    """
+    Pixel coordinates (N, 2) int32 and visibility mask (N,) in one step.
+    """
+    pts = (lm_array[:, :2] * (w, h)).astype(np.int32)
+    return pts, lm_array[:, 2] > VISIBILITY_THRESHOLD
+
+def _dots(pts):
+    # Degenerate polylines: each point becomes its own [p, p] segment
+    return list(np.repeat(pts[:, None, :], 2, axis=1))
+
+def draw_dots(img, pts, radius, color):
+    if len(pts):
+        cv2.polylines(img, _dots(pts), False, color, radius * 2)
+
+def draw_skeleton(img, landmarks):
+    """
+    Custom skeleton (spine, coloured limbs, head and joint markers).
+    `landmarks` is a MediaPipe landmark list or an (N, 3) array from landmark_array().
+    """
+    h, w = img.shape[:2]
+    lm_array = landmarks if isinstance(landmarks, np.ndarray) else landmark_array(landmarks)
+    pts, visible = project_landmarks(lm_array, w, h)
+
+    # Spine: shoulder centre to hip centre
+    centers = np.stack([(pts[11] + pts[12]) // 2, (pts[23] + pts[24]) // 2])
+    cv2.polylines(img, [centers], False, SPINE_COLOR, 4)
+    draw_dots(img, centers, 6, SPINE_COLOR)
+
+    for color, thickness, pairs in _BONE_GROUPS:
+        shown = pairs[visible[pairs].all(axis=1)]
+        if len(shown):
+            cv2.polylines(img, list(pts[shown]), False, color, thickness)
+
+    draw_dots(img, pts[_HEAD_POINTS[visible[_HEAD_POINTS]]], 4, SPINE_COLOR)
+    joints = pts[_JOINT_POINTS[visible[_JOINT_POINTS]]]
+    # Black outline first, white centre on top
+    draw_dots(img, joints, 9, (0, 0, 0))
+    draw_dots(img, joints, 6, (255, 255, 255))
+    return img
+
+class StaticLayer:
+    """
+    Pre-rendered panel (background box, title, ...) blended into a frame ROI.
+    `render(canvas)` draws the static content once onto a black canvas.
+    """
+    def __init__(self, size, render, alpha=1.0, background=(0, 0, 0)):
+        w, h = size
+        self.size = size
+        self.alpha = alpha
+        self.image = np.full((h, w, 3), background, dtype=np.uint8)
+        render(self.image)
+
+    def blend(self, img, x, y):
+        """
+        Paste (alpha 1) or blend the layer at (x, y); returns the ROI view for further drawing.
+        """
+        w, h = self.size
+        roi = img[y:y + h, x:x + w]
+        if roi.shape[:2] != self.image.shape[:2]:
+            return roi # Frame smaller than the panel: skip
+        if self.alpha >= 1.0:
+            roi[:] = self.image
+        else:
+            cv2.addWeighted(self.image, self.alpha, roi, 1.0 - self.alpha, 0, dst=roi)
+        return roi
+
+class TextLayer:
+    """
+    Lines of text rendered into a small cached image plus mask.
+    Only re-rendered when the text changes; otherwise a masked copy.
+    """
+    def __init__(self, font=cv2.FONT_HERSHEY_PLAIN):
+        self.font = font
+        self._key = None
+        self._image = None
+        self._mask = None
+
+    def draw(self, img, lines, origin=(0, 0)):
+        """
+        lines: [(text, (x, y) baseline relative to origin, scale, color, thickness), ...]
+        """
+        key = tuple(lines)
+        if key != self._key:
+            self._render(lines)
+            self._key = key
+        x, y = origin
+        h, w = self._image.shape[:2]
+        roi = img[y:y + h, x:x + w]
+        if roi.shape[:2] == (h, w):
+            cv2.copyTo(self._image, self._mask, roi) # Writes into the ROI view
+        return img
+
+    def _render(self, lines):
+        right, bottom = 1, 1
+        for text, (tx, ty), scale, _, thickness in lines:
+            (tw, th), baseline = cv2.getTextSize(text, self.font, scale, thickness)
+            right = max(right, tx + tw + thickness)
+            bottom = max(bottom, ty + baseline + thickness)
+        self._image = np.zeros((bottom, right, 3), dtype=np.uint8)
+        for text, pos, scale, color, thickness in lines:
+            cv2.putText(self._image, text, pos, self.font, scale, color, thickness)
+        self._mask = (self._image.max(axis=2) > 0).astype(np.uint8)
+
+class GraphPanel:
+    """
+    Line graph with a cached background/title layer; the series is one polylines call.
+    """
+    def __init__(self, title, color, max_val=180, size=(200, 100), points=50, alpha=0.5):
+        self.color = color
+        self.max_val = max_val
+        self.size = size
+        self.points = points
+        self.layer = StaticLayer(
+            size,
+            lambda canvas: cv2.putText(canvas, title, (5, 15), cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 255), 1),
+            alpha=alpha,
+        )
+
+    def draw(self, img, data, x, y):
+        roi = self.layer.blend(img, x, y)
+        values = np.asarray(data[-self.points:], dtype=np.float32)
+        if len(values) < 2 or roi.shape[:2] != self.layer.image.shape[:2]:
+            return img
+        w, h = self.size
+        xs = np.arange(len(values)) * (w / (len(values) - 1))
+        ys = h - values / self.max_val * h
+        line = np.stack([xs, ys], axis=1).astype(np.int32)
+        cv2.polylines(roi, [line], False, self.color, 2)
+        return img
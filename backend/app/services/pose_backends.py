@@ -0,0 +1,175 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import cv2
+import numpy as np
+from app.core.config import settings
+
+# Pose-estimation backends behind one interface.
+#
+# process(bgr_image) returns a PoseResult of NumPy arrays in the 33-point
+# BlazePose (MediaPipe) landmark order, or None when nobody is detected:
+# - landmarks: (33, 4) float32, normalized image x, y, relative z, visibility
+# - world_landmarks: (33, 4) float32, metres around the hip centre (y down),
+#   visibility; None if the backend cannot estimate them
+#
+# Backends with fewer keypoints fill the missing points from their nearest
+# neighbour with visibility 0, so drawing skips them and indices stay stable.
+
+NUM_LANDMARKS = 33
+X, Y, Z, VISIBILITY = range(4)
+
+PoseResult = namedtuple("PoseResult", "landmarks world_landmarks")
+
+class PoseBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def process(self, img):
+        """
+        BGR image -> PoseResult, or None when nobody is detected.
+        """
+
+    def reset(self):
+        """
+        Drop tracking state (new stream).
+        """
+
+    def close(self):
+        pass
+
+class MediaPipeBackend(PoseBackend):
+    name = "mediapipe"
+
+    def __init__(self, complexity=1, static_image_mode=False, smooth=True,
+                 enable_segmentation=False, smooth_segmentation=True,
+                 detection_confidence=0.7, track_confidence=0.7):
+        import mediapipe as mp # Deferred: graph/model setup is the slow part of startup
+
+        self.complexity = complexity
+        self.pose = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=complexity,
+            smooth_landmarks=smooth,
+            enable_segmentation=enable_segmentation,
+            smooth_segmentation=smooth_segmentation,
+            min_detection_confidence=detection_confidence,
+            min_tracking_confidence=track_confidence,
+        )
+
+    @staticmethod
+    def _array(landmark_list):
+        return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark_list.landmark], dtype=np.float32)
+
+    def process(self, img):
+        results = self.pose.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks:
+            return None
+        world = self._array(results.pose_world_landmarks) if results.pose_world_landmarks else None
+        return PoseResult(self._array(results.pose_landmarks), world)
+
+    def reset(self):
+        if hasattr(self.pose, "reset"):
+            self.pose.reset()
+
+    def close(self):
+        self.pose.close()
+
+# COCO-17 keypoint -> BlazePose index (MoveNet and most light single-person models)
+COCO_TO_BLAZEPOSE = [0, 2, 5, 7, 8, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+# BlazePose points without a COCO counterpart, copied from a neighbour (visibility 0)
+BLAZEPOSE_FILL = {
+    1: 2, 3: 2, 4: 5, 6: 5, 9: 0, 10: 0,
+    17: 15, 19: 15, 21: 15, 18: 16, 20: 16, 22: 16,
+    29: 27, 31: 27, 30: 28, 32: 28,
+}
+_FILL_TARGETS = np.array(list(BLAZEPOSE_FILL))
+_FILL_SOURCES = np.array(list(BLAZEPOSE_FILL.values()))
+TORSO_METRES = 0.5 # Assumed shoulder-centre to hip-centre distance for 2D models
+
+def pseudo_world_landmarks(landmarks, width, height):
+    """
+    Metric-ish coordinates for 2D-only models: image points centred on the hips
+    and scaled so the torso is TORSO_METRES long; z is 0.
+    """
+    pixels = landmarks[:, :2] * (width, height)
+    hips = (pixels[23] + pixels[24]) / 2
+    shoulders = (pixels[11] + pixels[12]) / 2
+    torso = np.linalg.norm(shoulders - hips)
+    if torso < 1e-6:
+        return None
+    world = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    world[:, :2] = (pixels - hips) * (TORSO_METRES / torso)
+    world[:, VISIBILITY] = landmarks[:, VISIBILITY]
+    return world
+
+class OnnxPoseBackend(PoseBackend):
+    """
+    Single-person COCO-17 keypoint model (e.g. MoveNet Lightning) on ONNX
+    Runtime's CPU provider. The input is letterboxed to the model's square
+    size; the output is read as (17, 3) rows of y, x, score.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path, intra_op_threads=1, min_score=0.3):
+        import onnxruntime as ort # Optional dependency, only needed for this backend
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.min_score = min_score
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        self.channels_first = shape[1] == 3
+        self.input_size = int(shape[2] if self.channels_first else shape[1])
+        self.input_dtype = {"tensor(int32)": np.int32, "tensor(uint8)": np.uint8}.get(model_input.type, np.float32)
+        self._canvas = np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8)
+
+    def _letterbox(self, img):
+        h, w = img.shape[:2]
+        scale = self.input_size / max(h, w)
+        new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+        pad_x, pad_y = (self.input_size - new_w) // 2, (self.input_size - new_h) // 2
+        self._canvas[:] = 0
+        resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        tensor = self._canvas.astype(self.input_dtype)
+        if self.channels_first:
+            tensor = tensor.transpose(2, 0, 1)
+        return tensor[None], scale, pad_x, pad_y
+
+    def process(self, img):
+        h, w = img.shape[:2]
+        tensor, scale, pad_x, pad_y = self._letterbox(img)
+        output = self.session.run(None, {self.input_name: tensor})[0]
+        keypoints = np.asarray(output, dtype=np.float32).reshape(-1, 3)[:len(COCO_TO_BLAZEPOSE)]
+
+        torso_scores = keypoints[[5, 6, 11, 12], 2]
+        if torso_scores.mean() < self.min_score:
+            return None
+
+        landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        # Model coordinates are normalized to the letterboxed square
+        landmarks[COCO_TO_BLAZEPOSE, X] = (keypoints[:, 1] * self.input_size - pad_x) / scale / w
+        landmarks[COCO_TO_BLAZEPOSE, Y] = (keypoints[:, 0] * self.input_size - pad_y) / scale / h
+        landmarks[COCO_TO_BLAZEPOSE, VISIBILITY] = keypoints[:, 2]
+        landmarks[_FILL_TARGETS, :3] = landmarks[_FILL_SOURCES, :3]
+        return PoseResult(landmarks, pseudo_world_landmarks(landmarks, w, h))
+
+def create_backend(name=None, complexity=1, **options):
+    """
+    Backend by name ("mediapipe" or "onnx"); defaults to settings.POSE_BACKEND.
+    MediaPipe options (static_image_mode, smooth, confidences...) pass through.
+    """
+    name = name or settings.POSE_BACKEND
+    if name == "mediapipe":
+        return MediaPipeBackend(complexity=complexity, **options)
+    if name == "onnx":
+        if not settings.POSE_ONNX_MODEL:
+            raise ValueError("POSE_ONNX_MODEL must point to a .onnx pose model")
+        return OnnxPoseBackend(settings.POSE_ONNX_MODEL, intra_op_threads=settings.POSE_ONNX_THREADS,
+                               min_score=settings.POSE_ONNX_MIN_SCORE)
+    raise ValueError(f"Unknown pose backend: {name}")
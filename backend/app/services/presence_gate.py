@@ -0,0 +1,101 @@
+import collections
+import time
+import numpy as np
+
+# Decides per frame whether pose inference is worth running.
+#
+# Active: every frame is analyzed. After `empty_after` frames in a row without
+# landmarks the scene is considered empty (idle) and only frames that show
+# motion, or every `probe_interval`-th frame (someone standing still), are
+# analyzed. Motion is plain frame differencing on a small grayscale copy, so
+# the check costs far less than one inference. Motion wakes the pipeline on
+# the frame it is seen in.
+#
+# Idle -> active -> idle transitions are kept as (start, end) presence
+# segments, a first cut of where reps begin and end.
+
+IDLE = "idle"
+ACTIVE = "active"
+
+class PresenceGate:
+    def __init__(self, empty_after=15, probe_interval=15, motion_fraction=0.002,
+                 pixel_threshold=20, size=(80, 60), max_segments=50):
+        self.empty_after = empty_after
+        self.probe_interval = probe_interval
+        self.motion_fraction = motion_fraction
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.state = ACTIVE # Start analyzing until the scene is shown to be empty
+        self.misses = 0
+        self.since_probe = 0
+        self.analyzed = 0
+        self.skipped = 0
+        self.segments = collections.deque(maxlen=max_segments) # (start, end) wall-clock
+        self.segment_start = time.time()
+        self.last_seen = None # Last frame with landmarks
+        self._previous = None
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._diff = np.empty_like(self._gray)
+
+    @property
+    def active(self):
+        return self.state == ACTIVE
+
+    def motion(self, frame):
+        """
+        True if `frame` differs noticeably from the previous frame passed in.
+        """
+        import cv2 # Deferred: API workers import the stream module without the vision stack
+
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if self._previous is None:
+            self._previous = self._gray.copy()
+            return True
+        cv2.absdiff(self._gray, self._previous, dst=self._diff)
+        self._previous, self._gray = self._gray, self._previous
+        changed = np.count_nonzero(self._diff > self.pixel_threshold)
+        return changed > self.motion_fraction * self._diff.size
+
+    def should_analyze(self, frame):
+        moving = self.motion(frame)
+        if self.active:
+            run = True
+        elif moving:
+            run = True
+        else:
+            self.since_probe += 1
+            run = self.since_probe >= self.probe_interval
+        if run:
+            self.since_probe = 0
+            self.analyzed += 1
+        else:
+            self.skipped += 1
+        return run
+
+    def observe(self, detected, now=None):
+        """
+        Result of an analyzed frame: were landmarks found?
+        """
+        now = now or time.time()
+        if detected:
+            self.misses = 0
+            self.last_seen = now
+            if not self.active:
+                self.state = ACTIVE
+                self.segment_start = now
+            return
+        self.misses += 1
+        if self.active and self.misses >= self.empty_after:
+            self.state = IDLE
+            if self.last_seen is not None and self.last_seen >= self.segment_start:
+                self.segments.append((self.segment_start, self.last_seen))
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "analyzed_frames": self.analyzed,
+            "skipped_frames": self.skipped,
+            "segments": [{"start": start, "end": end} for start, end in self.segments],
+        }
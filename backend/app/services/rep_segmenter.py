@@ -0,0 +1,167 @@
+import collections
+import numpy as np
+
+# Splits a long stream into reps (runs) and rests, incrementally.
+#
+# A rep starts once `start_steps` steps fall within `start_window` seconds
+# while the limbs are moving fast relative to the hips; it is dated back to
+# the first of those steps. It ends when no step has been seen for `end_gap`
+# seconds, or the person left the frame for that long. Runs shorter than
+# `min_duration` or with fewer than `min_steps` steps are treated as rest.
+#
+# Each finished rep gets its own cadence, GCT, stride, symmetry and score;
+# rests only keep start/end and frame counts.
+
+LIMB_POINTS = [15, 16, 25, 26, 27, 28] # Wrists, knees, ankles
+
+class RepSegmenter:
+    def __init__(self, score=None, start_speed=0.8, start_steps=2, start_window=2.0,
+                 end_gap=1.5, min_duration=2.0, min_steps=4, max_reps=200):
+        self.score = score # callable(rep dict) -> technique score, optional
+        self.start_speed = start_speed # m/s, limbs relative to the hips
+        self.start_steps = start_steps
+        self.start_window = start_window
+        self.end_gap = end_gap
+        self.min_duration = min_duration
+        self.min_steps = min_steps
+        self.reps = collections.deque(maxlen=max_reps)
+        self.rests = collections.deque(maxlen=max_reps)
+        self.origin = None # Time of the first frame; rep/rest times are offsets from it
+        self.limb_speed = 0.0 # EMA
+        self.current = None # Accumulators of the rep in progress
+        self._rest_start = None
+        self._rest_frames = 0
+        self._recent_steps = collections.deque() # (time, length, left) while resting
+        self._previous = None # (time, limb positions)
+        self._count = 0
+
+    @property
+    def active(self):
+        return self.current is not None
+
+    def _offset(self, t):
+        return round(t - self.origin, 3)
+
+    def _start(self, now):
+        first = self._recent_steps[0][0]
+        self.current = {
+            "start": first, "last_step": first, "frames": 0,
+            "steps": [], "gct": [], "min_knee": 180.0, "hip_sum": 0.0, "hip_frames": 0,
+        }
+        for step in self._recent_steps:
+            self.current["steps"].append(step)
+            self.current["last_step"] = step[0]
+        self._recent_steps.clear()
+        if self._rest_start is not None and first > self._rest_start:
+            self.rests.append({
+                "start": self._offset(self._rest_start), "end": self._offset(first),
+                "duration": round(first - self._rest_start, 2), "frames": self._rest_frames,
+            })
+        self._rest_start = None
+        self._rest_frames = 0
+
+    def _end(self, now):
+        rep, self.current = self.current, None
+        end = rep["last_step"]
+        self._rest_start = end
+        self._rest_frames = 0
+        steps = rep["steps"]
+        duration = end - rep["start"]
+        if duration < self.min_duration or len(steps) < self.min_steps:
+            return None
+
+        intervals = (steps[-1][0] - steps[0][0]) / (len(steps) - 1)
+        left = [length for _, length, is_left in steps if is_left]
+        right = [length for _, length, is_left in steps if not is_left]
+        avg_l = sum(left) / len(left) if left else 0.0
+        avg_r = sum(right) / len(right) if right else 0.0
+        self._count += 1
+        summary = {
+            "index": self._count,
+            "start": self._offset(rep["start"]),
+            "end": self._offset(end),
+            "duration": round(duration, 2),
+            "steps": len(steps),
+            "cadence": round(60.0 / intervals, 1) if intervals > 0 else 0.0,
+            "avg_gct": round(sum(rep["gct"]) / len(rep["gct"]), 1) if rep["gct"] else 0.0,
+            "avg_stride": round(sum(length for _, length, _ in steps) / len(steps), 2),
+            "min_knee_angle": round(rep["min_knee"], 1),
+            "avg_hip_angle": round(rep["hip_sum"] / rep["hip_frames"], 1) if rep["hip_frames"] else 0.0,
+            "symmetry": {
+                "left": round(avg_l / (avg_l + avg_r) * 100, 1) if avg_l + avg_r else 50.0,
+                "right": round(avg_r / (avg_l + avg_r) * 100, 1) if avg_l + avg_r else 50.0,
+            },
+            "frames": rep["frames"],
+        }
+        summary["score"] = int(self.score(summary)) if self.score else 0
+        self.reps.append(summary)
+        return summary
+
+    def update(self, now, world_lms, knee_angle, hip_angle, step_length=0.0, step_left=False, gct=0.0):
+        """
+        One analyzed frame with a person. Returns "start"/"end" on a transition.
+        """
+        if self.origin is None:
+            self.origin = now
+            self._rest_start = now
+
+        limbs = np.asarray(world_lms)[LIMB_POINTS, :3]
+        if self._previous is not None and now > self._previous[0]:
+            speed = float(np.linalg.norm(limbs - self._previous[1], axis=1).mean()) / (now - self._previous[0])
+            self.limb_speed = 0.7 * self.limb_speed + 0.3 * min(speed, 20.0)
+        self._previous = (now, limbs)
+
+        event = None
+        if self.current is None:
+            self._rest_frames += 1
+            if step_length:
+                self._recent_steps.append((now, step_length, step_left))
+            while self._recent_steps and now - self._recent_steps[0][0] > self.start_window:
+                self._recent_steps.popleft()
+            if len(self._recent_steps) >= self.start_steps and self.limb_speed >= self.start_speed:
+                self._start(now)
+                event = "start"
+        elif step_length:
+            self.current["steps"].append((now, step_length, step_left))
+            self.current["last_step"] = now
+
+        if self.current is not None:
+            rep = self.current
+            rep["frames"] += 1
+            rep["min_knee"] = min(rep["min_knee"], knee_angle)
+            rep["hip_sum"] += hip_angle
+            rep["hip_frames"] += 1
+            if gct:
+                rep["gct"].append(gct)
+            if event is None and now - rep["last_step"] > self.end_gap:
+                self._end(now)
+                event = "end"
+        return event
+
+    def idle(self, now):
+        """
+        Analyzed frame without a person (or a stretch of skipped frames).
+        """
+        self._previous = None
+        if self.current is not None and now - self.current["last_step"] > self.end_gap:
+            self._end(now)
+            return "end"
+        if self.current is None and self._rest_start is not None:
+            self._rest_frames += 1
+        return None
+
+    def finish(self, now):
+        """
+        Close the rep in progress (stream stopped).
+        """
+        if self.current is not None:
+            self._end(now)
+
+    def summary(self):
+        data = {"reps": list(self.reps), "rests": list(self.rests), "active": self.active}
+        if self.current is not None:
+            data["current"] = {
+                "start": self._offset(self.current["start"]),
+                "steps": len(self.current["steps"]),
+            }
+        return data
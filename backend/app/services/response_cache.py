@@ -0,0 +1,94 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "headers", "tags", "expires_at")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], tags: Iterable[str], ttl: float):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.headers = headers
+        self.tags = frozenset(tags)
+        self.expires_at = time.monotonic() + ttl
+
+class ResponseCache:
+    """
+    In-process cache of serialized JSON responses with tag-based invalidation.
+
+    Keys should include the requesting user and role, since the same URL returns
+    different data per caller. Tags name the data an entry was built from
+    (e.g. "history:12", "org") and are invalidated by writers.
+    The TTL bounds staleness when several workers each hold their own cache.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, payload: Any, tags: Iterable[str], headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+        entry = CachedResponse(body, headers or {}, tags, self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        wanted = set(tags)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.tags & wanted]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+def respond(request: Request, entry: CachedResponse) -> Response:
+    """
+    Build the HTTP response for a cache entry, answering 304 when the client's
+    If-None-Match already names this ETag.
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", **entry.headers}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if entry.etag in candidates or f"W/{entry.etag}" in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def history_tag(user_id: int) -> str:
+    return f"history:{user_id}"
+
+ORG_TAG = "org"
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+# Session comparisons: expensive to build, keyed by session pair rather than caller
+compare_cache = ResponseCache(max_entries=128, ttl=settings.COMPARE_CACHE_TTL_SECONDS)
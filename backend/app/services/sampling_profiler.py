@@ -0,0 +1,97 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+# In-process sampling profiler. A background thread snapshots every thread's
+# Python stack (sys._current_frames) at a fixed interval; nothing is hooked
+# into the profiled code, so the cost is one stack walk per thread per sample.
+#
+# Output is the collapsed-stack format read by flamegraph.pl, speedscope and
+# similar tools: "root;thread;outer;...;inner <count>" per line. The root frame
+# comes from `label(thread)`, which lets callers group threads by stream session.
+#
+# Time spent inside C extensions (MediaPipe graphs, cv2 calls) is attributed to
+# the Python line that called into them.
+
+# Leaf frames of threads that are only waiting (worker pools, event loop polling)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("_base.py", "result"),
+}
+
+def _short_path(filename):
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return os.path.basename(filename)
+    return os.path.basename(filename) if relative.startswith("..") else relative
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {} # code object -> frame name
+
+    @property
+    def busy(self):
+        return self._lock.locked()
+
+    def _frame_name(self, code):
+        name = self._names.get(code)
+        if name is None:
+            qualname = getattr(code, "co_qualname", code.co_name)
+            name = f"{qualname} ({_short_path(code.co_filename)})".replace(";", ":")
+            self._names[code] = name
+        return name
+
+    def profile(self, seconds, interval=0.01, label=None, include_idle=False):
+        """
+        Sample all threads for `seconds`; returns (collapsed stacks text, sample count).
+        Raises RuntimeError if a profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            return self._sample(seconds, interval, label, include_idle)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds, interval, label, include_idle):
+        own = threading.get_ident()
+        stacks = collections.Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+        while next_sample < deadline:
+            threads = {thread.ident: thread for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(self._frame_name(frame.f_code))
+                    frame = frame.f_back
+                thread = threads.get(ident)
+                thread_name = thread.name if thread else str(ident)
+                root = label(thread) if (label and thread) else "process"
+                names.append(thread_name.replace(";", ":"))
+                names.append(root.replace(";", ":"))
+                stacks[";".join(reversed(names))] += 1
+            samples += 1
+            next_sample += interval
+            time.sleep(max(0.0, next_sample - time.perf_counter()))
+        collapsed = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        return collapsed, samples
+
+profiler = SamplingProfiler()
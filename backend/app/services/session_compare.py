@@ -0,0 +1,137 @@
+import numpy as np
+from app.services.session_recorder import RECORD_COLUMNS, iter_recording
+
+# Session-vs-session comparison on recorded joint angles.
+#
+# Each recording is reduced to a uniformly sampled (n, joints) series on its
+# "active" clock: gaps between reps are collapsed, so a rest does not count
+# as a difference. The two series are aligned with dynamic time warping,
+# restricted to a Sakoe-Chiba band around the diagonal. The cost matrix is
+# filled one anti-diagonal at a time (every cell on it only depends on the
+# two previous anti-diagonals), so each step is a single NumPy expression.
+#
+# Deviation is measured along the warping path; lag is the residual shift per
+# joint (cross-correlation of the aligned curves), e.g. hips peaking later
+# than the reference even when knees line up.
+
+COMPARE_JOINTS = {
+    "knee": "RightKneeAngle",
+    "hip": "RightHipAngle",
+    "arm": "ArmAngle",
+    "trunk": "TrunkAngle",
+}
+MAX_GAP = 0.5 # Seconds; longer pauses between recorded frames are collapsed to this
+
+def load_angle_series(directory, sample_hz=15.0, max_points=2000):
+    """
+    Joint angles of a recording resampled to `sample_hz` on the active clock,
+    as (times, values (n, joints)); the rate is lowered to stay under
+    `max_points`. Returns None when the recording has fewer than two frames.
+    """
+    columns = [RECORD_COLUMNS.index("Timestamp")] + [RECORD_COLUMNS.index(c) for c in COMPARE_JOINTS.values()]
+    rows = [[float(row[i]) for i in columns] for row in iter_recording(directory)]
+    if len(rows) < 2:
+        return None
+    data = np.asarray(rows)
+    active = np.concatenate([[0.0], np.cumsum(np.clip(np.diff(data[:, 0]), 0, MAX_GAP))])
+    duration = active[-1]
+    if duration <= 0:
+        return None
+    count = int(min(max_points, max(2, duration * sample_hz)))
+    times = np.linspace(0.0, duration, count)
+    values = np.stack([np.interp(times, active, data[:, k]) for k in range(1, data.shape[1])], axis=1)
+    return times, values.astype(np.float32)
+
+def banded_dtw(a, b, band=0.1):
+    """
+    DTW of `a` (n, d) against `b` (m, d) with Euclidean frame cost, limited
+    to |j - i*m/n| <= band * max(n, m). Returns (path as (k, 2) indices, mean cost per step).
+    """
+    n, m = len(a), len(b)
+    slope = m / n
+    width = max(band * max(n, m), slope, 1 / slope, 1.0) # Never too narrow to connect
+    cost = np.full((n + 1, m + 1), np.inf, dtype=np.float32)
+    cost[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        # Cells (i, j) with i + j = k inside the band: |k - i - i*slope| <= width
+        lo = max(1, k - m, int(np.ceil((k - width) / (1 + slope))))
+        hi = min(n, k - 1, int(np.floor((k + width) / (1 + slope))))
+        if lo > hi:
+            continue
+        i = np.arange(lo, hi + 1)
+        j = k - i
+        frame_cost = np.sqrt(((a[i - 1] - b[j - 1]) ** 2).sum(axis=1))
+        cost[i, j] = frame_cost + np.minimum(np.minimum(cost[i - 1, j], cost[i, j - 1]), cost[i - 1, j - 1])
+    if not np.isfinite(cost[n, m]):
+        raise ValueError("Band too narrow to align the series")
+
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        moves = (cost[i - 1, j - 1], cost[i - 1, j], cost[i, j - 1])
+        step = int(np.argmin(moves))
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    path = np.array(path[::-1])
+    return path, float(cost[n, m]) / len(path)
+
+def residual_lag(a, b, max_shift):
+    """
+    Shift (samples) of `b` against `a` with the highest correlation, per column.
+    Positive: `b` happens later.
+    """
+    n = len(a)
+    if n <= 2 * max_shift + 1:
+        return np.zeros(a.shape[1], dtype=int)
+    a = a - a.mean(axis=0)
+    b = b - b.mean(axis=0)
+    shifts = np.arange(-max_shift, max_shift + 1)
+    core = a[max_shift:n - max_shift] # (n - 2s, d)
+    # windows[s] = b shifted by shifts[s], aligned with core: (shifts, n - 2s, d)
+    windows = np.lib.stride_tricks.sliding_window_view(b, len(core), axis=0).transpose(0, 2, 1)
+    scores = (windows * core).sum(axis=1) / (np.linalg.norm(windows, axis=1) * np.linalg.norm(core, axis=0) + 1e-9)
+    lags = shifts[np.argmax(scores, axis=0)]
+    lags[scores.max(axis=0) <= 1e-6] = 0 # Flat curve: nothing to line up
+    return lags
+
+def compare_series(series_a, series_b, band=0.1, points=300, max_lag=0.5):
+    """
+    Align two load_angle_series() results. Returns aligned curves (resampled to
+    `points` along the warping path) and per-joint deviation and lag.
+    """
+    times_a, values_a = series_a
+    times_b, values_b = series_b
+    path, step_cost = banded_dtw(values_a, values_b, band)
+    aligned_a = values_a[path[:, 0]]
+    aligned_b = values_b[path[:, 1]]
+    diff = aligned_b - aligned_a
+
+    rate = (len(times_a) - 1) / times_a[-1] if times_a[-1] > 0 else 1.0
+    lags = residual_lag(aligned_a, aligned_b, max(1, int(max_lag * rate)))
+    picks = np.linspace(0, len(path) - 1, min(points, len(path))).round().astype(int)
+
+    joints = {}
+    for k, name in enumerate(COMPARE_JOINTS):
+        joints[name] = {
+            "mean_abs_deviation": round(float(np.abs(diff[:, k]).mean()), 2),
+            "rms_deviation": round(float(np.sqrt((diff[:, k] ** 2).mean())), 2),
+            "max_deviation": round(float(np.abs(diff[:, k]).max()), 2),
+            "mean_difference": round(float(diff[:, k].mean()), 2), # b - a, degrees
+            "lag_seconds": round(float(lags[k] / rate), 3),
+            "a": np.round(aligned_a[picks, k], 1).tolist(),
+            "b": np.round(aligned_b[picks, k], 1).tolist(),
+        }
+    return {
+        "duration_a": round(float(times_a[-1]), 2),
+        "duration_b": round(float(times_b[-1]), 2),
+        "time_a": np.round(times_a[path[picks, 0]], 2).tolist(),
+        "time_b": np.round(times_b[path[picks, 1]], 2).tolist(),
+        "path_length": len(path),
+        "alignment_cost": round(step_cost, 2), # Mean per-step distance over all joints, degrees
+        "joints": joints,
+    }
@@ -0,0 +1,170 @@
+import csv
+import glob
+import os
+import queue
+import threading
+
+# One row per processed frame. Step/GCT columns are 0 on frames without an event.
+RECORD_COLUMNS = [
+    "Frame", "Timestamp",
+    "RightKneeAngle", "RightHipAngle", "ArmAngle", "TrunkAngle",
+    "RawKneeAngle", "RawHipAngle",
+    "Cadence", "StrideLength", "GCT",
+    "StepEvent", "StepLength", "GCTEvent",
+    "SymmetryLeft", "SymmetryRight",
+]
+
+_STOP = object()
+
+def iter_recording(directory):
+    """
+    Read a finished (or in-progress) recording directory without a recorder instance.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, "chunk_*.csv"))):
+        with open(path, newline="") as f:
+            yield from csv.reader(f)
+
+class SessionRecorder:
+    """
+    Streams per-frame telemetry to append-only CSV chunk files on a background thread.
+
+    append() only enqueues a tuple, so the analysis loop never touches the disk.
+    Each chunk holds at most `chunk_rows` rows; readers iterate the chunks in order,
+    which keeps both recording and export at constant memory.
+    If a write fails (disk full, directory removed) the recorder is marked failed:
+    later rows are dropped, and flush()/close() still return.
+    """
+    def __init__(self, directory, chunk_rows=50000, max_pending=20000):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self.closed = False
+        self.failed = False
+        self.error = None
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._chunk_index = len(self._chunk_paths())
+        self._chunk_file = None
+        self._chunk_writer = None
+        self._chunk_rows = 0
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    def append(self, row):
+        if self.closed or self.failed:
+            return
+        # Blocks only if the disk falls ~max_pending frames behind; a failed
+        # writer keeps draining the queue, so this cannot block forever
+        self._queue.put(row)
+
+    def flush(self):
+        """
+        Wait until every row appended so far is on disk.
+        """
+        if not self.closed:
+            self._queue.join()
+
+    def close(self):
+        if self.closed:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.closed = True
+
+    def _chunk_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, "chunk_*.csv")))
+
+    def _open_chunk(self):
+        path = os.path.join(self.directory, f"chunk_{self._chunk_index:05d}.csv")
+        self._chunk_index += 1
+        self._chunk_file = open(path, "w", newline="")
+        self._chunk_writer = csv.writer(self._chunk_file)
+        self._chunk_rows = 0
+
+    def _close_chunk(self):
+        if self._chunk_file:
+            self._chunk_file.close()
+            self._chunk_file = None
+            self._chunk_writer = None
+
+    def _write(self, row):
+        if self.failed:
+            return
+        try:
+            self._write_row(row)
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error):
+        print(f"Session recorder {self.recording_id} stopped writing: {error}")
+        self.failed = True
+        self.error = str(error)
+        try:
+            self._close_chunk()
+        except Exception:
+            self._chunk_file = None
+            self._chunk_writer = None
+
+    def _write_row(self, row):
+        if self._chunk_file is None or self._chunk_rows >= self.chunk_rows:
+            self._close_chunk()
+            self._open_chunk()
+        self._chunk_writer.writerow(row)
+        self._chunk_rows += 1
+        self.rows_written += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            done = item is _STOP
+            if not done:
+                self._write(item)
+            # Drain whatever else is waiting before paying for a flush
+            batch = 1
+            while not done:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch += 1
+                if item is _STOP:
+                    done = True
+                else:
+                    self._write(item)
+            if self._chunk_file:
+                try:
+                    self._chunk_file.flush()
+                except Exception as e:
+                    self._fail(e)
+            for _ in range(batch):
+                self._queue.task_done()
+            if done:
+                try:
+                    self._close_chunk()
+                except Exception as e:
+                    self._fail(e)
+                return
+
+    @property
+    def recording_id(self):
+        return os.path.basename(os.path.normpath(self.directory))
+
+    def iter_rows(self):
+        """
+        Yield recorded rows (as lists of strings) in order, one chunk file at a time.
+        """
+        self.flush()
+        yield from iter_recording(self.directory)
+
+    def export_csv(self, filename, columns=None):
+        """
+        Write the full recording to `filename` with a header row.
+        `columns` selects a subset of RECORD_COLUMNS (default: all).
+        """
+        indices = [RECORD_COLUMNS.index(c) for c in columns] if columns else None
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns or RECORD_COLUMNS)
+            for row in self.iter_rows():
+                writer.writerow([row[i] for i in indices] if indices else row)
@@ -0,0 +1,211 @@
+import threading
+import numpy as np
+from app.core.config import settings
+from app.services.gait_cycles import CYCLE_POINTS, unpack_profile
+
+# Nearest-neighbour search over sessions' gait-cycle embeddings.
+#
+# An embedding is the session's mean cycle curves (knee, hip, arm, trunk at
+# every EMBED_STEP-th phase point) plus cadence and GCT, each scaled so that
+# one unit is a "clearly different" amount (ANGLE_SCALE degrees, 20 spm,
+# 50 ms). Euclidean distance between embeddings is then a similarity score.
+#
+# The index is a growing float32 matrix in process memory. Queries are one
+# matrix-vector product plus argpartition (brute force, exact). Above
+# SIMILARITY_ANN_MIN_SESSIONS an inverted-file index (k-means cells) narrows
+# the candidates to the SIMILARITY_ANN_PROBES nearest cells, widened when the
+# filters leave fewer than k; one athlete's sessions are always searched
+# exactly. The index only grows through refresh(), so saves in this worker
+# (history.save_session) and in others are picked up the same way: the first
+# call streams every profile in id-ordered batches, later ones compare the ids
+# of the last REFRESH_LOOKBACK sessions with the ids already held and load the
+# missing ones. A session committed after a newer one (concurrent writers)
+# is therefore still found, as long as fewer than REFRESH_LOOKBACK sessions
+# overtook it.
+
+EMBED_STEP = 4 # Phase points 0, 4, ..., 100 %
+ANGLE_SCALE = 15.0 # Degrees
+CADENCE_SCALE = 20.0 # Steps per minute
+GCT_SCALE = 50.0 # Milliseconds
+_PHASES = np.arange(0, CYCLE_POINTS, EMBED_STEP)
+REFRESH_LOOKBACK = 1000 # Session ids re-checked below the highest one held
+
+def embed(mean_curves, cadence, gct):
+    """
+    Fixed-length float32 embedding from a (channels, CYCLE_POINTS) mean cycle.
+    """
+    curves = np.asarray(mean_curves, dtype=np.float32)[:, _PHASES] / ANGLE_SCALE
+    return np.concatenate([curves.ravel(), [(cadence or 0.0) / CADENCE_SCALE, (gct or 0.0) / GCT_SCALE]]).astype(np.float32)
+
+def embed_session(session):
+    """
+    Embedding of an AnalysisSession row, or None without a cycle profile.
+    """
+    if not session.cycle_profile:
+        return None
+    mean, _ = unpack_profile(session.cycle_profile)
+    return embed(mean, session.avg_cadence, session.avg_gct)
+
+class SimilarityIndex:
+    def __init__(self, ann_min_size=50000, ann_probes=8):
+        self.ann_min_size = ann_min_size
+        self.ann_probes = ann_probes
+        self.count = 0
+        self.last_id = 0 # Highest session id loaded from the database
+        self.loaded = False
+        self._known = set() # Session ids held
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._users = np.zeros(0, dtype=np.int64)
+        self._vectors = None
+        self._norms = np.zeros(0, dtype=np.float32) # Squared, for the distance expansion
+        self._centroids = None # IVF cells, built once the index is large enough
+        self._cells = np.zeros(0, dtype=np.int32)
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _grow(self, dim, needed):
+        capacity = len(self._ids)
+        if self._vectors is not None and needed <= capacity:
+            return
+        capacity = max(1024, capacity * 2, needed)
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        if self._vectors is not None:
+            vectors[:self.count] = self._vectors[:self.count]
+        self._vectors = vectors
+        for name, dtype in (("_ids", np.int64), ("_users", np.int64), ("_norms", np.float32), ("_cells", np.int32)):
+            array = np.zeros(capacity, dtype=dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def add_many(self, session_ids, user_ids, vectors):
+        with self._lock:
+            # Two refreshes racing may both fetch the same rows; keep the first copy
+            session_ids = np.asarray(session_ids, dtype=np.int64)
+            fresh = np.array([session_id not in self._known for session_id in session_ids.tolist()], dtype=bool)
+            session_ids = session_ids[fresh]
+            user_ids = np.asarray(user_ids, dtype=np.int64)[fresh]
+            vectors = np.asarray(vectors, dtype=np.float32)[fresh]
+            if not len(vectors):
+                return
+            start, end = self.count, self.count + len(vectors)
+            self._grow(vectors.shape[1], end)
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = session_ids
+            self._users[start:end] = user_ids
+            self._norms[start:end] = (vectors ** 2).sum(axis=1)
+            self.count = end
+            self._known.update(session_ids.tolist())
+            self.last_id = max(self.last_id, int(session_ids.max()))
+            if self._centroids is not None:
+                self._cells[start:end] = self._nearest_cells(vectors, 1)[:, 0]
+            if end >= self.ann_min_size and end >= 2 * self._built_at:
+                self._build_cells()
+
+    def _nearest_cells(self, vectors, n):
+        distances = (self._centroids ** 2).sum(axis=1) - 2 * vectors @ self._centroids.T
+        return np.argsort(distances, axis=1)[:, :n]
+
+    def _build_cells(self, iterations=8, seed=0):
+        # k-means (Lloyd) on a sample, then every vector is assigned to its cell
+        rng = np.random.default_rng(seed)
+        vectors = self._vectors[:self.count]
+        cells = int(np.sqrt(self.count))
+        sample = vectors[rng.choice(self.count, min(self.count, cells * 40), replace=False)]
+        self._centroids = sample[rng.choice(len(sample), cells, replace=False)].copy()
+        for _ in range(iterations):
+            assigned = self._nearest_cells(sample, 1)[:, 0]
+            sums = np.zeros_like(self._centroids)
+            np.add.at(sums, assigned, sample)
+            sizes = np.bincount(assigned, minlength=cells)[:, None]
+            self._centroids = np.where(sizes > 0, sums / np.maximum(sizes, 1), self._centroids)
+        for start in range(0, self.count, 8192):
+            chunk = vectors[start:start + 8192]
+            self._cells[start:start + len(chunk)] = self._nearest_cells(chunk, 1)[:, 0]
+        self._built_at = self.count
+
+    def search(self, vector, k=10, user_id=None, exclude_user=None, exclude_id=None, per_user=False):
+        """
+        The `k` nearest sessions as (session_id, user_id, distance), closest first.
+        `user_id` keeps one athlete's sessions, `exclude_user` drops them;
+        `per_user` keeps only each athlete's closest session.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            n = self.count
+            if not n:
+                return []
+            ids, users = self._ids[:n], self._users[:n]
+            keep = np.ones(n, dtype=bool)
+            if user_id is not None:
+                keep &= users == user_id
+            if exclude_user is not None:
+                keep &= users != exclude_user
+            if exclude_id is not None:
+                keep &= ids != exclude_id
+            mask = keep
+            if self._centroids is not None and user_id is None:
+                # One athlete's sessions are few: those are searched exactly. Otherwise
+                # probe more cells until enough candidates survive the filters
+                ranked = self._nearest_cells(vector[None], len(self._centroids))[0]
+                probes = self.ann_probes
+                while True:
+                    mask = keep & np.isin(self._cells[:n], ranked[:probes])
+                    found = len(np.unique(users[mask])) if per_user else np.count_nonzero(mask)
+                    if found >= k or probes >= len(ranked):
+                        break
+                    probes *= 2
+            candidates = np.flatnonzero(mask)
+            distances = self._norms[candidates] - 2 * (self._vectors[candidates] @ vector) + vector @ vector
+            ids, users = ids[candidates], users[candidates]
+
+        if per_user:
+            order = np.argsort(distances, kind="stable")
+            _, first = np.unique(users[order], return_index=True)
+            order = order[np.sort(first)][:k]
+        else:
+            k = min(k, len(distances))
+            order = np.argpartition(distances, k - 1)[:k] if k else np.zeros(0, dtype=int)
+            order = order[np.argsort(distances[order])]
+        return [(int(ids[i]), int(users[i]), float(np.sqrt(max(distances[i], 0.0)))) for i in order]
+
+    def _add_rows(self, rows, batch):
+        pending = []
+        for row in rows:
+            pending.append(row)
+            if len(pending) >= batch:
+                self._add_pending(pending)
+                pending = []
+        self._add_pending(pending)
+
+    def _add_pending(self, rows):
+        if rows:
+            self.add_many(
+                [row.id for row in rows], [row.user_id for row in rows],
+                [embed(unpack_profile(row.cycle_profile)[0], row.avg_cadence, row.avg_gct) for row in rows],
+            )
+
+    def refresh(self, db, batch=1000):
+        """
+        Load sessions saved since the last call (all of them the first time).
+        """
+        from app.models.session import AnalysisSession
+
+        columns = (AnalysisSession.id, AnalysisSession.user_id, AnalysisSession.cycle_profile,
+                   AnalysisSession.avg_cadence, AnalysisSession.avg_gct)
+        has_profile = AnalysisSession.cycle_profile.isnot(None)
+        if not self.loaded:
+            rows = db.query(*columns).filter(has_profile).order_by(AnalysisSession.id).yield_per(batch)
+            self._add_rows(rows, batch)
+            self.loaded = True
+            return
+
+        recent = db.query(AnalysisSession.id).filter(AnalysisSession.id > self.last_id - REFRESH_LOOKBACK, has_profile)
+        missing = [row.id for row in recent if row.id not in self._known]
+        for start in range(0, len(missing), batch):
+            rows = db.query(*columns).filter(AnalysisSession.id.in_(missing[start:start + batch])).order_by(AnalysisSession.id)
+            self._add_rows(rows, batch)
+
+similarity_index = SimilarityIndex(
+    ann_min_size=settings.SIMILARITY_ANN_MIN_SESSIONS,
+    ann_probes=settings.SIMILARITY_ANN_PROBES,
+)
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+# Running/paused/stopped state shared by a frame loop and the endpoints that
+# control it. Waiting is event driven: threads block on a Condition, event
+# loops await an asyncio.Event that is set thread-safely, so a paused or
+# stopped stream costs no CPU and resume/stop wake it immediately.
+
+RUNNING = "running"
+PAUSED = "paused"
+STOPPED = "stopped"
+
+class StreamControl:
+    def __init__(self, state=STOPPED):
+        self._state = state
+        self._version = 0 # Bumped on every change, so waiters can also wait for "anything changed"
+        self._cond = threading.Condition()
+        self._async_waiters = set() # (loop, asyncio.Event)
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def running(self):
+        return self._state == RUNNING
+
+    @property
+    def paused(self):
+        return self._state == PAUSED
+
+    @property
+    def stopped(self):
+        return self._state == STOPPED
+
+    def start(self):
+        self._set(RUNNING)
+
+    def pause(self):
+        self._set(PAUSED, only_from=RUNNING)
+
+    def resume(self):
+        self._set(RUNNING, only_from=PAUSED)
+
+    def stop(self):
+        self._set(STOPPED)
+
+    def notify(self):
+        """
+        Wake waiters without changing state (e.g. the source was replaced).
+        """
+        self._set(None)
+
+    def _set(self, state, only_from=None):
+        with self._cond:
+            if only_from is not None and self._state != only_from:
+                return
+            if state is not None:
+                self._state = state
+            self._version += 1
+            waiters = list(self._async_waiters)
+            self._cond.notify_all()
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def wait_active(self, timeout=None):
+        """
+        Block while paused. Returns True if running, False if stopped or
+        still paused after `timeout` seconds.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._state != PAUSED, timeout)
+            return self._state == RUNNING
+
+    def wait_changed(self, version, timeout=None):
+        """
+        Block until something changed since `version`; returns the new version.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != version, timeout)
+            return self._version
+
+    async def wait_active_async(self):
+        """
+        Await (without holding a thread) while paused. True if running, False if stopped.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._state != PAUSED:
+                    return self._state == RUNNING
+                waiter = (loop, asyncio.Event())
+                self._async_waiters.add(waiter)
+            try:
+                await waiter[1].wait()
+            finally:
+                with self._cond:
+                    self._async_waiters.discard(waiter)
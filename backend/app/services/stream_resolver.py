@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+# Resolves YouTube (or any yt-dlp supported) page URLs to direct media URLs.
+#
+# - TTL cache keyed by (video id, format); googlevideo URLs carry an `expire`
+#   query parameter, which caps the TTL so a signed URL is never served stale.
+# - Single-flight: concurrent lookups of the same key share one extraction.
+# - Background refresh: entries close to expiry are re-resolved off the request
+#   path (on access, and by a refresher thread for recently used entries).
+#
+# The extractor is injectable: any callable (page_url, fmt) -> info dict with a
+# "url" key. Tests pass a local stub instead of hitting the network.
+
+DEFAULT_FORMAT = "best[ext=mp4]/best"
+
+class YtDlpExtractor:
+    def __init__(self, **base_opts):
+        self.base_opts = {"quiet": True, "no_warnings": True, "noplaylist": True, **base_opts}
+
+    def __call__(self, page_url, fmt):
+        import yt_dlp # Heavy; only loaded when something is actually resolved
+
+        with yt_dlp.YoutubeDL({**self.base_opts, "format": fmt}) as ydl:
+            return ydl.extract_info(page_url, download=False)
+
+def video_key(page_url):
+    """
+    Stable id for a YouTube URL (watch?v=, youtu.be/, shorts/, embed/); other URLs map to themselves.
+    """
+    parsed = urlparse(page_url)
+    host = (parsed.hostname or "").lower()
+    if host.endswith("youtu.be"):
+        return parsed.path.strip("/").split("/")[0] or page_url
+    if "youtube.com" in host:
+        video_id = parse_qs(parsed.query).get("v")
+        if video_id:
+            return video_id[0]
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            return parts[1]
+    return page_url
+
+def url_expiry(media_url):
+    """
+    Unix time at which a signed media URL expires, if it says so.
+    """
+    parsed = urlparse(media_url)
+    values = parse_qs(parsed.query).get("expire")
+    if not values:
+        # googlevideo sometimes puts parameters in the path: /expire/<ts>/...
+        parts = parsed.path.split("/")
+        if "expire" in parts and parts.index("expire") + 1 < len(parts):
+            values = [parts[parts.index("expire") + 1]]
+    try:
+        return float(values[0]) if values else None
+    except ValueError:
+        return None
+
+class _Entry:
+    __slots__ = ("page_url", "fmt", "media_url", "expires_at", "last_used")
+
+    def __init__(self, page_url, fmt, media_url, expires_at, now):
+        self.page_url = page_url
+        self.fmt = fmt
+        self.media_url = media_url
+        self.expires_at = expires_at
+        self.last_used = now
+
+class StreamResolver:
+    def __init__(self, extractor=None, ttl=3600.0, refresh_margin=300.0, max_entries=256,
+                 auto_refresh=True, clock=time.time):
+        self.extractor = extractor or YtDlpExtractor()
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.max_entries = max_entries
+        self.auto_refresh = auto_refresh
+        self.clock = clock
+        self.extractions = 0
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stream-resolver")
+        self._refresher = None
+
+    def resolve(self, page_url, fmt=DEFAULT_FORMAT, timeout=None):
+        """
+        Direct media URL for `page_url`. Blocks only on a cache miss; raises the
+        extractor's exception if extraction fails.
+        """
+        key = (video_key(page_url), fmt)
+        now = self.clock()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and now < entry.expires_at:
+                entry.last_used = now
+                self._cache.move_to_end(key)
+                stale_soon = entry.expires_at - now < self.refresh_margin
+            else:
+                entry = None
+        if entry:
+            if stale_soon:
+                self._executor.submit(self._load, key, page_url, fmt)
+            return entry.media_url
+        return self._load(key, page_url, fmt).result(timeout)
+
+    def prefetch(self, page_url, fmt=DEFAULT_FORMAT):
+        """
+        Start resolving in the background (e.g. while the user is still picking a source).
+        """
+        key = (video_key(page_url), fmt)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and self.clock() < entry.expires_at - self.refresh_margin:
+                return
+        self._executor.submit(self._load, key, page_url, fmt)
+
+    def invalidate(self, page_url, fmt=DEFAULT_FORMAT):
+        with self._lock:
+            self._cache.pop((video_key(page_url), fmt), None)
+
+    def _load(self, key, page_url, fmt):
+        # Single-flight: whoever registers the future first does the extraction
+        with self._lock:
+            future = self._inflight.get(key)
+            if future:
+                return future
+            future = Future()
+            self._inflight[key] = future
+        try:
+            self.extractions += 1
+            info = self.extractor(page_url, fmt)
+            media_url = info["url"]
+            self._store(key, page_url, fmt, media_url)
+            future.set_result(media_url)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future
+
+    def _store(self, key, page_url, fmt, media_url):
+        now = self.clock()
+        expires_at = now + self.ttl
+        signed_expiry = url_expiry(media_url)
+        if signed_expiry:
+            expires_at = min(expires_at, signed_expiry)
+        with self._lock:
+            self._cache[key] = _Entry(page_url, fmt, media_url, expires_at, now)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        if self.auto_refresh:
+            self._start_refresher()
+
+    def _start_refresher(self):
+        with self._lock:
+            if self._refresher and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="stream-resolver-refresh", daemon=True)
+            self._refresher.start()
+
+    def refresh_due(self):
+        """
+        Re-resolve entries used within the last TTL that expire within refresh_margin.
+        """
+        now = self.clock()
+        with self._lock:
+            due = [
+                (key, entry.page_url, entry.fmt) for key, entry in self._cache.items()
+                if entry.expires_at - now < self.refresh_margin and now - entry.last_used < self.ttl
+            ]
+        for key, page_url, fmt in due:
+            self._executor.submit(self._load, key, page_url, fmt)
+        return len(due)
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(max(1.0, self.refresh_margin / 2))
+            self.refresh_due()
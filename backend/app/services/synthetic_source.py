@@ -0,0 +1,116 @@
+import time
+import numpy as np
+
+# Camera stand-in for latency measurement: frames carry the wall-clock time
+# they were produced, as a row of black/white cells along the bottom edge
+# (sync cells, 44-bit millisecond timestamp, 4-bit checksum). The cells are
+# 16 px wide, so the stamp survives JPEG compression and the MJPEG encoder's
+# downscaling, and a client on the same clock can compute glass-to-glass delay.
+
+SYNTHETIC_PREFIX = "synthetic"
+WIDTH, HEIGHT = 800, 600
+TIMESTAMP_BITS = 44
+CHECK_BITS = 4
+CELLS = 2 + TIMESTAMP_BITS + CHECK_BITS # 50 cells x 16 px = full width
+STRIP_TOP, STRIP_BOTTOM = 0.93, 0.99 # Fraction of the frame height
+
+def is_synthetic_source(source):
+    return isinstance(source, str) and (source == SYNTHETIC_PREFIX or source.startswith(SYNTHETIC_PREFIX + ":"))
+
+def synthetic_fps(source, default=30.0):
+    """
+    "synthetic" or "synthetic:<fps>".
+    """
+    _, _, fps = source.partition(":")
+    try:
+        return max(1.0, float(fps)) if fps else default
+    except ValueError:
+        return default
+
+def _cells(millis):
+    millis &= (1 << TIMESTAMP_BITS) - 1
+    check = bin(millis).count("1") & ((1 << CHECK_BITS) - 1)
+    bits = [1, 0]
+    bits += [(millis >> i) & 1 for i in reversed(range(TIMESTAMP_BITS))]
+    bits += [(check >> i) & 1 for i in reversed(range(CHECK_BITS))]
+    return bits
+
+def stamp(image, timestamp):
+    """
+    Draw `timestamp` (seconds since the epoch) into the bottom strip of `image`.
+    """
+    h, w = image.shape[:2]
+    top, bottom = int(h * STRIP_TOP), int(h * STRIP_BOTTOM)
+    edges = np.linspace(0, w, CELLS + 1).astype(int)
+    for i, bit in enumerate(_cells(int(timestamp * 1000))):
+        image[top:bottom, edges[i]:edges[i + 1]] = 255 if bit else 0
+    return image
+
+def read_stamp(image):
+    """
+    Timestamp (seconds) drawn by stamp(), or None if the strip does not decode.
+    Works on frames of any size (the encoder may have scaled them).
+    """
+    h, w = image.shape[:2]
+    gray = image if image.ndim == 2 else image.mean(axis=2)
+    row = gray[int(h * (STRIP_TOP + STRIP_BOTTOM) / 2)]
+    centers = ((np.arange(CELLS) + 0.5) * w / CELLS).astype(int)
+    bits = [int(row[c] > 127) for c in centers]
+    if bits[:2] != [1, 0]:
+        return None
+    millis = int("".join(map(str, bits[2:2 + TIMESTAMP_BITS])), 2)
+    check = int("".join(map(str, bits[2 + TIMESTAMP_BITS:])), 2)
+    if bin(millis).count("1") & ((1 << CHECK_BITS) - 1) != check:
+        return None
+    # Restore the high bits dropped by the 44-bit field from the local clock
+    now = int(time.time() * 1000)
+    span = 1 << TIMESTAMP_BITS
+    millis += (now - millis + span // 2) // span * span
+    return millis / 1000
+
+class SyntheticClockCapture:
+    """
+    cv2.VideoCapture look-alike producing stamped frames at `fps`, paced like
+    a live camera (read() blocks until the next frame is due).
+    """
+    def __init__(self, fps=30.0, size=(WIDTH, HEIGHT)):
+        self.fps = fps
+        self.size = size
+        self.frame_count = 0
+        self._next = None
+        self._opened = True
+        w, h = size
+        self._base = np.full((h, w, 3), 40, dtype=np.uint8)
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        now = time.perf_counter()
+        if self._next is None:
+            self._next = now
+        elif now < self._next:
+            time.sleep(self._next - now)
+        else:
+            self._next = max(self._next, now - 1.0 / self.fps) # Late: don't burst to catch up
+        self._next += 1.0 / self.fps
+
+        frame = self._base.copy()
+        w, h = self.size
+        # Sweeping bar so the motion is visible when watching the stream
+        x = int(self.frame_count * 8 % w)
+        frame[int(h * 0.2):int(h * 0.8), x:x + 24] = (0, 200, 255)
+        self.frame_count += 1
+        return True, stamp(frame, time.time())
+
+    def set(self, prop, value):
+        self.frame_count = int(value) if value else 0
+        return True
+
+    def get(self, prop):
+        return 0.0
+
+    def release(self):
+        self._opened = False
@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+import os
+import re
+import zlib
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.services.session_recorder import RECORD_COLUMNS, iter_recording
+
+# Streaming exporters for recorded session telemetry.
+# Each generator yields bytes as it goes, so a multi-hour recording starts
+# downloading immediately and is never held in memory.
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+ROWS_PER_BATCH = 5000
+_RECORDING_ID = re.compile(r"^[0-9a-f]{32}$")
+_INT_COLUMNS = {"Frame", "StepEvent"}
+
+def recording_dir(recording_id):
+    """
+    Directory of a recording, or None if the id is malformed or unknown.
+    """
+    if not recording_id or not _RECORDING_ID.match(recording_id):
+        return None
+    path = os.path.join(settings.RECORDINGS_DIR, recording_id)
+    return path if os.path.isdir(path) else None
+
+def load_reps(recording_id):
+    """
+    Rep summaries written next to a recording (reps.json), or [].
+    """
+    directory = recording_dir(recording_id)
+    path = os.path.join(directory, "reps.json") if directory else None
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f).get("reps", [])
+
+def load_cycles(recording_id):
+    """
+    Gait-cycle envelope written next to a recording (cycles.npz) as
+    (mean, std, count), or None.
+    """
+    directory = recording_dir(recording_id)
+    path = os.path.join(directory, "cycles.npz") if directory else None
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return data["mean"], data["std"], int(data["count"])
+
+def _batches(rows, size=ROWS_PER_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_csv(rows, compress=False):
+    encoder = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None # wbits=31 -> gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def emit(text):
+        data = text.encode()
+        return encoder.compress(data) if encoder else data
+
+    writer.writerow(RECORD_COLUMNS)
+    for batch in _batches(rows):
+        writer.writerows(batch)
+        chunk = emit(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        if chunk:
+            yield chunk
+    tail = emit(buffer.getvalue())
+    if encoder:
+        tail += encoder.flush()
+    if tail:
+        yield tail
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the generator.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)")
+    return pyarrow
+
+def arrow_schema(pa):
+    return pa.schema([
+        (name, pa.int32() if name in _INT_COLUMNS else pa.float32()) for name in RECORD_COLUMNS
+    ])
+
+def record_batch(pa, schema, batch):
+    """
+    Rows of recorder strings -> RecordBatch typed by `schema` (int or float columns).
+    """
+    columns = list(zip(*batch))
+    arrays = [
+        pa.array([int(v) for v in col] if pa.types.is_integer(field.type) else [float(v) for v in col], type=field.type)
+        for field, col in zip(schema, columns)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def iter_parquet(rows, compress=False):
+    pa = require_pyarrow()
+    import pyarrow.parquet as pq
+    schema = arrow_schema(pa)
+    sink = _ChunkSink()
+    # Parquet compresses per column chunk; "none" keeps encoding cheapest
+    writer = pq.ParquetWriter(sink, schema, compression="zstd" if compress else "none")
+    for batch in _batches(rows):
+        writer.write_batch(record_batch(pa, schema, batch))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+def iter_arrow(rows, compress=False):
+    pa = require_pyarrow()
+    schema = arrow_schema(pa)
+    sink = _ChunkSink()
+    options = pa.ipc.IpcWriteOptions(compression="zstd" if compress else None)
+    writer = pa.ipc.new_stream(sink, schema, options=options)
+    for batch in _batches(rows):
+        writer.write_batch(record_batch(pa, schema, batch))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+_EXPORTERS = {"csv": iter_csv, "parquet": iter_parquet, "arrow": iter_arrow}
+
+def export_stream(directory, fmt="csv", compress=False):
+    """
+    Byte generator for a recording in the given format.
+    Raises RuntimeError up front if the format's dependency is missing.
+    """
+    if fmt in ("parquet", "arrow"):
+        require_pyarrow()
+    return _EXPORTERS[fmt](iter_recording(directory), compress=compress)
+
+def export_filename(recording_id, fmt, compress):
+    name = f"telemetry_{recording_id}.{EXPORT_FORMATS[fmt][1]}"
+    return name + ".gz" if compress and fmt == "csv" else name
+
+def export_response(recording_id, fmt="csv", compress=False):
+    """
+    StreamingResponse download of a recording; HTTP errors for bad format/id
+    or a missing optional dependency.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    directory = recording_dir(recording_id)
+    if not directory:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    try:
+        body = export_stream(directory, fmt, compress)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    media_type = EXPORT_FORMATS[fmt][0]
+    if compress and fmt == "csv":
+        media_type = "application/gzip"
+    filename = export_filename(recording_id, fmt, compress)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
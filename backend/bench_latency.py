@@ -0,0 +1,203 @@
+"""
+Glass-to-glass latency of the live stream, measured with the synthetic clock
+source (video_feed?source=synthetic:<fps>): every frame carries the time it was
+produced, viewers decode it from the received MJPEG and compare with their
+clock. /stats is polled alongside to measure how old the analytics it reports are.
+
+Run from the backend directory (no camera needed):
+    python bench_latency.py --streams 2 --viewers 3 --seconds 20
+    python bench_latency.py --url http://127.0.0.1:8000 --viewers 5
+
+--streams starts one local server per stream (the API serves one live stream
+per process); --url measures servers that are already running.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import cv2
+import numpy as np
+
+from app.services.synthetic_source import read_stamp
+
+API = "/api/v1/stream"
+
+class Samples:
+    def __init__(self):
+        self.values = []
+        self.frames = 0
+        self.undecoded = 0
+        self.lock = threading.Lock()
+
+    def add(self, value):
+        with self.lock:
+            self.values.append(value)
+
+def read_parts(response):
+    """
+    JPEG payloads of a multipart/x-mixed-replace response (parts carry Content-Length).
+    """
+    while True:
+        line = response.readline()
+        if not line:
+            return
+        if not line.startswith(b"--frame"):
+            continue
+        length = None
+        while True:
+            header = response.readline().strip()
+            if not header:
+                break
+            name, _, value = header.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        if length is None:
+            continue
+        yield response.read(length)
+
+def viewer(base, fps, samples, warmup_until, stop):
+    url = urllib.parse.urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+    conn.request("GET", f"{API}/video_feed?source=synthetic:{fps:g}")
+    response = conn.getresponse()
+    try:
+        for jpeg in read_parts(response):
+            image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_GRAYSCALE)
+            shown_at = time.time() # Decoded and ready to display
+            if stop.is_set():
+                break
+            if shown_at < warmup_until:
+                continue
+            samples.frames += 1
+            stamped_at = read_stamp(image) if image is not None else None
+            if stamped_at is None:
+                samples.undecoded += 1
+                continue
+            samples.add(shown_at - stamped_at)
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+def stats_poller(base, interval, samples, warmup_until, stop):
+    while not stop.is_set():
+        try:
+            with urllib.request.urlopen(f"{base}{API}/stats", timeout=10) as response:
+                data = json.load(response)
+            received_at = time.time()
+            captured_at = data.get("frame_captured_at")
+            if captured_at and received_at >= warmup_until:
+                samples.add(received_at - captured_at)
+        except OSError:
+            pass
+        stop.wait(interval)
+
+def start_server(port, workdir):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)),
+               POSE_POOL_WARM_ON_STARTUP="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base + "/", timeout=1).close()
+            return process, base
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server on port {port} exited")
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError(f"Server on port {port} did not start")
+
+def percentiles(values):
+    if not values:
+        return "no samples"
+    ms = np.array(values) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return f"p50 {p50:6.1f}  p90 {p90:6.1f}  p99 {p99:6.1f}  max {ms.max():6.1f} ms  (n={len(ms)})"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", help="Running server(s) to measure instead of starting them")
+    parser.add_argument("--streams", type=int, default=1, help="Local servers to start (one stream each)")
+    parser.add_argument("--port", type=int, default=8950, help="First port for started servers")
+    parser.add_argument("--viewers", type=int, default=1, help="MJPEG viewers per stream")
+    parser.add_argument("--fps", type=float, default=30.0, help="Synthetic source frame rate")
+    parser.add_argument("--seconds", type=float, default=15.0, help="Measurement time")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds ignored at the start (detector start-up)")
+    parser.add_argument("--stats-interval", type=float, default=0.05, help="/stats polling interval")
+    args = parser.parse_args()
+
+    processes = []
+    workdir = tempfile.TemporaryDirectory(prefix="bench_latency_")
+    try:
+        if args.url:
+            bases = [url.rstrip("/") for url in args.url]
+        else:
+            bases = []
+            for i in range(args.streams):
+                # Own working directory (SQLite file, static/) per server
+                directory = os.path.join(workdir.name, str(i))
+                os.makedirs(directory)
+                process, base = start_server(args.port + i, directory)
+                processes.append(process)
+                bases.append(base)
+
+        stop = threading.Event()
+        warmup_until = time.time() + args.warmup
+        video = {base: [Samples() for _ in range(args.viewers)] for base in bases}
+        stats = {base: Samples() for base in bases}
+        threads = []
+        for base in bases:
+            for samples in video[base]:
+                threads.append(threading.Thread(target=viewer, args=(base, args.fps, samples, warmup_until, stop), daemon=True))
+            threads.append(threading.Thread(target=stats_poller, args=(base, args.stats_interval, stats[base], warmup_until, stop), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        time.sleep(args.warmup + args.seconds)
+        stop.set()
+        for base in bases:
+            try:
+                urllib.request.urlopen(urllib.request.Request(f"{base}{API}/stop", method="POST"), timeout=10).close()
+            except OSError:
+                pass
+        for thread in threads:
+            thread.join(timeout=10)
+
+        print(f"{len(bases)} stream(s) x {args.viewers} viewer(s), {args.fps:g} fps source, {args.seconds:g} s")
+        all_video, all_stats = [], []
+        for base in bases:
+            values = [v for samples in video[base] for v in samples.values]
+            received = [samples.frames / args.seconds for samples in video[base]]
+            undecoded = sum(samples.undecoded for samples in video[base])
+            all_video += values
+            all_stats += stats[base].values
+            print(f"\n{base}")
+            print(f"  video  {percentiles(values)}")
+            print(f"  stats  {percentiles(stats[base].values)}")
+            print(f"  fps per viewer: min {min(received):.1f} max {max(received):.1f}, undecoded frames: {undecoded}")
+        if len(bases) > 1:
+            print("\nall streams")
+            print(f"  video  {percentiles(all_video)}")
+            print(f"  stats  {percentiles(all_stats)}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        workdir.cleanup()
+
+if __name__ == "__main__":
+    main()
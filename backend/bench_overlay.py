@@ -0,0 +1,155 @@
+"""
+Per-frame overlay cost: previous per-call drawing vs. app.services.overlay,
+in total and per component (skeleton, graphs, text).
+
+Run from the backend directory:
+    python bench_overlay.py [frames]
+"""
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from app.services.overlay import GraphPanel, TextLayer, draw_skeleton
+
+W, H = 800, 600
+
+# Mid-stride runner, normalized image coordinates (MediaPipe landmark order)
+RUNNER_POSE = np.array([
+    (0.50, 0.20), (0.51, 0.19), (0.52, 0.19), (0.53, 0.19), (0.49, 0.19), (0.48, 0.19),
+    (0.47, 0.19), (0.54, 0.20), (0.46, 0.20), (0.51, 0.22), (0.49, 0.22),
+    (0.46, 0.30), (0.54, 0.30), (0.42, 0.40), (0.58, 0.38), (0.45, 0.48), (0.60, 0.30),
+    (0.45, 0.50), (0.61, 0.29), (0.44, 0.50), (0.61, 0.28), (0.45, 0.49), (0.60, 0.29),
+    (0.47, 0.52), (0.53, 0.52), (0.44, 0.66), (0.58, 0.62), (0.43, 0.80), (0.55, 0.76),
+    (0.42, 0.82), (0.53, 0.78), (0.46, 0.83), (0.58, 0.79),
+])
+
+def fake_landmarks(seed):
+    jitter = np.random.default_rng(seed).normal(0, 0.005, RUNNER_POSE.shape)
+    return [SimpleNamespace(x=float(x), y=float(y), visibility=0.9) for x, y in RUNNER_POSE + jitter]
+
+# --- Previous implementation (per-line / per-circle calls) ---
+
+def legacy_skeleton(img, lms):
+    h, w, c = img.shape
+
+    def get_pt(idx):
+        return int(lms[idx].x * w), int(lms[idx].y * h)
+
+    x11, y11 = get_pt(11)
+    x12, y12 = get_pt(12)
+    center_shoulder = ((x11 + x12) // 2, (y11 + y12) // 2)
+    x23, y23 = get_pt(23)
+    x24, y24 = get_pt(24)
+    center_hip = ((x23 + x24) // 2, (y23 + y24) // 2)
+    cv2.line(img, center_shoulder, center_hip, (0, 255, 255), 4)
+    cv2.circle(img, center_shoulder, 6, (0, 255, 255), cv2.FILLED)
+    cv2.circle(img, center_hip, 6, (0, 255, 255), cv2.FILLED)
+    connections = [
+        (12, 14, (0, 0, 255)), (14, 16, (0, 0, 255)),
+        (11, 13, (0, 255, 0)), (13, 15, (0, 255, 0)),
+        (11, 12, (200, 200, 200)), (23, 24, (200, 200, 200)),
+        (12, 24, (200, 200, 200)), (11, 23, (200, 200, 200)),
+        (24, 26, (0, 0, 255)), (26, 28, (0, 0, 255)), (28, 30, (0, 0, 255)), (28, 32, (0, 0, 255)),
+        (23, 25, (0, 255, 0)), (25, 27, (0, 255, 0)), (27, 29, (0, 255, 0)), (27, 31, (0, 255, 0))
+    ]
+    for p1, p2, color in connections:
+        if lms[p1].visibility > 0.5 and lms[p2].visibility > 0.5:
+            cv2.line(img, get_pt(p1), get_pt(p2), color, 3)
+    for idx in range(0, 11):
+        if lms[idx].visibility > 0.5:
+            cv2.circle(img, get_pt(idx), 4, (0, 255, 255), cv2.FILLED)
+    for idx in [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]:
+        if lms[idx].visibility > 0.5:
+            cv2.circle(img, get_pt(idx), 6, (255, 255, 255), cv2.FILLED)
+            cv2.circle(img, get_pt(idx), 8, (0, 0, 0), 2)
+
+def legacy_graph(img, data_list, color, title, offset_y):
+    h, w = img.shape[:2]
+    x_start, y_start = w - 220, h - 120 - offset_y
+    cv2.rectangle(img, (x_start, y_start), (x_start + 200, y_start + 100), (0, 0, 0), cv2.FILLED)
+    cv2.putText(img, title, (x_start + 5, y_start + 15), cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 255), 1)
+    points = data_list[-50:]
+    step_x = 200 / (len(points) - 1)
+    prev = None
+    for i, val in enumerate(points):
+        pt = (int(x_start + i * step_x), int(y_start + 100 - (val / 180 * 100)))
+        if prev:
+            cv2.line(img, prev, pt, color, 2)
+        prev = pt
+
+def legacy_text(img, steps, fps):
+    cv2.putText(img, f"FPS: {fps}", (10, 30), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
+    cv2.putText(img, f"Steps: {steps}", (10, 60), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
+
+def legacy_skeleton_part(frame, lms, knee, hip, i):
+    legacy_skeleton(frame, lms)
+
+def legacy_graphs_part(frame, lms, knee, hip, i):
+    legacy_graph(frame, knee, (0, 255, 0), "R. Knee", 0)
+    legacy_graph(frame, hip, (255, 0, 0), "R. Hip", 130)
+
+def legacy_text_part(frame, lms, knee, hip, i):
+    legacy_text(frame, i // 15, 30)
+
+def run_legacy(frame, lms, knee, hip, i):
+    legacy_skeleton_part(frame, lms, knee, hip, i)
+    legacy_graphs_part(frame, lms, knee, hip, i)
+    legacy_text_part(frame, lms, knee, hip, i)
+
+knee_panel = GraphPanel("R. Knee", (0, 255, 0))
+hip_panel = GraphPanel("R. Hip", (255, 0, 0))
+stats_text = TextLayer()
+
+def new_skeleton_part(frame, lms, knee, hip, i):
+    draw_skeleton(frame, lms)
+
+def new_graphs_part(frame, lms, knee, hip, i):
+    knee_panel.draw(frame, knee, W - 220, H - 120)
+    hip_panel.draw(frame, hip, W - 220, H - 250)
+
+def new_text_part(frame, lms, knee, hip, i):
+    stats_text.draw(frame, [
+        ("FPS: 30", (10, 30), 1.5, (0, 255, 0), 2),
+        (f"Steps: {i // 15}", (10, 60), 1.5, (0, 255, 0), 2),
+    ])
+
+def run_new(frame, lms, knee, hip, i):
+    new_skeleton_part(frame, lms, knee, hip, i)
+    new_graphs_part(frame, lms, knee, hip, i)
+    new_text_part(frame, lms, knee, hip, i)
+
+COMPONENTS = [
+    ("total", run_legacy, run_new),
+    ("skeleton", legacy_skeleton_part, new_skeleton_part),
+    ("graphs", legacy_graphs_part, new_graphs_part),
+    ("text", legacy_text_part, new_text_part),
+]
+
+def bench(fn, frames):
+    base = np.full((H, W, 3), 90, dtype=np.uint8)
+    history = list(120 + 40 * np.sin(np.arange(300) / 8))
+    landmarks = [fake_landmarks(i) for i in range(32)]
+    total = 0.0
+    for i in range(frames):
+        frame = base.copy()
+        knee = history[:50 + i % 250]
+        start = time.perf_counter()
+        fn(frame, landmarks[i % 32], knee, knee, i)
+        total += time.perf_counter() - start
+    return total / frames * 1e6
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cv2.setNumThreads(1)
+    bench(run_new, 50) # warm-up
+    bench(run_legacy, 50)
+    print(f"frames: {frames} at {W}x{H}, us/frame")
+    print(f"{'':10s} {'legacy':>8s} {'cached':>8s}")
+    for name, legacy_fn, new_fn in COMPONENTS:
+        # Best of 3 runs: the minimum is the least disturbed by other load
+        legacy = min(bench(legacy_fn, frames) for _ in range(3))
+        new = min(bench(new_fn, frames) for _ in range(3))
+        print(f"{name:10s} {legacy:8.1f} {new:8.1f} ({legacy / new:.1f}x)")
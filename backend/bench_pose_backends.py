@@ -0,0 +1,119 @@
+"""
+Pose backend comparison: throughput and agreement with a reference backend.
+
+Each backend runs over the same frames (a video, or an image animated with
+small shifts/zooms). Accuracy is measured against the reference on the 17
+keypoints every backend provides, in torso lengths:
+- mean error, and PCK@0.1 (share of keypoints within 0.1 torso lengths)
+- detection agreement (frames where both or neither found a person)
+
+Run from the backend directory:
+    python bench_pose_backends.py clip.mp4
+    python bench_pose_backends.py clip.mp4 --backend mediapipe:1 --backend onnx:movenet_lightning.onnx --threads 2
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from app.services.pose_backends import COCO_TO_BLAZEPOSE, MediaPipeBackend, OnnxPoseBackend
+
+def load_frames(path, limit, size=(800, 600)):
+    image = cv2.imread(path)
+    if image is not None:
+        # Still image: sweep it slightly so trackers cannot just reuse the last result
+        frames = []
+        h, w = image.shape[:2]
+        for i in range(limit):
+            angle = np.sin(i / 10) * 3
+            zoom = 1 + 0.05 * np.sin(i / 7)
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, zoom)
+            matrix[0, 2] += 10 * np.sin(i / 5)
+            frames.append(cv2.resize(cv2.warpAffine(image, matrix, (w, h)), size))
+        return frames
+
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+def make_backend(spec, threads):
+    name, _, arg = spec.partition(":")
+    if name == "mediapipe":
+        return MediaPipeBackend(complexity=int(arg or 1))
+    if name == "onnx":
+        return OnnxPoseBackend(arg, intra_op_threads=threads)
+    raise ValueError(f"Unknown backend spec: {spec}")
+
+def run(backend, frames):
+    backend.process(frames[0]) # Warm-up (model load, first allocation)
+    backend.reset()
+    results, times = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        results.append(backend.process(frame))
+        times.append(time.perf_counter() - started)
+    return results, np.array(times)
+
+def keypoints(result, size):
+    # The COCO-17 subset, in pixels, plus per-frame torso length
+    points = result.landmarks[COCO_TO_BLAZEPOSE, :2] * size
+    torso = np.linalg.norm((points[5] + points[6]) / 2 - (points[11] + points[12]) / 2)
+    return points, torso
+
+def compare(reference, results, size):
+    errors, agree = [], 0
+    for ref, res in zip(reference, results):
+        agree += (ref is None) == (res is None)
+        if ref is None or res is None:
+            continue
+        ref_points, torso = keypoints(ref, size)
+        if torso < 1:
+            continue
+        points, _ = keypoints(res, size)
+        errors.append(np.linalg.norm(points - ref_points, axis=1) / torso)
+    if not errors:
+        return None, None, agree / len(reference)
+    errors = np.concatenate(errors)
+    return errors.mean(), (errors < 0.1).mean(), agree / len(reference)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Video file or image")
+    parser.add_argument("--backend", action="append", help="mediapipe:<complexity> or onnx:<model.onnx> (repeatable)")
+    parser.add_argument("--reference", default="mediapipe:1", help="Backend the others are compared with")
+    parser.add_argument("--threads", type=int, default=2, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames read from {args.source}")
+    size = np.array(frames[0].shape[1::-1])
+    specs = [args.reference] + [spec for spec in (args.backend or []) if spec != args.reference]
+
+    print(f"{len(frames)} frames of {size[0]}x{size[1]}, reference {args.reference}\n")
+    print(f"{'backend':36} {'fps':>7} {'p50 ms':>7} {'p95 ms':>7} {'detect':>7} {'agree':>6} {'err':>6} {'PCK@.1':>7}")
+    reference = None
+    for spec in specs:
+        backend = make_backend(spec, args.threads)
+        try:
+            results, times = run(backend, frames)
+        finally:
+            backend.close()
+        if reference is None:
+            reference = results
+        mean_error, pck, agree = compare(reference, results, size)
+        detected = sum(r is not None for r in results) / len(results)
+        accuracy = f"{mean_error:6.3f} {pck:7.1%}" if mean_error is not None else f"{'-':>6} {'-':>7}"
+        print(f"{spec[-36:]:36} {1 / times.mean():7.1f} {np.percentile(times, 50) * 1000:7.1f} "
+              f"{np.percentile(times, 95) * 1000:7.1f} {detected:7.0%} {agree:6.0%} {accuracy}")
+
+if __name__ == "__main__":
+    main()
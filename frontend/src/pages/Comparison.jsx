@@ -1,4 +1,5 @@
 import React, { useState, useRef } from 'react';
+import client from '../api/client';
 
 const Comparison = () => {
     const [videoA, setVideoA] = useState(null);
@@ -6,6 +7,11 @@ const Comparison = () => {
     const videoARef = useRef(null);
     const videoBRef = useRef(null);
     const [isPlaying, setIsPlaying] = useState(false);
+    const [sessionA, setSessionA] = useState('');
+    const [sessionB, setSessionB] = useState('');
+    const [analysis, setAnalysis] = useState(null);
+    const [analysisError, setAnalysisError] = useState(null);
+    const [analyzing, setAnalyzing] = useState(false);
 
     const handleFileChange = (e, setVideo) => {
         const file = e.target.files[0];
@@ -32,6 +38,21 @@ const Comparison = () => {
         setIsPlaying(false);
     };
 
+    const compareSessions = async () => {
+        if (!sessionA || !sessionB) return;
+        setAnalyzing(true);
+        setAnalysisError(null);
+        try {
+            const res = await client.get('/history/compare', { params: { a: sessionA, b: sessionB } });
+            setAnalysis(res.data);
+        } catch (error) {
+            setAnalysis(null);
+            setAnalysisError(error.response?.data?.detail || 'Comparison failed');
+        } finally {
+            setAnalyzing(false);
+        }
+    };
+
     return (
         <div className="max-w-[1600px] mx-auto space-y-6 animate-fade-in font-sans">
             <div className="flex justify-between items-end mb-4 border-b border-gray-200 pb-4">
@@ -106,6 +127,52 @@ const Comparison = () => {
                     </div>
                 </div>
             </div>
+
+            {/* Session Analysis (recorded joint angles, aligned server-side) */}
+            <div className="bg-white rounded-2xl shadow-sm ring-1 ring-gray-200 p-6 space-y-4">
+                <div className="flex flex-wrap items-end gap-4">
+                    <div>
+                        <h2 className="text-lg font-bold text-gray-900">Session Analysis</h2>
+                        <p className="text-sm text-gray-500">Joint angles aligned over time; deviation and lag of B against A</p>
+                    </div>
+                    <input type="number" min="1" placeholder="Session A id" value={sessionA} onChange={(e) => setSessionA(e.target.value)} className="w-36 px-3 py-2 text-sm border border-gray-200 rounded-xl" />
+                    <input type="number" min="1" placeholder="Session B id" value={sessionB} onChange={(e) => setSessionB(e.target.value)} className="w-36 px-3 py-2 text-sm border border-gray-200 rounded-xl" />
+                    <button
+                        onClick={compareSessions}
+                        disabled={analyzing || !sessionA || !sessionB}
+                        className="px-6 py-2 bg-blue-600 hover:bg-blue-700 disabled:opacity-50 text-white rounded-xl text-sm font-semibold transition-all"
+                    >
+                        {analyzing ? 'Comparing...' : 'Compare'}
+                    </button>
+                </div>
+                {analysisError && <p className="text-sm text-red-600">{analysisError}</p>}
+                {analysis && (
+                    <table className="min-w-full text-left text-sm">
+                        <thead className="uppercase tracking-wider border-b border-gray-100 bg-gray-50/50">
+                            <tr>
+                                <th className="px-4 py-3 font-bold text-gray-600">Joint</th>
+                                <th className="px-4 py-3 font-bold text-gray-600">Mean dev. (°)</th>
+                                <th className="px-4 py-3 font-bold text-gray-600">RMS (°)</th>
+                                <th className="px-4 py-3 font-bold text-gray-600">Max (°)</th>
+                                <th className="px-4 py-3 font-bold text-gray-600">B - A (°)</th>
+                                <th className="px-4 py-3 font-bold text-gray-600">Lag (s)</th>
+                            </tr>
+                        </thead>
+                        <tbody className="divide-y divide-gray-100">
+                            {Object.entries(analysis.joints).map(([joint, values]) => (
+                                <tr key={joint}>
+                                    <td className="px-4 py-3 font-medium text-gray-900 capitalize">{joint}</td>
+                                    <td className="px-4 py-3">{values.mean_abs_deviation}</td>
+                                    <td className="px-4 py-3">{values.rms_deviation}</td>
+                                    <td className="px-4 py-3">{values.max_deviation}</td>
+                                    <td className="px-4 py-3">{values.mean_difference}</td>
+                                    <td className="px-4 py-3">{values.lag_seconds}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                )}
+            </div>
         </div>
     );
 };
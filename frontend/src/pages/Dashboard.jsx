@@ -66,10 +66,16 @@ const Dashboard = () => {
         setIsStreaming(true);
         setIsPaused(false);
         setTimelineErrors([]); // Reset errors
-        setStreamUrl(`http://localhost:8000/api/v1/stream/video_feed?source=${encodeURIComponent(finalSource)}`);
+        setStreamUrl(`http://localhost:8000/api/v1/stream/video_feed?source=${encodeURIComponent(finalSource)}&record=true`);
         statsInterval.current = setInterval(fetchStats, 200);
     };
 
+    // Resolve the YouTube URL server-side while the user is still on the page
+    const prefetchYoutube = async () => {
+        if (!ytUrl) return;
+        try { await client.post('/stream/prefetch', null, { params: { source: ytUrl } }); } catch (e) {}
+    };
+
     const stopStream = async () => {
         setIsStreaming(false);
         setIsPaused(false);
@@ -124,7 +130,7 @@ const Dashboard = () => {
             const filePath = res.data.filepath;
             setSourceType('file'); 
             setIsStreaming(true);
-            setStreamUrl(`http://localhost:8000/api/v1/stream/video_feed?source=${encodeURIComponent(filePath)}`);
+            setStreamUrl(`http://localhost:8000/api/v1/stream/video_feed?source=${encodeURIComponent(filePath)}&record=true`);
             statsInterval.current = setInterval(fetchStats, 200);
         } catch (error) { alert('Upload failed'); } 
         finally { setUploading(false); }
@@ -133,8 +139,19 @@ const Dashboard = () => {
     const exportCsv = async () => {
         try {
             const res = await client.post('/stream/export_csv');
-            const url = "http://localhost:8000" + res.data.download_url;
-            window.open(url, '_blank');
+            // The export needs the Bearer token, so download through the client and save the blob
+            const path = res.data.download_url.replace(/^\/api\/v1/, '');
+            const file = await client.get(path, { responseType: 'blob' });
+            const disposition = file.headers['content-disposition'] || '';
+            const match = disposition.match(/filename="([^"]+)"/);
+            const url = URL.createObjectURL(file.data);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = match ? match[1] : 'telemetry.csv';
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+            URL.revokeObjectURL(url);
         } catch (error) { alert('Error exporting CSV'); }
     };
 
@@ -161,8 +178,14 @@ const Dashboard = () => {
                 avg_gct: stats.gct || 0,
                 max_swing_error: 0, 
                 max_hip_error: 0, 
-                video_path: sourceType === 'file' ? streamUrl : null
+                video_path: sourceType === 'file' ? streamUrl : null,
+                recording_id: stats.recording_id || null,
+                reps: (stats.reps && stats.reps.reps) || []
             };
+            if (stats.cycle_count) {
+                const cycles = await client.get('/stream/cycles');
+                payload.cycles = cycles.data;
+            }
             
             await client.post('/history/save', payload);
             showToast('Session Saved Successfully!', 'success');
@@ -321,6 +344,7 @@ const Dashboard = () => {
                             placeholder="Paste YouTube URL..."
                             value={ytUrl}
                             onChange={(e) => setYtUrl(e.target.value)}
+                            onBlur={prefetchYoutube}
                             disabled={isStreaming}
                         />
                     )}
@@ -3,10 +3,21 @@ from tkinter import filedialog, messagebox, ttk
 from PIL import Image, ImageTk
 import cv2
 import threading
-import yt_dlp
+from stream_resolver import StreamResolver
 import time
 import matplotlib.pyplot as plt
 from pose_module import PoseDetector, GaitAnalyzer, AthleticScorer, draw_graph_overlay
+from overlay import StaticLayer, TextLayer
+
+# Shared across runs: switching back to a video already played skips yt-dlp
+youtube_resolver = StreamResolver()
+
+# Metrics sidebar: background and headings are a cached layer, values a TextLayer
+SIDEBAR_WIDTH = 300
+
+def draw_sidebar_headings(canvas):
+    cv2.putText(canvas, "ATHLETIC METRICS", (10, 40), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
+    cv2.putText(canvas, "ANGLES (Right)", (10, 270), cv2.FONT_HERSHEY_PLAIN, 1.5, (0, 255, 0), 2)
 
 class PoseApp:
     # ... (existing init and other methods) ...
@@ -205,14 +216,8 @@ class PoseApp:
             self.entry_input.insert(0, path)
 
     def get_youtube_stream_url(self, youtube_url):
-        ydl_opts = {
-            'format': 'best',
-            'quiet': True,
-        }
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(youtube_url, download=False)
-                return info['url']
+            return youtube_resolver.resolve(youtube_url, 'best')
         except Exception as e:
             messagebox.showerror("Error YouTube", f"Gagal mengambil video: {e}")
             return None
@@ -343,8 +348,11 @@ class PoseApp:
         )
         gait_analyzer = GaitAnalyzer()
         scorer = AthleticScorer()
+        sidebar = None # StaticLayer, built on the first frame
+        sidebar_text = TextLayer()
         
         def process_and_show(image, fps=30):
+            nonlocal sidebar
             image = self.resize_frame(image)
             image = detector.find_pose(image)
             lm_list = detector.find_position(image)
@@ -370,45 +378,29 @@ class PoseApp:
                 gait_analyzer.update(world_lms, fps, r_knee_angle, r_hip_angle)
                 
                 # --- VISUAL DASHBOARD ---
-                # Sidebar Overlay
+                # Sidebar Overlay (static layer rebuilt only if the frame height changes)
                 h, w = image.shape[:2]
-                overlay_w = 300
-                cv2.rectangle(image, (0, 0), (overlay_w, h), (0, 0, 0), cv2.FILLED)
+                if sidebar is None or sidebar.size[1] != h:
+                    sidebar = StaticLayer((SIDEBAR_WIDTH, h), draw_sidebar_headings)
+                sidebar.blend(image, 0, 0)
                 
                 # Live Score Calc (simplified)
                 live_score = scorer.calculate_score(gait_analyzer)
                 
-                y_pos = 40
-                gap = 35
-                
                 # Colors
                 c_white = (255, 255, 255)
-                c_green = (0, 255, 0)
                 c_yellow = (0, 255, 255)
                 
-                cv2.putText(image, "ATHLETIC METRICS", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.5, c_green, 2)
-                y_pos += gap
-                
-                cv2.putText(image, f"Score: {live_score}", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 2, (0, 165, 255), 2)
-                y_pos += gap + 10
-                
-                cv2.putText(image, f"Cadence: {int(gait_analyzer.cadence)} spm", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_white, 1)
-                y_pos += gap
-                
-                cv2.putText(image, f"Stride: {gait_analyzer.stride_length:.2f} m", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_white, 1)
-                y_pos += gap
-                
-                cv2.putText(image, f"GCT (Est): {int(gait_analyzer.gct)} ms", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_yellow, 1)
-                y_pos += gap
-                
-                cv2.putText(image, f"Sym L/R: {int(gait_analyzer.left_symmetry)}/{int(gait_analyzer.right_symmetry)}%", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_white, 1)
-                y_pos += gap + 10
-                
-                cv2.putText(image, "ANGLES (Right)", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.5, c_green, 2)
-                y_pos += gap
-                cv2.putText(image, f"Knee: {int(r_knee_angle)} deg", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_white, 1)
-                y_pos += gap
-                cv2.putText(image, f"Hip : {int(r_hip_angle)} deg", (10, y_pos), cv2.FONT_HERSHEY_PLAIN, 1.2, c_white, 1)
+                # Values only; re-rendered when one of them changes
+                sidebar_text.draw(image, [
+                    (f"Score: {live_score}", (10, 75), 2, (0, 165, 255), 2),
+                    (f"Cadence: {int(gait_analyzer.cadence)} spm", (10, 120), 1.2, c_white, 1),
+                    (f"Stride: {gait_analyzer.stride_length:.2f} m", (10, 155), 1.2, c_white, 1),
+                    (f"GCT (Est): {int(gait_analyzer.gct)} ms", (10, 190), 1.2, c_yellow, 1),
+                    (f"Sym L/R: {int(gait_analyzer.left_symmetry)}/{int(gait_analyzer.right_symmetry)}%", (10, 225), 1.2, c_white, 1),
+                    (f"Knee: {int(r_knee_angle)} deg", (10, 305), 1.2, c_white, 1),
+                    (f"Hip : {int(r_hip_angle)} deg", (10, 340), 1.2, c_white, 1),
+                ])
 
             return image
 
@@ -0,0 +1,137 @@
+import time
+import cv2
+import numpy as np
+
+# Per-connection JPEG encoder for multipart (MJPEG) streams.
+#
+# Each client gets its own encoder. Quality (and, once quality bottoms out,
+# output scale) is adjusted after every frame so the encoded size tracks a
+# per-frame byte budget. The budget comes from an explicit target bitrate or
+# frame size, and from the throughput observed while the transport is
+# blocked on a slow client (see sent()).
+
+BOUNDARY = b"--frame"
+
+def multipart_part(jpeg, content_type=b"image/jpeg"):
+    """
+    One multipart chunk; `jpeg` may be bytes or the array returned by cv2.imencode.
+    """
+    header = BOUNDARY + b"\r\nContent-Type: " + content_type + b"\r\nContent-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n"
+    return b"".join((header, jpeg, b"\r\n"))
+
+class AdaptiveJpegEncoder:
+    def __init__(self, target_kbps=None, max_frame_bytes=None, quality=80,
+                 min_quality=30, max_quality=90, min_scale=0.5):
+        self.target_kbps = target_kbps
+        self.max_frame_bytes = max_frame_bytes
+        self.quality = quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.min_scale = min_scale
+        self.scale = 1.0
+        self.fps = 30.0 # EMA of the encode rate
+        self.link_bps = None # Estimated client throughput (bytes/s), None until congested
+        self.frames = 0
+        self.skipped = 0
+        self.last_size = 0
+        self._last_time = None
+        self._last_key = None
+        self._last_part = None
+        self._scaled = None # Preallocated resize target, reused while the size is stable
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+
+    def frame_budget(self):
+        """
+        Byte budget for the next frame, or None when nothing limits it.
+        """
+        budgets = []
+        if self.max_frame_bytes:
+            budgets.append(self.max_frame_bytes)
+        if self.target_kbps:
+            budgets.append(self.target_kbps * 125 / self.fps)
+        if self.link_bps:
+            budgets.append(self.link_bps * 0.8 / self.fps) # Headroom for jitter
+        return min(budgets) if budgets else None
+
+    @property
+    def last_part(self):
+        return self._last_part
+
+    def encode(self, frame, key=None):
+        """
+        Multipart chunk for `frame`. With a `key` equal to the previous call's,
+        the previous chunk is returned without re-encoding (paused/static frames).
+        """
+        if key is not None and key == self._last_key and self._last_part is not None:
+            self.skipped += 1
+            return self._last_part
+
+        now = time.perf_counter()
+        if self._last_time is not None and now > self._last_time:
+            self.fps = 0.9 * self.fps + 0.1 * min(120.0, 1.0 / (now - self._last_time))
+        self._last_time = now
+
+        image = self._resize(frame)
+        self._params[1] = int(self.quality)
+        ok, jpeg = cv2.imencode(".jpg", image, self._params)
+        if not ok:
+            return self._last_part or b""
+        self.last_size = len(jpeg)
+        self.frames += 1
+        self._adapt(self.last_size)
+
+        self._last_key = key
+        self._last_part = multipart_part(jpeg)
+        return self._last_part
+
+    def sent(self, nbytes, seconds):
+        """
+        Transport feedback: how long handing `nbytes` to the client took.
+        A send that blocks for a noticeable time means the socket buffer is full,
+        so its rate is a throughput sample; quick sends let the estimate recover.
+        """
+        if seconds > 0.02:
+            sample = nbytes / seconds
+            self.link_bps = sample if self.link_bps is None else 0.7 * self.link_bps + 0.3 * sample
+        elif self.link_bps is not None:
+            self.link_bps *= 1.05
+            if self.target_kbps and self.link_bps > self.target_kbps * 125 * 2:
+                self.link_bps = None # Link is clearly faster than the target
+
+    def _resize(self, frame):
+        if self.scale >= 1.0:
+            return frame
+        h, w = frame.shape[:2]
+        size = (max(2, int(w * self.scale) // 2 * 2), max(2, int(h * self.scale) // 2 * 2))
+        if self._scaled is None or self._scaled.shape[1::-1] != size or self._scaled.shape[2:] != frame.shape[2:]:
+            self._scaled = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        cv2.resize(frame, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        return self._scaled
+
+    def _adapt(self, size):
+        budget = self.frame_budget()
+        if budget is None:
+            return
+        if size > budget * 1.15:
+            # Over budget: drop quality first (cheap), then resolution
+            if self.quality > self.min_quality:
+                step = max(2, int((size / budget - 1) * 20))
+                self.quality = max(self.min_quality, self.quality - step)
+            else:
+                self.scale = max(self.min_scale, self.scale * 0.9)
+        elif size < budget * 0.7:
+            # Headroom: restore resolution first, then quality
+            if self.scale < 1.0:
+                self.scale = min(1.0, self.scale / 0.9)
+            else:
+                self.quality = min(self.max_quality, self.quality + 2)
+
+    def stats(self):
+        return {
+            "quality": int(self.quality),
+            "scale": round(self.scale, 2),
+            "frame_bytes": self.last_size,
+            "budget_bytes": int(self.frame_budget() or 0),
+            "frames": self.frames,
+            "skipped": self.skipped,
+        }
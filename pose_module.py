@@ -4,45 +4,29 @@ import time
 import math
 import numpy as np
 from utils import calculate_angle
+from overlay import GraphPanel, draw_skeleton
+
+_graph_panels = {} # (title, color, max_val) -> GraphPanel
 
 def draw_graph_overlay(img, data_list, color=(0, 255, 0), max_val=180, title="Angle"):
     """
     Draws a simple line graph overlay on the image.
     data_list: List of numerical values (e.g., angles)
+    The panel (semi-transparent background + title) is rendered once and blended in.
     """
     if not data_list: return img
-    
+
+    key = (title, color, max_val)
+    panel = _graph_panels.get(key)
+    if panel is None:
+        panel = _graph_panels[key] = GraphPanel(title, color, max_val=max_val)
+
     h, w = img.shape[:2]
-    graph_h = 100
-    graph_w = 200
+    graph_w, graph_h = panel.size
     x_start = w - graph_w - 20
     y_start = h - graph_h - 20
-    
-    # Background
-    cv2.rectangle(img, (x_start, y_start), (x_start + graph_w, y_start + graph_h), (0.0, 0, 0, 0.5), cv2.FILLED) # Semi-transparent black if possible, else solid black
-    cv2.putText(img, title, (x_start + 5, y_start + 15), cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 255), 1)
-    
-    # Needs at least 2 points
-    if len(data_list) < 2: return img
-    
-    # Normalize and Draw
-    # Take last N points that fit
-    points_to_show = data_list[-50:] 
-    if len(points_to_show) < 2: return img
-    
-    step_x = graph_w / (len(points_to_show) - 1)
-    
-    prev_pt = None
-    for i, val in enumerate(points_to_show):
-        x = int(x_start + i * step_x)
-        y = int(y_start + graph_h - (val / max_val * graph_h))
-        curr_pt = (x, y)
-        
-        if prev_pt:
-            cv2.line(img, prev_pt, curr_pt, color, 2)
-        prev_pt = curr_pt
-        
-    return img
+    if x_start < 0 or y_start < 0: return img
+    return panel.draw(img, data_list, x_start, y_start)
 
 class PoseDetector:
     def __init__(self, mode=False, complexity=2, smooth=True, 
@@ -89,72 +73,8 @@ class PoseDetector:
         return img
     
     def draw_custom_skeleton(self, img):
-        """
-        Menggambar skeleton kustom dengan ukuran konsisten.
-        """
-        h, w, c = img.shape
-        lms = self.results.pose_landmarks.landmark
-        
-        # Helper untuk mendapatkan koord x,y
-        def get_pt(idx):
-            return int(lms[idx].x * w), int(lms[idx].y * h)
-        
-        # Fixed Sizes (Konsisten)
-        rad_small = 4
-        rad_med = 6
-        rad_large = 8
-        thick_line = 3
-        thick_spine = 4
-        
-        # --- 1. Gambar Tulang Belakang (Spine) ---
-        # Titik tengah bahu (antara 11 dan 12)
-        x11_i, y11_i = get_pt(11)
-        x12_i, y12_i = get_pt(12)
-        center_shoulder = ((x11_i + x12_i) // 2, (y11_i + y12_i) // 2)
-        
-        # Titik tengah pinggul (antara 23 dan 24)
-        x23_i, y23_i = get_pt(23)
-        x24_i, y24_i = get_pt(24)
-        center_hip = ((x23_i + x24_i) // 2, (y23_i + y24_i) // 2)
-        
-        # Garis Spine (Kuning)
-        cv2.line(img, center_shoulder, center_hip, (0, 255, 255), thick_spine)
-        cv2.circle(img, center_shoulder, rad_med, (0, 255, 255), cv2.FILLED)
-        cv2.circle(img, center_hip, rad_med, (0, 255, 255), cv2.FILLED)
-
-        # --- 2. Gambar Koneksi Standar dengan Warna Kustom ---
-        # KONEKSI (Start Point, End Point, Warna)
-        connections = [
-            # Tangan Kanan (Merah)
-            (12, 14, (0, 0, 255)), (14, 16, (0, 0, 255)),
-            # Tangan Kiri (Hijau)
-            (11, 13, (0, 255, 0)), (13, 15, (0, 255, 0)),
-            # Badan (Putih)
-            (11, 12, (200, 200, 200)), (23, 24, (200, 200, 200)),
-            (12, 24, (200, 200, 200)), (11, 23, (200, 200, 200)),
-            # Kaki Kanan (Merah)
-            (24, 26, (0, 0, 255)), (26, 28, (0, 0, 255)), (28, 30, (0, 0, 255)), (28, 32, (0, 0, 255)),
-            # Kaki Kiri (Hijau)
-            (23, 25, (0, 255, 0)), (25, 27, (0, 255, 0)), (27, 29, (0, 255, 0)), (27, 31, (0, 255, 0))
-        ]
-
-        # Draw Lines
-        for p1, p2, color in connections:
-            if lms[p1].visibility > 0.5 and lms[p2].visibility > 0.5:
-                cv2.line(img, get_pt(p1), get_pt(p2), color, thick_line)
-
-        # Draw Circles (Nodes)
-        # Kepala
-        for idx in range(0, 11):
-            if lms[idx].visibility > 0.5:
-                cv2.circle(img, get_pt(idx), rad_small, (0, 255, 255), cv2.FILLED)
-        
-        # Sendi Utama (Termasuk Siku)
-        joint_indices = [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
-        for idx in joint_indices:
-            if lms[idx].visibility > 0.5:
-                cv2.circle(img, get_pt(idx), rad_med, (255, 255, 255), cv2.FILLED)
-                cv2.circle(img, get_pt(idx), rad_large, (0, 0, 0), 2)
+        # One polylines call per colour group (see overlay.draw_skeleton)
+        return draw_skeleton(img, self.results.pose_landmarks.landmark)
 
     def find_position(self, img, draw=True):
         """
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Local cache of remote video sources (YouTube / HTTP).
+#
+# The first play still decodes straight from the network, while a background job
+# downloads the clip once (plain sequential GET) and transcodes it locally to the analysis width with a short,
+# fixed keyframe interval. Replays, restarts and end-of-stream loops then read
+# the local file, where seeking to frame 0 is cheap. The directory is capped in
+# size and evicts least recently used clips.
+#
+# Only finite clips are cached. Live sources never end (MJPEG phone cameras,
+# RTSP/RTMP feeds, HLS live), so a source is skipped unless the server states
+# its size (Content-Length) and the clip has a known duration; downloads and
+# transcodes are also cut off while running once they pass the byte or
+# duration cap.
+
+ANALYSIS_WIDTH = 800
+KEYFRAME_INTERVAL = 15 # frames; dense GOP keeps seeks cheap
+
+def is_remote_source(source):
+    return isinstance(source, str) and source.lower().startswith(("http://", "https://", "rtmp://", "rtsp://"))
+
+LIVE_PROTOCOLS = ("rtmp://", "rtsp://")
+LIVE_CONTENT_TYPES = ("multipart/x-mixed-replace", "application/vnd.apple.mpegurl", "application/x-mpegurl")
+
+class UncacheableSource(Exception):
+    """
+    The source is live, unsized or over the cache limits.
+    """
+
+def download(url, dst, max_bytes=None, timeout=30):
+    """
+    Sequential GET of a finite file. Raises UncacheableSource for responses
+    without a Content-Length, live content types, or more than `max_bytes`.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        content_type = (response.headers.get("Content-Type") or "").lower()
+        if content_type.startswith(LIVE_CONTENT_TYPES):
+            raise UncacheableSource(f"live stream ({content_type})")
+        length = response.headers.get("Content-Length")
+        if not length or not length.isdigit():
+            raise UncacheableSource("no Content-Length (live or chunked stream)")
+        if max_bytes is not None and int(length) > max_bytes:
+            raise UncacheableSource(f"{int(length)} bytes exceeds the cache size")
+        written = 0
+        with open(dst, "wb") as f:
+            while True:
+                chunk = response.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise UncacheableSource(f"more than {max_bytes} bytes received")
+                f.write(chunk)
+
+def probe_duration(src):
+    """
+    Duration in seconds from the container's frame count and rate, or None when
+    unknown (live or unseekable sources).
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(src)
+    try:
+        if not cap.isOpened():
+            return None
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    if not frames or frames <= 0 or not fps or fps <= 0:
+        return None
+    return frames / fps
+
+def part_path(path):
+    # Keeps the .mp4 extension: OpenCV picks the container from it
+    return os.path.splitext(path)[0] + ".part.mp4"
+
+def transcode(src, dst, width=ANALYSIS_WIDTH, keyint=KEYFRAME_INTERVAL, max_seconds=None, max_bytes=None):
+    """
+    Transcode `src` (path or URL) to an H.264 MP4 at `width` px wide.
+    Uses the ffmpeg CLI when installed; otherwise re-encodes through OpenCV
+    (mp4v, where the keyframe interval cannot be set).
+    Output stops at `max_seconds` / `max_bytes` when given.
+    Writes to a temporary file and renames, so `dst` is never partially written.
+    """
+    tmp = part_path(dst)
+    if shutil.which("ffmpeg"):
+        limits = []
+        if max_seconds:
+            limits += ["-t", str(max_seconds)]
+        if max_bytes:
+            limits += ["-fs", str(max_bytes)]
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error", "-i", src,
+            "-vf", f"scale={width}:-2",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+            "-g", str(keyint), "-keyint_min", str(keyint), "-sc_threshold", "0",
+            *limits, "-an", "-movflags", "+faststart", "-f", "mp4", tmp,
+        ]
+        subprocess.run(cmd, check=True)
+    else:
+        _transcode_opencv(src, tmp, width, max_seconds, max_bytes)
+    os.replace(tmp, dst)
+
+def _transcode_opencv(src, dst, width, max_seconds=None, max_bytes=None):
+    import cv2
+
+    cap = cv2.VideoCapture(src)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open source: {src}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    max_frames = int(max_seconds * fps) if max_seconds else None
+    written = 0
+    writer = None
+    try:
+        while max_frames is None or written < max_frames:
+            if max_bytes and written % 30 == 0 and os.path.exists(dst) and os.path.getsize(dst) > max_bytes:
+                raise UncacheableSource(f"transcode exceeds {max_bytes} bytes")
+            success, frame = cap.read()
+            if not success:
+                break
+            h, w = frame.shape[:2]
+            height = int(h * width / w) // 2 * 2
+            if w != width:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            if writer is None:
+                writer = cv2.VideoWriter(dst, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+                if not writer.isOpened():
+                    raise IOError(f"Cannot write: {dst}")
+            writer.write(frame)
+            written += 1
+    finally:
+        cap.release()
+        if writer:
+            writer.release()
+    if writer is None:
+        raise IOError(f"No frames decoded from: {src}")
+
+class SourceCache:
+    def __init__(self, directory, max_bytes, width=ANALYSIS_WIDTH, keyint=KEYFRAME_INTERVAL, max_workers=1,
+                 max_seconds=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds # Longest clip worth caching
+        self._uncacheable = set() # Keys found to be live/unsized; not retried
+        self.width = width
+        self.keyint = keyint
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="source-cache")
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}_{self.width}.mp4")
+
+    def lookup(self, key):
+        """
+        Local path of a cached source, or None. Marks the entry as recently used.
+        """
+        path = self._path(key)
+        if os.path.exists(path):
+            os.utime(path, None)
+            return path
+        return None
+
+    def ensure(self, key, media_url):
+        """
+        Start downloading/transcoding `media_url` in the background unless it is
+        already cached or in progress.
+        """
+        path = self._path(key)
+        with self._lock:
+            if key in self._inflight or key in self._uncacheable or os.path.exists(path):
+                return
+            self._inflight.add(key)
+        self._executor.submit(self._fill, key, media_url, path)
+
+    def _fill(self, key, media_url, path):
+        download_path = os.path.splitext(path)[0] + ".download"
+        try:
+            src = media_url
+            if media_url.lower().startswith(LIVE_PROTOCOLS):
+                raise UncacheableSource("live protocol")
+            if media_url.lower().startswith(("http://", "https://")):
+                download(media_url, download_path, self.max_bytes)
+                src = download_path
+            duration = probe_duration(src)
+            if duration is None:
+                raise UncacheableSource("unknown duration")
+            if duration > self.max_seconds:
+                raise UncacheableSource(f"{duration:.0f} s exceeds {self.max_seconds} s")
+            transcode(src, path, self.width, self.keyint, self.max_seconds, self.max_bytes)
+            self._evict(keep=path)
+        except UncacheableSource as e:
+            print(f"Source cache: not caching {key}: {e}")
+            with self._lock:
+                self._uncacheable.add(key)
+        except Exception as e:
+            print(f"Source cache: failed to cache {key}: {e}")
+        finally:
+            for leftover in (download_path, part_path(path)):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            with self._lock:
+                self._inflight.discard(key)
+
+    def _evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".mp4") or name.endswith(".part.mp4"):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# Backend tests import the FastAPI package `app` (backend/app, a namespace
+# package). The root-level app.py (Flask) shadows it whenever the repository
+# root is on sys.path, as with `python -m pytest`, so bind `app` to the backend
+# once, before any test module is imported.
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(ROOT, "backend")
+
+_saved = sys.path[:]
+sys.path[:] = [BACKEND] + [p for p in _saved if os.path.abspath(p or os.curdir) != ROOT]
+import app # noqa: E402
+sys.path[:] = [BACKEND] + _saved
+
+@pytest.fixture
+def db():
+    """
+    Session on a fresh in-memory SQLite database with the backend's tables.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.db.session import Base
+    import app.models.rollup, app.models.session, app.models.user # noqa: F401 (register tables)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,112 @@
+import io
+import os
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.session import AnalysisSession
+from app.models.user import User, UserRole
+from app.services import export_jobs as export_jobs_module
+from app.services.export_jobs import ExportJobManager
+from app.services.session_recorder import RECORD_COLUMNS, SessionRecorder
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+def record(frames):
+    recording_id = uuid.uuid4().hex
+    recorder = SessionRecorder(os.path.join(settings.RECORDINGS_DIR, recording_id))
+    for frame in range(frames):
+        row = [frame, f"{frame / 30:.3f}"] + ["1.0"] * (len(RECORD_COLUMNS) - 2)
+        row[RECORD_COLUMNS.index("StepEvent")] = frame % 2
+        recorder.append(row)
+    recorder.close()
+    return recording_id
+
+def wait(job, timeout=30):
+    deadline = time.time() + timeout
+    while not job.finished_at:
+        assert time.time() < deadline, "export job did not finish"
+        time.sleep(0.02)
+
+@pytest.fixture
+def manager(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RECORDINGS_DIR", str(tmp_path / "recordings"))
+    monkeypatch.setattr(export_jobs_module, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    a1 = User(email="a1@x.com", hashed_password="x", full_name="Ann", role=UserRole.ATHLETE)
+    a2 = User(email="a2@x.com", hashed_password="x", full_name="Bo", role=UserRole.ATHLETE)
+    db.add_all([a1, a2])
+    db.flush()
+    db.add_all([
+        AnalysisSession(user_id=a1.id, created_at=datetime(2024, 3, 2), technique_score=70, recording_id=record(10)),
+        AnalysisSession(user_id=a1.id, created_at=datetime(2024, 3, 9), technique_score=75, recording_id=record(5)),
+        AnalysisSession(user_id=a1.id, created_at=datetime(2024, 4, 1), technique_score=80, recording_id=record(7)),
+        AnalysisSession(user_id=a2.id, created_at=datetime(2024, 3, 5), technique_score=60), # No recording
+    ])
+    db.commit()
+    manager = ExportJobManager(retention=60, directory=str(tmp_path / "exports"))
+    yield manager, a1, a2
+    manager._executor.shutdown(wait=True)
+
+def test_job_writes_partitions_and_reports_progress(manager):
+    manager, a1, a2 = manager
+    gate = threading.Event()
+    manager._executor.submit(gate.wait) # Hold the single worker so the job stays queued
+    job = manager.submit(requested_by=a1.id)
+    assert job.to_dict()["status"] == "queued" and job.to_dict()["progress"] == 0.0
+    assert manager.get(job.id) is job
+    gate.set()
+    wait(job)
+
+    state = job.to_dict()
+    assert state["status"] == "done" and state["error"] is None
+    assert (state["total_sessions"], state["processed_sessions"], state["progress"]) == (4, 4, 1.0)
+    assert state["telemetry_rows"] == 22
+    assert not os.path.exists(os.path.join(manager.directory, job.id)) # Work directory removed
+
+    with zipfile.ZipFile(job.archive_path) as zf:
+        names = sorted(zf.namelist())
+        assert names == [
+            "sessions.parquet",
+            f"telemetry/athlete_id={a1.id}/month=2024-03/part-0.parquet",
+            f"telemetry/athlete_id={a1.id}/month=2024-04/part-0.parquet",
+        ]
+        sessions = pq.read_table(io.BytesIO(zf.read("sessions.parquet")))
+        march = pq.read_table(io.BytesIO(zf.read(names[1])))
+        april = pq.read_table(io.BytesIO(zf.read(names[2])))
+    assert sessions.num_rows == 4
+    assert sessions.column("athlete_name").to_pylist() == ["Ann", "Ann", "Ann", "Bo"]
+    assert (march.num_rows, april.num_rows) == (15, 7)
+    assert march.column_names == ["SessionId"] + RECORD_COLUMNS
+    assert march.column("Frame").to_pylist() == list(range(10)) + list(range(5))
+
+    # Kept until the retention period has passed
+    manager.purge(now=job.finished_at + 30)
+    assert manager.get(job.id) is job and os.path.exists(job.archive_path)
+    manager.purge(now=job.finished_at + 61)
+    assert manager._jobs == {} and not os.path.exists(job.archive_path)
+
+def test_purge_removes_failed_work_and_stale_leftovers(manager, monkeypatch):
+    manager, a1, _ = manager
+    monkeypatch.setattr(manager, "_archive", lambda work_dir: (_ for _ in ()).throw(OSError("disk full")))
+    job = manager.submit(requested_by=a1.id)
+    wait(job)
+    assert job.status == "failed" and job.error == "disk full" and job.archive_path is None
+
+    work_dir = os.path.join(manager.directory, job.id)
+    os.makedirs(os.path.join(work_dir, "telemetry")) # Left behind (e.g. rmtree failed)
+    stale_dir = os.path.join(manager.directory, uuid.uuid4().hex) # From an earlier process
+    os.makedirs(stale_dir)
+    old = time.time() - 120
+    os.utime(stale_dir, (old, old))
+    fresh_dir = os.path.join(manager.directory, uuid.uuid4().hex) # Maybe another worker's running job
+    os.makedirs(fresh_dir)
+
+    manager.purge()
+    assert not os.path.exists(work_dir) and not os.path.exists(stale_dir)
+    assert os.path.exists(fresh_dir)
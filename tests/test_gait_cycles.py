@@ -0,0 +1,78 @@
+import numpy as np
+
+from app.services.gait_cycles import (
+    CYCLE_CHANNELS, CYCLE_POINTS, CycleEngine, pack_profile, resample_cycle, unpack_profile,
+)
+
+def test_resample_cycle_is_linear_between_samples():
+    times = [0.0, 0.1, 0.3, 0.4] # Uneven frame spacing
+    values = [[0, 10], [10, 10], [30, 0], [40, 0]]
+    cycle = resample_cycle(times, values, points=5)
+    assert cycle.shape == (2, 5) and cycle.dtype == np.float32
+    assert np.allclose(cycle[0], [0, 10, 20, 30, 40]) # Linear in time for the first channel
+    assert np.allclose(cycle[1], [10, 10, 5, 0, 0])
+
+def test_resample_cycle_keeps_endpoints():
+    times = np.sort(np.random.default_rng(1).uniform(0, 1, 23))
+    values = np.random.default_rng(2).normal(size=(23, 4))
+    cycle = resample_cycle(times, values)
+    assert cycle.shape == (4, CYCLE_POINTS)
+    assert np.allclose(cycle[:, 0], values[0], atol=1e-5)
+    assert np.allclose(cycle[:, -1], values[-1], atol=1e-5)
+
+def run(engine, strides, first_left, fps=60, stride=1.0, noise=None):
+    # Right steps at whole strides, left ones halfway; a knee-like channel peaks
+    # at 70 % of the right foot's stride
+    rng = np.random.default_rng(0)
+    start = 0.05 if first_left else stride / 2 + 0.05
+    cycles, next_step = [], int(start / (stride / 2)) + 1
+    for n in range(int(strides * stride * fps)):
+        t = start + n / fps
+        phase = (t / stride) % 1.0
+        values = [40 + 30 * np.exp(-((phase - 0.7) / 0.08) ** 2), 10 * phase, 0.0, 5.0]
+        if noise:
+            values = np.add(values, rng.normal(0, noise, 4))
+        step = t >= next_step * stride / 2
+        left = next_step % 2 == 1
+        if step:
+            next_step += 1
+        cycle = engine.add(t, values, step=step, left=left if step else None)
+        if cycle is not None:
+            cycles.append(cycle)
+    return cycles
+
+def test_cycles_anchor_on_the_same_foot_whichever_steps_first():
+    for first_left in (False, True):
+        engine = CycleEngine()
+        cycles = run(engine, 6, first_left)
+        assert len(cycles) >= 4
+        peaks = [int(np.argmax(cycle[0])) for cycle in cycles]
+        assert all(abs(peak - 70) <= 2 for peak in peaks), (first_left, peaks)
+
+def test_a_missed_step_drops_the_stride():
+    engine = CycleEngine()
+    for n, (left, step) in enumerate([(False, True)] + [(None, False)] * 9 + [(False, True)]):
+        assert engine.add(n * 0.08, [0, 0, 0, 0], step=step, left=left) is None # No opposite step between
+    assert engine.count == 0
+
+def test_welford_envelope_matches_numpy():
+    engine = CycleEngine()
+    cycles = run(engine, 12, False, noise=2.0)
+    assert engine.count == len(cycles) >= 8
+    stacked = np.stack(cycles).astype(np.float64)
+    assert np.allclose(engine.mean, stacked.mean(axis=0), atol=1e-4)
+    assert np.allclose(engine.std, stacked.std(axis=0), atol=1e-4)
+    assert np.array_equal(engine.recent_cycles(3), np.stack(cycles[-3:]))
+
+    profile = engine.profile()
+    assert profile["count"] == engine.count and profile["channels"] == list(CYCLE_CHANNELS)
+
+def test_profile_round_trip():
+    rng = np.random.default_rng(3)
+    mean = rng.normal(90, 20, (len(CYCLE_CHANNELS), CYCLE_POINTS))
+    std = rng.uniform(0, 5, (len(CYCLE_CHANNELS), CYCLE_POINTS))
+    data = pack_profile(mean, std)
+    assert len(data) == 2 * len(CYCLE_CHANNELS) * CYCLE_POINTS * 4
+    unpacked_mean, unpacked_std = unpack_profile(data)
+    assert np.array_equal(unpacked_mean, mean.astype(np.float32))
+    assert np.array_equal(unpacked_std, std.astype(np.float32))
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from mjpeg import AdaptiveJpegEncoder
+
+def noisy_frame(seed, size=(600, 800)):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, size + (3,), dtype=np.uint8)
+
+def test_quality_and_scale_follow_frame_budget():
+    encoder = AdaptiveJpegEncoder(max_frame_bytes=40_000)
+    first = len(encoder.encode(noisy_frame(0)))
+    for i in range(60):
+        encoder.encode(noisy_frame(i))
+    assert first > 40_000
+    assert encoder.quality == encoder.min_quality
+    assert encoder.scale < 1.0
+    assert encoder.last_size < first
+
+def test_unchanged_key_skips_encoding():
+    encoder = AdaptiveJpegEncoder()
+    part = encoder.encode(noisy_frame(1), key=7)
+    assert part.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n")
+    assert encoder.encode(noisy_frame(2), key=7) is part
+    assert encoder.frames == 1 and encoder.skipped == 1
+
+def test_slow_sends_lower_the_budget():
+    encoder = AdaptiveJpegEncoder()
+    assert encoder.frame_budget() is None
+    encoder.sent(50_000, 0.5) # 100 KB/s while blocked
+    assert encoder.frame_budget() < 100_000 / encoder.fps
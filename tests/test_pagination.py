@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.pagination import apply_keyset, decode_cursor, encode_cursor, next_cursor
+from app.models.session import AnalysisSession
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 9, 30, 12, 345678)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8tcGlwZQ", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def fetch_all_pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        stmt = apply_keyset(select(AnalysisSession), AnalysisSession.created_at, AnalysisSession.id, cursor)
+        rows = db.execute(stmt.limit(limit)).scalars().all()
+        pages.append([row.id for row in rows])
+        cursor = next_cursor(rows, limit)
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 11, 50])
+def test_pages_cover_every_row_once_with_tied_timestamps(db, limit):
+    start = datetime(2024, 5, 1, 12, 0)
+    # Runs of identical created_at values, straddling page boundaries
+    for n in range(11):
+        db.add(AnalysisSession(user_id=1, created_at=start + timedelta(minutes=n // 4)))
+    db.commit()
+
+    expected = [row.id for row in db.query(AnalysisSession).order_by(
+        AnalysisSession.created_at.desc(), AnalysisSession.id.desc())]
+    pages = fetch_all_pages(db, limit)
+    assert [row_id for page in pages for row_id in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+    assert len(pages[-1]) <= limit
+
+def test_no_cursor_after_a_short_page():
+    assert next_cursor([], 10) is None
+    assert next_cursor([object()] * 3, 10) is None
@@ -0,0 +1,19 @@
+import pytest
+
+from app.services.pose_backends import PoseBackend
+
+def test_backend_without_process_fails_on_construction():
+    class Incomplete(PoseBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    class Complete(Incomplete):
+        def process(self, img):
+            return None
+
+    backend = Complete()
+    assert backend.process(None) is None
+    backend.reset()
+    backend.close()
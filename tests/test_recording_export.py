@@ -0,0 +1,78 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import stream
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import get_db
+from app.models.session import AnalysisSession
+from app.models.user import User, UserRole
+from app.services.session_recorder import RECORD_COLUMNS, SessionRecorder
+
+def record(directory, frames):
+    recorder = SessionRecorder(directory)
+    for frame in range(frames):
+        recorder.append((frame, f"{frame / 30:.3f}") + ("0.0",) * (len(RECORD_COLUMNS) - 2))
+    return recorder
+
+@pytest.fixture
+def api(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RECORDINGS_DIR", str(tmp_path))
+    monkeypatch.setattr(stream, "live_recording_owner", None)
+    users = {}
+    for name, role in (("owner", UserRole.ATHLETE), ("other", UserRole.ATHLETE), ("coach", UserRole.COACH)):
+        users[name] = User(email=f"{name}@x.com", hashed_password="x", full_name=name, role=role)
+        db.add(users[name])
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(stream.router, prefix=f"{settings.API_V1_STR}/stream")
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+    headers = {name: {"Authorization": f"Bearer {create_access_token(user.id)}"} for name, user in users.items()}
+    return client, users, headers
+
+def export_url(recording_id):
+    return f"{settings.API_V1_STR}/stream/recordings/{recording_id}/export?format=csv"
+
+def test_saved_recording_export_access(api, db, tmp_path):
+    client, users, headers = api
+    recording_id = uuid.uuid4().hex
+    record(str(tmp_path / recording_id), 40).close()
+    db.add(AnalysisSession(user_id=users["owner"].id, recording_id=recording_id))
+    db.commit()
+
+    assert client.get(export_url(recording_id)).status_code == 401
+    assert client.get(export_url(recording_id), headers=headers["other"]).status_code == 403
+    for name in ("owner", "coach"):
+        response = client.get(export_url(recording_id), headers=headers[name])
+        assert response.status_code == 200
+        lines = response.text.strip().splitlines()
+        assert lines[0] == ",".join(RECORD_COLUMNS) and len(lines) == 41
+    assert client.get(export_url(uuid.uuid4().hex), headers=headers["owner"]).status_code == 404
+
+def test_live_recording_export_access(api, tmp_path, monkeypatch):
+    client, users, headers = api
+    recording_id = uuid.uuid4().hex
+    analyzer = stream.GaitAnalyzer()
+    analyzer.recorder = record(str(tmp_path / recording_id), 25) # Rows still queued: the export flushes
+    monkeypatch.setattr(stream, "analyzer", analyzer)
+    try:
+        assert client.post(f"{settings.API_V1_STR}/stream/export_csv").status_code == 401
+        assert client.get(export_url(recording_id)).status_code == 401
+
+        # The first user to ask for the download owns the live recording
+        response = client.post(f"{settings.API_V1_STR}/stream/export_csv", headers=headers["owner"])
+        assert response.status_code == 200
+        assert response.json()["download_url"] == export_url(recording_id)
+        response = client.get(export_url(recording_id), headers=headers["owner"])
+        assert response.status_code == 200 and len(response.text.strip().splitlines()) == 26
+
+        assert client.post(f"{settings.API_V1_STR}/stream/export_csv", headers=headers["other"]).status_code == 403
+        assert client.get(export_url(recording_id), headers=headers["other"]).status_code == 403
+        assert client.get(export_url(recording_id), headers=headers["coach"]).status_code == 200
+    finally:
+        analyzer.recorder.close()
@@ -0,0 +1,89 @@
+import numpy as np
+
+from app.services.rep_segmenter import LIMB_POINTS, RepSegmenter
+
+FPS = 30
+STEP_EVERY = 0.35 # Seconds, ~171 spm
+
+def landmarks(t, moving):
+    lms = np.zeros((33, 4))
+    if moving:
+        # Limbs swinging 0.3 m at 1.5 Hz: ~1.8 m/s on average
+        lms[LIMB_POINTS, 0] = 0.3 * np.sin(2 * np.pi * 1.5 * t)
+    return lms
+
+def feed(segmenter, start, end, running, events):
+    next_step, left = start + STEP_EVERY, False
+    for t in np.arange(start, end, 1.0 / FPS):
+        step = running and t >= next_step
+        if step:
+            next_step += STEP_EVERY
+            left = not left
+        event = segmenter.update(
+            t, landmarks(t, running), knee_angle=150 - 40 * running * abs(np.sin(3 * t)), hip_angle=170,
+            step_length=(1.2 if left else 1.0) if step else 0.0, step_left=left, gct=210.0 if step else 0.0,
+        )
+        if event:
+            events.append((round(t, 2), event))
+
+def test_reps_and_rests_from_a_synthetic_stream():
+    segmenter, events = RepSegmenter(score=lambda rep: rep["cadence"]), []
+    feed(segmenter, 0.0, 2.0, False, events) # Standing
+    feed(segmenter, 2.0, 8.0, True, events) # Rep 1
+    feed(segmenter, 8.0, 12.0, False, events)
+    feed(segmenter, 12.0, 15.0, True, events) # Rep 2
+    feed(segmenter, 15.0, 18.0, False, events)
+
+    assert [event for _, event in events] == ["start", "end", "start", "end"]
+    # Ends once no step came for end_gap seconds
+    last_steps = (2.0 + 17 * STEP_EVERY, 12.0 + 8 * STEP_EVERY)
+    for (t, _), last_step in zip(events[1::2], last_steps):
+        assert last_step + segmenter.end_gap < t <= last_step + segmenter.end_gap + 2.0 / FPS
+
+    summary = segmenter.summary()
+    assert not summary["active"] and "current" not in summary
+    first, second = summary["reps"]
+    assert first["index"] == 1 and second["index"] == 2
+    # Dated back to its first step
+    assert abs(first["start"] - (2.0 + STEP_EVERY)) < 1.0 / FPS
+    assert abs(first["end"] - last_steps[0]) < 1.0 / FPS
+    assert first["steps"] == 17
+    assert abs(first["cadence"] - 60 / STEP_EVERY) < 3
+    assert first["score"] == int(first["cadence"])
+    assert first["avg_gct"] == 210.0
+    assert abs(first["avg_stride"] - 1.1) < 0.02
+    assert first["min_knee_angle"] < 115 and first["avg_hip_angle"] == 170.0
+    assert first["symmetry"]["left"] > first["symmetry"]["right"]
+    assert first["frames"] > 0
+
+    # The standing start and the pause between the reps
+    rests = summary["rests"]
+    assert len(rests) == 2
+    assert rests[0]["start"] == 0.0 and abs(rests[0]["end"] - first["start"]) < 1e-6
+    assert abs(rests[1]["start"] - first["end"]) < 1e-6
+    assert abs(rests[1]["end"] - second["start"]) < 1e-6
+    assert rests[1]["frames"] > 0
+
+def test_short_runs_are_not_reps():
+    segmenter, events = RepSegmenter(), []
+    feed(segmenter, 0.0, 1.0, False, events)
+    feed(segmenter, 1.0, 2.0, True, events) # Two steps only
+    feed(segmenter, 2.0, 5.0, False, events)
+
+    assert [event for _, event in events] == ["start", "end"]
+    assert segmenter.summary()["reps"] == []
+
+def test_steps_without_moving_limbs_do_not_start_a_rep():
+    segmenter = RepSegmenter()
+    for n in range(90):
+        t = n / FPS
+        segmenter.update(t, landmarks(t, False), 170, 170, step_length=1.0 if n % 10 == 0 else 0.0)
+    assert not segmenter.active
+
+def test_finish_closes_the_rep_in_progress():
+    segmenter, events = RepSegmenter(), []
+    feed(segmenter, 0.0, 5.0, True, events)
+    assert segmenter.active and segmenter.summary()["current"]["steps"] > 0
+    segmenter.finish(5.0)
+    assert not segmenter.active
+    assert len(segmenter.summary()["reps"]) == 1
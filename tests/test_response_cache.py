@@ -0,0 +1,60 @@
+import time
+
+from starlette.requests import Request
+
+from app.services.response_cache import ORG_TAG, ResponseCache, history_tag, respond
+
+def request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def test_put_get_and_stable_etag():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    entry = cache.put("k", {"score": 81.5, "sessions": [1, 2]}, [history_tag(1)])
+    assert cache.get("k") is entry
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Same payload, same ETag; a different payload changes it
+    assert cache.put("k2", {"score": 81.5, "sessions": [1, 2]}, []).etag == entry.etag
+    assert cache.put("k3", {"score": 82.0, "sessions": [1, 2]}, []).etag != entry.etag
+
+def test_respond_not_modified_when_etag_matches():
+    entry = ResponseCache().put("k", {"a": 1}, [], headers={"X-Total-Count": "1"})
+    for header in (entry.etag, f"W/{entry.etag}", "*", f'"other", {entry.etag}'):
+        response = respond(request(header), entry)
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == entry.etag
+
+    for req in (request(), request('"stale"')):
+        response = respond(req, entry)
+        assert response.status_code == 200
+        assert response.body == entry.body
+        assert response.headers["etag"] == entry.etag
+        assert response.headers["x-total-count"] == "1"
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = ResponseCache()
+    cache.put("history-1", [], [history_tag(1)])
+    cache.put("history-2", [], [history_tag(2)])
+    cache.put("dashboard", {}, [ORG_TAG, history_tag(1)])
+    cache.put("stats", {}, [ORG_TAG])
+
+    cache.invalidate(history_tag(1))
+    assert cache.get("history-1") is None and cache.get("dashboard") is None
+    assert cache.get("history-2") is not None and cache.get("stats") is not None
+
+    cache.invalidate(ORG_TAG, history_tag(2))
+    assert cache.get("history-2") is None and cache.get("stats") is None
+
+def test_entries_expire_and_lru_is_bounded():
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+    cache.put("a", 1, [])
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    cache.ttl = 60
+    for key in "abc":
+        cache.put(key, key, [])
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from app.crud import crud_rollup
+from app.models.rollup import OrganizationRollup, DailyRollup, AthleteRollup
+from app.models.session import AnalysisSession
+from app.models.user import User, UserRole
+
+def add_user(db, email, role):
+    user = User(email=email, hashed_password="x", full_name=email, role=role)
+    db.add(user)
+    db.flush()
+    if role == UserRole.ATHLETE:
+        crud_rollup.adjust_athlete_count(db, 1)
+    return user
+
+def snapshot(db):
+    org = db.query(OrganizationRollup).one()
+    return {
+        "org": (org.total_athletes, org.total_sessions, round(org.score_sum, 6)),
+        "athletes": sorted(
+            (a.user_id, a.session_count, round(a.score_sum, 6), a.best_score, a.last_session_at)
+            for a in db.query(AthleteRollup)
+        ),
+        "days": sorted(
+            (d.day, d.session_count, round(d.score_sum, 6), d.active_users)
+            for d in db.query(DailyRollup)
+        ),
+    }
+
+def test_incremental_rollups_match_rebuild(db):
+    athletes = [add_user(db, f"a{i}@x.com", UserRole.ATHLETE) for i in range(3)]
+    add_user(db, "coach@x.com", UserRole.COACH)
+    start = datetime(2024, 3, 1, 8, 0)
+    # Sessions in save order: several per day, some athletes twice on one day
+    for n in range(20):
+        athlete = athletes[n % 3] if n % 5 else athletes[0]
+        session = AnalysisSession(user_id=athlete.id, technique_score=50 + n,
+                                  created_at=start + timedelta(hours=7 * n))
+        db.add(session)
+        db.flush()
+        crud_rollup.record_session(db, session)
+    db.commit()
+
+    incremental = snapshot(db)
+    assert incremental["org"][:2] == (3, 20)
+    assert sum(day[1] for day in incremental["days"]) == 20
+
+    crud_rollup.rebuild(db)
+    assert snapshot(db) == incremental
+
+def test_ensure_initialized_builds_missing_rollups(db):
+    athlete = add_user(db, "a@x.com", UserRole.ATHLETE)
+    db.query(OrganizationRollup).delete()
+    db.add(AnalysisSession(user_id=athlete.id, technique_score=80, created_at=datetime(2024, 1, 2)))
+    db.commit()
+
+    crud_rollup.ensure_initialized(db)
+    assert snapshot(db)["org"] == (1, 1, 80.0)
+
+def test_concurrent_first_sessions_of_an_athlete(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.session import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Sessions = sessionmaker(bind=engine)
+    first, second = Sessions(), Sessions()
+    created_at = datetime(2024, 3, 1, 9, 0)
+
+    # `second` saves the athlete's first session after `first` found no rollup row
+    insert_missing = crud_rollup._insert_missing
+    def racing_insert(db, row):
+        if isinstance(row, AthleteRollup) and db is first:
+            crud_rollup.record_session(second, AnalysisSession(user_id=1, technique_score=60, created_at=created_at))
+            second.commit()
+        return insert_missing(db, row)
+    monkeypatch.setattr(crud_rollup, "_insert_missing", racing_insert)
+
+    crud_rollup.record_session(first, AnalysisSession(user_id=1, technique_score=80, created_at=created_at))
+    first.commit()
+
+    athlete = first.query(AthleteRollup).one()
+    assert (athlete.session_count, athlete.score_sum, athlete.best_score) == (2, 140.0, 80.0)
+    day = first.query(DailyRollup).one()
+    assert (day.session_count, day.active_users) == (2, 1)
+    first.close()
+    second.close()
+    engine.dispose()
@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.services.session_compare import banded_dtw, residual_lag
+
+def naive_dtw(a, b):
+    n, m = len(a), len(b)
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost[i, j] = np.linalg.norm(a[i - 1] - b[j - 1]) + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return cost[n, m]
+
+def test_wide_band_matches_naive_dtw():
+    rng = np.random.default_rng(0)
+    for n, m in ((40, 40), (37, 52), (60, 23)):
+        a = np.cumsum(rng.normal(size=(n, 3)), axis=0).astype(np.float32)
+        b = np.cumsum(rng.normal(size=(m, 3)), axis=0).astype(np.float32)
+        path, step_cost = banded_dtw(a, b, band=1.0)
+        assert abs(step_cost * len(path) - naive_dtw(a, b)) < 1e-3 * naive_dtw(a, b)
+
+        # A monotone path from the first frames to the last ones
+        assert tuple(path[0]) == (0, 0) and tuple(path[-1]) == (n - 1, m - 1)
+        moves = np.diff(path, axis=0)
+        assert ((moves >= 0) & (moves <= 1)).all() and (moves.sum(axis=1) > 0).all()
+
+def test_narrow_band_stays_in_band_and_aligns_a_time_stretch():
+    t = np.linspace(0, 4 * np.pi, 120)
+    a = np.stack([np.sin(t), np.cos(t)], axis=1).astype(np.float32)
+    b = np.stack([np.sin(t * 0.95), np.cos(t * 0.95)], axis=1).astype(np.float32)
+    path, step_cost = banded_dtw(a, b, band=0.1)
+    assert np.abs(path[:, 1] - path[:, 0]).max() <= 12
+    assert step_cost < 0.05
+    assert step_cost * len(path) >= naive_dtw(a, b) - 1e-3
+
+def test_residual_lag_sign():
+    t = np.arange(200)
+    a = np.stack([np.sin(t / 7.0), np.sin(t / 11.0), np.full(200, 30.0)], axis=1)
+    b = np.roll(a, 5, axis=0) # Same motion, 5 samples later
+    b[:, 1] = np.roll(a[:, 1], -3) # 3 samples earlier
+    assert residual_lag(a, b, 10).tolist() == [5, -3, 0] # The flat column has nothing to line up
+    assert residual_lag(a, a, 10).tolist() == [0, 0, 0]
+
+def test_residual_lag_on_short_series_is_zero():
+    a = np.random.default_rng(1).normal(size=(15, 2))
+    assert residual_lag(a, a[::-1], 10).tolist() == [0, 0]
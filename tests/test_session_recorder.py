@@ -0,0 +1,78 @@
+import os
+import shutil
+import threading
+
+from app.services.gait import GaitAnalyzer
+from app.services.session_recorder import RECORD_COLUMNS, SessionRecorder, iter_recording
+
+def row(frame):
+    return (frame, f"{frame / 30:.3f}") + ("0.0",) * (len(RECORD_COLUMNS) - 2)
+
+def test_chunks_rotate_and_read_back_in_order(tmp_path):
+    directory = str(tmp_path / "0123")
+    recorder = SessionRecorder(directory, chunk_rows=3)
+    for frame in range(10):
+        recorder.append(row(frame))
+    recorder.close()
+
+    chunks = sorted(os.listdir(directory))
+    assert chunks == [f"chunk_{n:05d}.csv" for n in range(4)]
+    assert recorder.rows_written == 10 and not recorder.failed
+    rows = list(iter_recording(directory))
+    assert rows == [[str(value) for value in row(frame)] for frame in range(10)]
+
+    # Reopening the directory continues after the existing chunks
+    recorder = SessionRecorder(directory, chunk_rows=3)
+    recorder.append(row(10))
+    recorder.close()
+    assert sorted(os.listdir(directory))[-1] == "chunk_00004.csv"
+    assert [int(r[0]) for r in iter_recording(directory)] == list(range(11))
+
+def test_flush_makes_appended_rows_readable(tmp_path):
+    recorder = SessionRecorder(str(tmp_path / "rec"), chunk_rows=1000)
+    for frame in range(500):
+        recorder.append(row(frame))
+    recorder.flush()
+    assert [int(r[0]) for r in iter_recording(recorder.directory)] == list(range(500))
+    assert [int(r[0]) for r in recorder.iter_rows()] == list(range(500))
+    recorder.close()
+    recorder.append(row(500)) # Ignored once closed
+    assert recorder.rows_written == 500
+
+def test_rep_start_writes_preroll_before_the_current_frame(tmp_path):
+    analyzer = GaitAnalyzer(record_dir=str(tmp_path / "rec"))
+    analyzer.start_time = 100.0
+    for frame in range(30): # Resting: frames only kept in the preroll
+        analyzer.frame_index = frame
+        analyzer.record_frame(frame / 10, 0.0, 0.0)
+    analyzer.recorder.flush()
+    assert list(iter_recording(analyzer.recorder.directory)) == []
+
+    # The rep is dated back to elapsed 2.0; frames from 0.5 s before that are kept
+    analyzer.segmenter.current = {"start": 102.0}
+    for frame in range(30, 36):
+        analyzer.frame_index = frame
+        analyzer.record_frame(frame / 10, 0.0, 0.0, event="start" if frame == 30 else None)
+    analyzer.recorder.flush()
+    assert [int(r[0]) for r in iter_recording(analyzer.recorder.directory)] == list(range(15, 36))
+    analyzer.segmenter.current = None
+    analyzer.recorder.close()
+
+def test_write_errors_stop_the_recorder_without_blocking(tmp_path, capsys):
+    directory = str(tmp_path / "rec")
+    recorder = SessionRecorder(directory, chunk_rows=10, max_pending=4)
+    shutil.rmtree(directory) # The first chunk cannot be opened
+
+    def record():
+        for frame in range(200):
+            recorder.append(row(frame))
+        recorder.flush()
+        recorder.close()
+
+    worker = threading.Thread(target=record, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "append/flush/close blocked after a write error"
+    assert recorder.failed and recorder.error
+    assert recorder.rows_written == 0
+    assert "stopped writing" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.models.session import AnalysisSession
+from app.services.gait_cycles import PROFILE_SHAPE, pack_profile
+from app.services.similarity_index import SimilarityIndex, embed_session
+
+def brute_force(vectors, ids, users, query, k, user_id=None, exclude_user=None, exclude_id=None, per_user=False):
+    keep = np.ones(len(ids), dtype=bool)
+    if user_id is not None:
+        keep &= users == user_id
+    if exclude_user is not None:
+        keep &= users != exclude_user
+    if exclude_id is not None:
+        keep &= ids != exclude_id
+    candidates = np.flatnonzero(keep)
+    order = candidates[np.argsort(((vectors[candidates] - query) ** 2).sum(axis=1), kind="stable")]
+    if per_user:
+        _, first = np.unique(users[order], return_index=True)
+        order = order[np.sort(first)]
+    return [int(ids[i]) for i in order[:k]]
+
+@pytest.fixture(scope="module")
+def sessions():
+    # 30 well-separated clusters; each is mostly one athlete's sessions
+    rng = np.random.default_rng(0)
+    centers = rng.normal(0, 10, (30, 16))
+    blob = rng.integers(0, 30, 3000)
+    vectors = (centers[blob] + rng.normal(0, 1, (3000, 16))).astype(np.float32)
+    users = np.where(rng.random(3000) < 0.9, blob, rng.integers(30, 60, 3000)).astype(np.int64)
+    ids = np.arange(1, 3001, dtype=np.int64)
+    return ids, users, vectors, centers
+
+SCOPES = [
+    {},
+    {"user_id": 3},
+    {"user_id": 45},
+    {"exclude_user": 3},
+    {"exclude_id": 0},
+    {"per_user": True},
+    {"per_user": True, "exclude_user": 3},
+]
+
+@pytest.mark.parametrize("ann_min_size", [10 ** 6, 500])
+@pytest.mark.parametrize("scope", SCOPES)
+def test_search_matches_brute_force(sessions, ann_min_size, scope):
+    ids, users, vectors, centers = sessions
+    index = SimilarityIndex(ann_min_size=ann_min_size, ann_probes=2)
+    for start in range(0, len(ids), 700):
+        index.add_many(ids[start:start + 700], users[start:start + 700], vectors[start:start + 700])
+    assert index.count == len(ids)
+    assert (index._centroids is not None) == (ann_min_size <= len(ids))
+
+    scope = dict(scope)
+    for blob in (3, 17):
+        query = centers[blob].astype(np.float32)
+        if "exclude_id" in scope:
+            scope["exclude_id"] = int(ids[np.argmin(((vectors - query) ** 2).sum(axis=1))])
+        results = index.search(query, k=10, **scope)
+        expected = brute_force(vectors, ids, users, query, 10, **scope)
+        assert [session_id for session_id, _, _ in results] == expected
+
+        found = {session_id: (user, distance) for session_id, user, distance in results}
+        for session_id in expected:
+            row = session_id - 1
+            assert found[session_id][0] == users[row]
+            assert abs(found[session_id][1] - np.linalg.norm(vectors[row] - query)) < 1e-3
+
+def test_add_many_skips_sessions_already_held():
+    index = SimilarityIndex()
+    index.add_many([1, 2], [1, 1], np.eye(2))
+    index.add_many([2, 3], [1, 2], np.eye(2))
+    assert index.count == 3
+    assert sorted(session_id for session_id, _, _ in index.search([0, 0], k=10)) == [1, 2, 3]
+    assert index.search([0, 0], k=10, user_id=99) == []
+
+def add_session(db, session_id, user_id, shift):
+    profile = pack_profile(np.full(PROFILE_SHAPE[1:], 90.0 + shift), np.zeros(PROFILE_SHAPE[1:]))
+    session = AnalysisSession(id=session_id, user_id=user_id, cycle_profile=profile, avg_cadence=170, avg_gct=220)
+    db.add(session)
+    db.commit()
+    return session
+
+def test_refresh_picks_up_sessions_committed_out_of_order(db):
+    index = SimilarityIndex()
+    add_session(db, 5, 1, 0.0)
+    add_session(db, 7, 2, 5.0)
+    db.add(AnalysisSession(id=8, user_id=2)) # No cycle profile: not indexed
+    db.commit()
+    index.refresh(db, batch=1)
+    assert index.loaded and index.count == 2 and index.last_id == 7
+
+    # A writer that started earlier commits a lower id after 7 was loaded
+    late = add_session(db, 6, 3, 2.0)
+    index.refresh(db)
+    assert index.count == 3
+    assert [(session_id, user_id) for session_id, user_id, _ in index.search(embed_session(late), k=3)] == [(6, 3), (5, 1), (7, 2)]
+
+    index.refresh(db)
+    assert index.count == 3
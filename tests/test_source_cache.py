@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from source_cache import SourceCache
+
+def make_clip(path, frames=30, size=(1280, 720)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, size)
+    for i in range(frames):
+        frame = np.full((size[1], size[0], 3), i * 8 % 255, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+def wait_for(cache, key, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        path = cache.lookup(key)
+        if path:
+            return path
+        time.sleep(0.05)
+    raise AssertionError(f"{key} was not cached")
+
+def test_ensure_transcodes_to_analysis_width(tmp_path):
+    src = str(tmp_path / "src.mp4")
+    make_clip(src)
+    cache = SourceCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+
+    assert cache.lookup("clip") is None
+    cache.ensure("clip", src)
+    cache.ensure("clip", src) # In flight: no second job
+    path = wait_for(cache, "clip")
+
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 800
+    assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 450
+    cap.release()
+    assert not any(name.endswith(".part.mp4") for name in os.listdir(tmp_path / "cache"))
+
+def test_evicts_least_recently_used(tmp_path):
+    src = str(tmp_path / "src.mp4")
+    make_clip(src)
+    cache = SourceCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    cache.ensure("a", src)
+    first = wait_for(cache, "a")
+    os.utime(first, (time.time() - 60, time.time() - 60))
+
+    # Room for one clip only: caching "b" pushes out the older "a"
+    cache.max_bytes = os.path.getsize(first) + 1
+    cache.ensure("b", src)
+    wait_for(cache, "b")
+    assert cache.lookup("a") is None
+
+def serve(handler):
+    import http.server
+    import threading
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/clip.mp4"
+
+def test_skips_live_stream_without_content_length(tmp_path):
+    import http.server
+
+    class Live(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            # MJPEG camera: endless multipart body, no Content-Length
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            try:
+                for _ in range(200):
+                    self.wfile.write(b"--frame\r\n" + b"x" * 10000)
+                    time.sleep(0.01)
+            except OSError:
+                pass
+        def log_message(self, *args):
+            pass
+
+    server, url = serve(Live)
+    try:
+        cache = SourceCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+        cache.ensure("live", url)
+        cache._executor.shutdown(wait=True)
+        assert cache.lookup("live") is None
+        assert "live" in cache._uncacheable
+        assert os.listdir(tmp_path / "cache") == []
+    finally:
+        server.shutdown()
+
+def test_downloads_sized_file_and_enforces_byte_cap(tmp_path):
+    import http.server
+
+    src = str(tmp_path / "src.mp4")
+    make_clip(src)
+    with open(src, "rb") as f:
+        body = f.read()
+    class File(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+
+    server, url = serve(File)
+    try:
+        cache = SourceCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+        cache.ensure("clip", url)
+        assert wait_for(cache, "clip")
+
+        small = SourceCache(str(tmp_path / "small"), max_bytes=len(body) // 2)
+        small.ensure("clip", url)
+        small._executor.shutdown(wait=True)
+        assert small.lookup("clip") is None
+        assert "clip" in small._uncacheable
+    finally:
+        server.shutdown()
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from stream_control import StreamControl, RUNNING, PAUSED, STOPPED
+
+def test_pause_blocks_until_resume_from_another_thread():
+    control = StreamControl(RUNNING)
+    control.pause()
+    threading.Timer(0.1, control.resume).start()
+    started = time.time()
+    assert control.wait_active(timeout=5) is True
+    assert 0.05 < time.time() - started < 1
+
+def test_stop_wakes_paused_waiter():
+    control = StreamControl(RUNNING)
+    control.pause()
+    threading.Timer(0.1, control.stop).start()
+    assert control.wait_active(timeout=5) is False
+    assert control.state == STOPPED
+
+def test_resume_only_applies_to_paused_streams():
+    control = StreamControl()
+    control.resume()
+    assert control.state == STOPPED
+    control.start()
+    control.pause()
+    assert control.state == PAUSED
+
+def test_async_waiter_is_woken_thread_safely():
+    control = StreamControl(RUNNING)
+    control.pause()
+
+    async def main():
+        threading.Timer(0.1, control.resume).start()
+        return await asyncio.wait_for(control.wait_active_async(), 5)
+
+    assert asyncio.run(main()) is True
+
+def test_wait_changed_returns_new_version():
+    control = StreamControl(RUNNING)
+    version = control.version
+    threading.Timer(0.05, control.notify).start()
+    assert control.wait_changed(version, timeout=5) != version
+    assert control.state == RUNNING
@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from stream_resolver import StreamResolver, video_key, url_expiry
+
+class StubExtractor:
+    """
+    Local stand-in for yt-dlp: counts calls and can be slowed down to force overlap.
+    """
+    def __init__(self, delay=0.0, expire_in=None):
+        self.calls = 0
+        self.delay = delay
+        self.expire_in = expire_in
+        self.lock = threading.Lock()
+
+    def __call__(self, page_url, fmt):
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+        time.sleep(self.delay)
+        url = f"https://media.example/{video_key(page_url)}/{n}.mp4"
+        if self.expire_in is not None:
+            url += f"?expire={int(time.time() + self.expire_in)}"
+        return {"url": url}
+
+def test_video_key_normalizes_youtube_urls():
+    assert video_key("https://www.youtube.com/watch?v=abc123&t=10") == "abc123"
+    assert video_key("https://youtu.be/abc123?si=x") == "abc123"
+    assert video_key("https://www.youtube.com/shorts/abc123") == "abc123"
+    assert url_expiry("https://r1.googlevideo.com/videoplayback?expire=1700000000&id=1") == 1700000000
+
+def test_cache_hit_skips_extractor():
+    stub = StubExtractor()
+    resolver = StreamResolver(extractor=stub, auto_refresh=False)
+    first = resolver.resolve("https://youtu.be/abc123")
+    second = resolver.resolve("https://www.youtube.com/watch?v=abc123")
+    assert first == second
+    assert stub.calls == 1
+
+def test_concurrent_lookups_share_one_extraction():
+    stub = StubExtractor(delay=0.2)
+    resolver = StreamResolver(extractor=stub, auto_refresh=False)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve("https://youtu.be/xyz"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stub.calls == 1
+    assert len(set(results)) == 1
+
+def test_signed_url_expiry_triggers_background_refresh():
+    stub = StubExtractor(expire_in=60) # Already inside the refresh margin
+    resolver = StreamResolver(extractor=stub, refresh_margin=300, auto_refresh=False)
+    first = resolver.resolve("https://youtu.be/abc")
+    assert resolver.resolve("https://youtu.be/abc") == first # Still valid: served from cache
+    deadline = time.time() + 2
+    refreshed = first
+    while refreshed == first and time.time() < deadline:
+        time.sleep(0.01)
+        refreshed = resolver.resolve("https://youtu.be/abc")
+    assert refreshed != first
+    assert stub.calls >= 2
+
+def test_failed_extraction_is_not_cached():
+    calls = []
+    def failing(page_url, fmt):
+        calls.append(page_url)
+        raise RuntimeError("extraction failed")
+    resolver = StreamResolver(extractor=failing, auto_refresh=False)
+    for _ in range(2):
+        try:
+            resolver.resolve("https://youtu.be/bad")
+        except RuntimeError:
+            pass
+    assert len(calls) == 2